@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 09:40 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Performance benchmarks. Run the single modules, e.g. python -m bench.bench_scan
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
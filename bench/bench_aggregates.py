@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 13:30 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Measures the latency of Model.data(index, Model.TotalBinaryRole) at the root of a large tree. The tree is built in
+memory under an empty temporary directory, so that no files have to be created. The former recursive computation
+of the numbers is measured for comparison.
+
+    python -m bench.bench_aggregates [--files 1000000] [--fanout 10] [--per-dir 100]
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from PyQt5.QtWidgets import QApplication
+
+from src.dir_manager import DirManager, Dir, File
+from src.mainwindow import Model
+
+
+def buildTree(mgr, nfiles, fanout, perDir):
+    """Attach a synthetic tree with nfiles classified files to the manager's root directory"""
+    n = 0
+    queue = [mgr.dir]
+    while n < nfiles:
+        parent = queue.pop(0)
+        for i in range(fanout):
+            dir = Dir(os.path.join(parent.path, f"d{i}"), mgr, scan=False)
+            parent.addDir(dir)
+            files = []
+            for j in range(min(perDir, nfiles - n)):
+                file = File(os.path.join(dir.path, f"file{j}"), mgr, dir, size=j)
+                file.binary = j % 3 == 0
+                files.append(file)
+            n += len(files)
+            dir.addFiles(files)
+            queue.append(dir)
+    return n
+
+
+def legacyNumbers(dir):
+    """The numbers as formerly computed by recursing over the subtree"""
+
+    def binCount(d):
+        return d.nbinFiles + sum([binCount(s) for s in d.dirs])
+
+    def txtCount(d):
+        return d.ntxtFiles + sum([txtCount(s) for s in d.dirs])
+
+    def binSize(d):
+        return sum([f.size() for f in d.files if f.isBinary()]) + sum([binSize(s) for s in d.dirs])
+
+    def totalFiles(d):
+        return len(d.files) + sum([totalFiles(s) for s in d.dirs])
+
+    return [binCount(dir), binSize(dir), txtCount(dir), totalFiles(dir)]
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1000000)
+    parser.add_argument("--fanout", type=int, default=10)
+    parser.add_argument("--per-dir", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    root = tempfile.mkdtemp(prefix="sfb_bench_")
+    try:
+        mgr = DirManager(dir=root)
+        t0 = time.perf_counter()
+        n = buildTree(mgr, args.files, args.fanout, args.per_dir)
+        print(f"Built a tree of {n} files in {time.perf_counter() - t0:0.1f} s")
+
+        model = Model()
+        index = model.index(root, Model.DATACOL)
+        model.setDirManager(mgr)
+        numbers = model.data(index, Model.TotalBinaryRole)
+        assert numbers == legacyNumbers(mgr.dir), (numbers, legacyNumbers(mgr.dir))
+
+        t = measure(lambda: model.data(index, Model.TotalBinaryRole), args.repeat)
+        print(f"Model.data at the root:      {t * 1e6:12.1f} us")
+        t = measure(lambda: legacyNumbers(mgr.dir), max(1, args.repeat // 1000))
+        print(f"Recursive numbers (former):  {t * 1e6:12.1f} us")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
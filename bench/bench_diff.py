@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 06:50 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Scaling of the diff. Two synthetic trees, differing in a given share of their files, are built in memory (no files
+on the disk) and diffed as Dir trees and as snapshots. The time per entry should stay constant with the size.
+
+    python -m bench.bench_diff [--files 10000 100000 1000000] [--fanout 10] [--per-dir 100] [--changed 0.01]
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from collections import namedtuple
+
+from src.diff import diff
+from src.dir_manager import DirManager
+from src.snapshot import Snapshot
+
+Stat = namedtuple("Stat", "st_dev st_ino st_size st_mtime_ns st_nlink", defaults=(1,))
+
+
+def buildTree(root, nfiles, fanout, perDir, changed, seed):
+    """Return a lazy DirManager of root with a synthetic tree of nfiles; changed is the share of modified files"""
+    rnd = random.Random(seed)
+    mgr = DirManager(dir=root, lazy=True, classify=False)
+    pending = [mgr.dir]
+    ino = 0
+    while pending and ino < nfiles:
+        dir = pending.pop(0)
+        files = []
+        for i in range(min(perDir, nfiles - ino)):
+            ino += 1
+            size = ino % 4096
+            if rnd.random() < changed:
+                size += 1
+            files.append((f"file{i}.dat", Stat(1, ino, size, 10 ** 9)))
+        for file in dir.populate([f"d{i}" for i in range(fanout)], files)[0]:
+            file.setBinary(file.bytes % 3 == 0)
+        pending.extend(dir.dirs)
+    return mgr
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--fanout", type=int, default=10)
+    parser.add_argument("--per-dir", type=int, default=100)
+    parser.add_argument("--changed", type=float, default=0.01, help="share of the files changed")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="sfb_bench_")
+    try:
+        for nfiles in args.files:
+            old = buildTree(root, nfiles, args.fanout, args.per_dir, 0, 1)
+            new = buildTree(root, nfiles, args.fanout, args.per_dir, args.changed, 2)
+            t0 = time.perf_counter()
+            n = sum(1 for _ in diff(old.dir, new.dir))
+            tDirs = time.perf_counter() - t0
+            old.save(os.path.join(root, "old"))
+            new.save(os.path.join(root, "new"))
+            with Snapshot(os.path.join(root, "old")) as a, Snapshot(os.path.join(root, "new")) as b:
+                t0 = time.perf_counter()
+                sum(1 for _ in diff(a, b))
+                tSnapshots = time.perf_counter() - t0
+            print(f"{nfiles:>9} files, {n:>7} differences: Dir trees {tDirs:7.3f} s "
+                  f"({1e6 * tDirs / nfiles:5.2f} us/file), snapshots {tSnapshots:7.3f} s "
+                  f"({1e6 * tSnapshots / nfiles:5.2f} us/file)")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
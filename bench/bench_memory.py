@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 18:40 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Measures the memory taken by the tree of a DirManager per entry (file or directory). The tree is built in memory
+with fake stat data, each size in a fresh process, so that the resident set size grows by the tree only.
+The former layout (an object with __dict__ and full path per item plus the path -> item dict of the manager)
+is measured for comparison up to --legacy-max entries.
+
+    python -m bench.bench_memory [--entries 1000000 10000000] [--fanout 10] [--per-dir 100] [--legacy-max 1000000]
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import argparse
+import gc
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from src.dir_manager import DirManager, Dir, File
+
+
+def rss():
+    """Return the resident set size of the process in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak instead of current size, good enough for a growing process
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def fakeStat(i):
+    return SimpleNamespace(st_dev=2049, st_ino=1000000 + i, st_size=i % 100000,
+                           st_mtime_ns=1700000000000000000 + 7919 * i)
+
+
+def buildTree(mgr, nentries, fanout, perDir):
+    """Attach a synthetic tree with nentries directories and files to the manager's root directory"""
+    n = 0
+    queue = [mgr.dir]
+    while n < nentries:
+        parent = queue.pop(0)
+        for i in range(fanout):
+            dir = Dir(f"d{i}", mgr, scan=False)
+            parent.addDir(dir)
+            count = min(perDir, nentries - n - 1)
+            dir.addFiles([File(f"file{j}.dat", mgr, dir, stat=fakeStat(n + j)) for j in range(count)])
+            n += count + 1
+            queue.append(dir)
+            if n >= nentries:
+                break
+    return n
+
+
+class LegacyItem:
+    """The former layout of a tree item"""
+
+    def __init__(self, path, manager, parent=None):
+        self.path = path
+        self.manager = manager
+        self.parent = parent
+        manager.items[path] = self
+
+
+class LegacyDir(LegacyItem):
+    def __init__(self, path, manager, parent=None):
+        super().__init__(path, manager, parent)
+        self.dirs = []
+        self.files = []
+        self.nbinFiles = 0
+        self.ntxtFiles = 0
+        self.listed = True
+        self.nTotalFiles = 0
+        self.nTotalBin = 0
+        self.nTotalTxt = 0
+        self.totalBinSize = 0
+        self.totalTxtSize = 0
+        self.nTotalUnlisted = 0
+
+
+class LegacyFile(LegacyItem):
+    def __init__(self, path, manager, parent=None, stat=None):
+        super().__init__(path, manager, parent)
+        self.binary = None
+        self.bytes = stat.st_size
+        self.statKey = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def buildLegacyTree(root, nentries, fanout, perDir):
+    mgr = SimpleNamespace(items={}, map={})
+    n = 0
+    queue = [LegacyDir(root, mgr)]
+    mgr.dir = queue[0]
+    while n < nentries:
+        parent = queue.pop(0)
+        for i in range(fanout):
+            dir = LegacyDir(os.path.join(parent.path, f"d{i}"), mgr, parent)
+            parent.dirs.append(dir)
+            count = min(perDir, nentries - n - 1)
+            dir.files.extend(LegacyFile(os.path.join(dir.path, f"file{j}.dat"), mgr, dir, stat=fakeStat(n + j))
+                             for j in range(count))
+            n += count + 1
+            queue.append(dir)
+            if n >= nentries:
+                break
+    return mgr, n
+
+
+def child(layout, nentries, fanout, perDir):
+    """Build one tree and print entries, bytes and seconds"""
+    root = tempfile.mkdtemp(prefix="sfb_bench_")
+    try:
+        gc.collect()
+        before = rss()
+        t0 = time.perf_counter()
+        if layout == "compact":
+            tree = DirManager(dir=root, classify=False)
+            n = buildTree(tree, nentries, fanout, perDir)
+        else:
+            tree, n = buildLegacyTree(root, nentries, fanout, perDir)
+        elapsed = time.perf_counter() - t0
+        gc.collect()
+        print(n, rss() - before, elapsed)
+    finally:
+        os.rmdir(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, nargs="+", default=[1000000, 10000000])
+    parser.add_argument("--fanout", type=int, default=10)
+    parser.add_argument("--per-dir", type=int, default=100)
+    parser.add_argument("--legacy-max", type=int, default=1000000,
+                        help="largest tree measured in the former layout")
+    parser.add_argument("--child", choices=["compact", "legacy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.entries[0], args.fanout, args.per_dir)
+        return
+
+    print(f"{'layout':10} {'entries':>10} {'MiB':>10} {'bytes/entry':>12} {'build s':>8}")
+    for nentries in args.entries:
+        for layout in ("compact", "legacy"):
+            if layout == "legacy" and nentries > args.legacy_max:
+                continue
+            cmd = [sys.executable, "-m", "bench.bench_memory", "--child", layout, "--entries", str(nentries),
+                   "--fanout", str(args.fanout), "--per-dir", str(args.per_dir)]
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"{layout:10} {nentries:>10} failed: {result.stderr.strip().splitlines()[-1:]}")
+                continue
+            n, size, elapsed = result.stdout.split()
+            n, size = int(n), int(size)
+            print(f"{layout:10} {n:>10} {size / 2 ** 20:>10.1f} {size / n:>12.1f} {float(elapsed):>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
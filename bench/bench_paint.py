@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 23:50 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Frames per second of a tree view scrolled through a wide directory, painted with the pixmap cached
+PercentBarDelegate and with the former delegate creating a PercentBar widget per paint. Runs on the offscreen Qt
+platform; every frame is a full repaint of the viewport.
+
+    python -m bench.bench_paint [--dirs 1000] [--height 800] [--step 3] [--repeat 3]
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QTreeView
+
+from bench.tree_generator import generateTree
+from src.dir_manager import DirManager
+from src.mainwindow import Model, PercentBarDelegate
+from src.percent_bar import PercentBar
+
+
+class WidgetDelegate(PercentBarDelegate):
+    """The delegate as it was before the renderer: a new widget draws every bar"""
+
+    def paint(self, painter, option, index):
+        if self.percentBarRequired(index):
+            bar = PercentBar()
+            numbers = index.data(role=Model.TotalBinaryRole)
+            if numbers:
+                bar.numbers = numbers
+            bar.paint(painter, option.rect)
+        else:
+            super().paint(painter, option, index)
+
+
+def waitForRows(app, model, index, rows, timeout=30):
+    deadline = time.monotonic() + timeout
+    while model.rowCount(index) < rows and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+
+
+def scroll(view, step):
+    """Scroll from the top to the bottom, repainting every step rows; returns the frames per second"""
+    bar = view.verticalScrollBar()
+    frames = 0
+    t0 = time.perf_counter()
+    for value in range(bar.minimum(), bar.maximum() + 1, step):
+        bar.setValue(value)
+        view.viewport().repaint()
+        frames += 1
+    return frames / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dirs", type=int, default=1000, help="subdirectories shown in the view")
+    parser.add_argument("--height", type=int, default=800, help="height of the view in pixels")
+    parser.add_argument("--step", type=int, default=3, help="rows scrolled per frame")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    root = tempfile.mkdtemp(prefix="sfb_bench_")
+    try:
+        tree = os.path.join(root, "tree")
+        generateTree(tree, depth=1, fanout=args.dirs, filesPerDir=3)
+        model = Model()
+        index = model.setRootPath(tree)
+        model.setDirManager(DirManager(dir=tree))
+        view = QTreeView()
+        view.setModel(model)
+        view.setRootIndex(index)
+        view.setUniformRowHeights(True)
+        view.resize(800, args.height)
+        view.setColumnWidth(0, 300)
+        view.show()
+        waitForRows(app, model, index, args.dirs + 3)
+        print(f"{model.rowCount(index)} rows, {args.height} px high view, {args.step} rows per frame")
+
+        for label, delegate in (("widget per paint", WidgetDelegate(view)), ("pixmap cache", PercentBarDelegate(view))):
+            view.setItemDelegate(delegate)
+            fps = max(scroll(view, args.step) for _ in range(args.repeat))
+            print(f"{label:>18}: {fps:8.1f} frames/s")
+        view.close()
+        model.stop()
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
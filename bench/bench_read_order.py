@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 01:25 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Classification pass with the read scheduling on and off: files read in the order of the listing, by inode, by
+physical extent and with or without readahead. Before every run, the pages of the files are dropped from the page
+cache with posix_fadvise(DONTNEED), so the reads hit the disk. The differences show on rotational and network storage;
+on an SSD or tmpfs the orders perform alike. Generate the tree on the disk to be measured with --dir.
+
+    python -m bench.bench_read_order [--dir PATH] [--depth 3] [--fanout 8] [--files 50] [--workers 4] [--repeat 3]
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from bench.tree_generator import generateTree
+from src.classifier import ClassificationEngine
+from src.dir_manager import DirManager
+from src.scheduler import ReadScheduler
+from src.tiered import TieredClassifier
+
+CONFIGS = {
+    "listing": dict(order=None, readahead=False),
+    "listing+readahead": dict(order=None, readahead=True),
+    "inode": dict(order="inode", readahead=False),
+    "inode+readahead": dict(order="inode", readahead=True),
+    "extent+readahead": dict(order="extent", readahead=True),
+}
+
+
+def evict(files):
+    """Drop the cached pages of the files, so that they have to be read from the disk again"""
+    for f in files:
+        try:
+            fd = os.open(f.path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def measure(files, workers, order, readahead, repeat):
+    times = []
+    for _ in range(repeat):
+        evict(files)
+        for f in files:
+            f.invalidate()
+        engine = ClassificationEngine(workers=workers, classifier=TieredClassifier(readahead=readahead),
+                                      scheduler=ReadScheduler(order))
+        t0 = time.perf_counter()
+        engine.classify(files)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", help="directory, in which the tree is generated (default: the temporary directory)")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--files", type=int, default=50, help="files per directory")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if not hasattr(os, "posix_fadvise"):
+        sys.exit("posix_fadvise is not available on this system")
+
+    root = tempfile.mkdtemp(prefix="sfb_bench_", dir=args.dir)
+    try:
+        tree = os.path.join(root, "tree")
+        nfiles = generateTree(tree, args.depth, args.fanout, args.files, sizes="uniform")
+        files = list(DirManager(dir=tree, classify=False).dir.allFiles())
+        print(f"Tree of {nfiles} files, {args.workers} workers")
+        baseline = None
+        for label, config in CONFIGS.items():
+            t = measure(files, args.workers, repeat=args.repeat, **config)
+            baseline = baseline or t
+            print(f"{label:>18}: {t:8.3f} s  {nfiles / t:10.0f} files/s  speedup {baseline / t:5.2f}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 14:10 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Switching the analyzed root directory with the reuse of the analyzed subtrees compared with analyzing the new root
+afresh: narrowing to a subdirectory, widening back to the root, which scans only the siblings of the known
+subdirectory, and going back and forth between the two from the cache of the recent trees. The best of the repeats
+is reported.
+
+    python -m bench.bench_reroot [--dir PATH] [--depth 3] [--fanout 10] [--files 100] [--workers 4] [--repeat 3]
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from bench.tree_generator import generateTree
+from src.dir_manager import DirManager
+
+
+def timed(fn, setup=None, repeat=1):
+    """Return the value of the last call of fn and the shortest of its times; setup is called before each call"""
+    best = None
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        t0 = time.perf_counter()
+        value = fn(arg) if setup is not None else fn()
+        t = time.perf_counter() - t0
+        best = t if best is None else min(best, t)
+    return value, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", help="directory, in which the tree is generated (default: the temporary directory)")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=10)
+    parser.add_argument("--files", type=int, default=100, help="files per directory")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="sfb_bench_", dir=args.dir)
+    try:
+        tree = os.path.join(root, "tree")
+        nfiles = generateTree(tree, args.depth, args.fanout, args.files)
+        subdir = os.path.join(tree, "d0")
+        print(f"Tree of {nfiles} files")
+
+        _, t = timed(lambda: DirManager(dir=tree, workers=args.workers), repeat=args.repeat)
+        print(f"{'analyze root':>22}: {t:8.3f} s")
+        fresh, t = timed(lambda: DirManager(dir=subdir, workers=args.workers), repeat=args.repeat)
+        print(f"{'analyze subdir':>22}: {t:8.3f} s")
+        mgr, t = timed(lambda mgr: mgr.reroot(subdir) and mgr, lambda: DirManager(dir=tree, workers=args.workers),
+                       args.repeat)
+        assert mgr.dir.totalFiles() == fresh.dir.totalFiles()
+        print(f"{'narrow':>22}: {1e3 * t:8.3f} ms")
+
+        mgr, t = timed(lambda mgr: mgr.setDir(tree) or mgr, lambda: DirManager(dir=subdir, workers=args.workers),
+                       args.repeat)
+        assert mgr.dir.totalFiles() == nfiles
+        print(f"{'widen':>22}: {t:8.3f} s")
+        _, t = timed(lambda: [mgr.reroot(path) for _ in range(10) for path in (subdir, tree)])
+        print(f"{'back and forth':>22}: {1e3 * t / 20:8.3f} ms")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
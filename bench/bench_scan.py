@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 09:55 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Compares the os.scandir based Walker with the former recursive listdir/isfile/isdir/stat scan, with regard to
+the number of file system calls and the wall time.
+
+    python -m bench.bench_scan [--depth 4] [--fanout 5] [--files 20] [--deep 1500]
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from unittest import mock
+
+from bench.tree_generator import generateTree
+from src.walker import Walker
+
+calls = Counter()
+
+
+def legacyScan(path):
+    """The scan formerly done by Dir.__init__ and File.size(), without the classification"""
+    try:
+        items = os.listdir(path)
+    except (PermissionError, FileNotFoundError):
+        return
+    for item in items:
+        p = os.path.join(path, item)
+        if os.path.isfile(p):
+            os.stat(p).st_size
+        elif os.path.isdir(p):
+            legacyScan(p)
+
+
+def walkerScan(path):
+    for _ in Walker().walk(path):
+        pass
+
+
+class CountingEntry:
+    """
+    Proxy of os.DirEntry counting the calls, which need a system call. DirEntry caches the result of stat().
+    is_file()/is_dir() are served from the d_type of the directory listing, unless the entry is a symlink
+    """
+
+    def __init__(self, entry):
+        self.entry = entry
+        self.name = entry.name
+        self.path = entry.path
+        self.statted = False
+
+    def is_file(self, follow_symlinks=True):
+        calls["stat"] += int(follow_symlinks and self.entry.is_symlink())
+        return self.entry.is_file(follow_symlinks=follow_symlinks)
+
+    def is_dir(self, follow_symlinks=True):
+        calls["stat"] += int(follow_symlinks and self.entry.is_symlink())
+        return self.entry.is_dir(follow_symlinks=follow_symlinks)
+
+    def stat(self, follow_symlinks=True):
+        if not self.statted:
+            calls["stat"] += 1
+            self.statted = True
+        return self.entry.stat(follow_symlinks=follow_symlinks)
+
+
+class CountingScandir:
+    def __init__(self, path):
+        calls["list"] += 1
+        self.it = realScandir(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.it.close()
+
+    def __iter__(self):
+        return (CountingEntry(e) for e in self.it)
+
+
+realStat = os.stat
+realListdir = os.listdir
+realScandir = os.scandir
+
+
+def countingStat(*args, **kwargs):
+    calls["stat"] += 1
+    return realStat(*args, **kwargs)
+
+
+def countingListdir(*args, **kwargs):
+    calls["list"] += 1
+    return realListdir(*args, **kwargs)
+
+
+def countSyscalls(scan, path):
+    calls.clear()
+    with mock.patch("os.stat", countingStat), mock.patch("os.listdir", countingListdir), \
+            mock.patch("os.scandir", CountingScandir):
+        scan(path)
+    return dict(calls)
+
+
+def timeit(scan, path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        scan(path)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def makeDeepTree(root, depth):
+    """Create a single chain of nested directories. os.makedirs would recurse, so the dirs are created one by one"""
+    path = root
+    os.mkdir(path)
+    for _ in range(depth):
+        path = os.path.join(path, "d")
+        os.mkdir(path)
+    with open(os.path.join(path, "file.txt"), "w") as f:
+        f.write("blabla")
+    return path
+
+
+def removeDeepTree(leaf, root):
+    """shutil.rmtree recurses as well"""
+    os.remove(os.path.join(leaf, "file.txt"))
+    while len(leaf) >= len(root):
+        os.rmdir(leaf)
+        leaf = os.path.dirname(leaf)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=5)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--deep", type=int, default=1500, help="depth of the additional single-branch tree")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="sfb_bench_")
+    try:
+        tree = os.path.join(root, "tree")
+        nfiles = generateTree(tree, depth=args.depth, fanout=args.fanout, filesPerDir=args.files)
+        print(f"Tree with {nfiles} files")
+        for name, scan in (("legacy", legacyScan), ("walker", walkerScan)):
+            n = countSyscalls(scan, tree)
+            t = timeit(scan, tree, args.repeat)
+            print(f"{name:>8}: {n.get('list', 0):8d} listings {n.get('stat', 0):8d} stats {t * 1000:10.1f} ms")
+
+        deep = os.path.join(root, "deep")
+        leaf = makeDeepTree(deep, args.deep)
+        print(f"Single-branch tree of depth {args.deep}")
+        for name, scan in (("legacy", legacyScan), ("walker", walkerScan)):
+            try:
+                t = timeit(scan, deep, 1)
+                print(f"{name:>8}: {t * 1000:10.1f} ms")
+            except RecursionError:
+                print(f"{name:>8}: RecursionError")
+        removeDeepTree(leaf, deep)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
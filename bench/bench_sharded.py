@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 21:45 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Scaling of the sharded multi-process scan with the number of worker processes on a synthetic tree, compared with
+the single-process scan classifying with threads. The page cache is warm, so the numbers show the CPU bound part.
+
+    python -m bench.bench_sharded [--depth 4] [--fanout 6] [--files 40] [--workers 1 2 4 8] [--repeat 3]
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from bench.tree_generator import generateTree
+from src.dir_manager import DirManager
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--files", type=int, default=40, help="files per directory")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="sfb_bench_")
+    try:
+        nfiles = generateTree(os.path.join(root, "tree"), args.depth, args.fanout, args.files)
+        tree = os.path.join(root, "tree")
+        print(f"Tree of {nfiles} files, {os.cpu_count()} CPUs")
+        baseline = measure(lambda: DirManager(dir=tree), args.repeat)
+        print(f"{'threads':>12}: {baseline:8.2f} s  {nfiles / baseline:10.0f} files/s")
+        for workers in args.workers:
+            t = measure(lambda: DirManager(dir=tree, workers=workers, sharded=True), args.repeat)
+            label = f"{workers} processes"
+            print(f"{label:>12}: {t:8.2f} s  {nfiles / t:10.0f} files/s  speedup {baseline / t:5.2f}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
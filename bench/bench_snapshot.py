@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 05:20 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Reopening an analyzed tree from a snapshot compared with analyzing it again: the time of the full analysis, of
+saving the snapshot (raw and compressed), of opening it up to the numbers of the root, of creating the whole tree
+from it and of validating it against the file system.
+
+    python -m bench.bench_snapshot [--dir PATH] [--depth 3] [--fanout 10] [--files 100] [--workers 4]
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from bench.tree_generator import generateTree
+from src.dir_manager import DirManager
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", help="directory, in which the tree is generated (default: the temporary directory)")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=10)
+    parser.add_argument("--files", type=int, default=100, help="files per directory")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="sfb_bench_", dir=args.dir)
+    try:
+        tree = os.path.join(root, "tree")
+        nfiles = generateTree(tree, args.depth, args.fanout, args.files)
+        mgr, t = timed(lambda: DirManager(dir=tree, workers=args.workers))
+        print(f"Tree of {nfiles} files")
+        print(f"{'analyze':>22}: {t:8.3f} s")
+        for compress in (False, True):
+            path = os.path.join(root, f"tree{'.z' if compress else ''}.sfbsnap")
+            size, t = timed(lambda: mgr.save(path, compress))
+            label = "compressed" if compress else "raw"
+            print(f"{'save ' + label:>22}: {t:8.3f} s  {size / 1e6:8.2f} MB  {size / nfiles:6.1f} B/file")
+            loaded, t = timed(lambda: DirManager.load(path))
+            (total, binary), t2 = timed(lambda: (loaded.dir.totalFiles(), loaded.dir.binCount()))
+            assert (total, binary) == (mgr.dir.totalFiles(), mgr.dir.binCount())
+            print(f"{'open ' + label:>22}: {t + t2:8.3f} s")
+            _, t = timed(lambda: sum(1 for _ in loaded.dir.allFiles()))
+            print(f"{'materialize ' + label:>22}: {t:8.3f} s")
+            stale, t = timed(lambda: list(loaded.validate()))
+            print(f"{'validate ' + label:>22}: {t:8.3f} s  {len(stale)} changed directories")
+            loaded.snapshot.close()
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
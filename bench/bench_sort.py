@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 09:30 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Sorting a wide level of the tree by its binary numbers with the BinarySortModel, which sorts a level at once with
+keys looked up once per row, compared with a QSortFilterProxyModel calling a Python lessThan, which looks the numbers
+up on every comparison; and the query of the heaviest binary directories from
+the HeaviestIndex compared with a traversal of the tree. The rows are empty directories on the disk; their files
+are added in memory. Runs on the offscreen Qt platform.
+
+    python -m bench.bench_sort [--rows 100000] [--top 20]
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import argparse
+import heapq
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt, QSortFilterProxyModel
+from PyQt5.QtWidgets import QApplication
+
+from bench.bench_paint import waitForRows
+from src.binary_proxy import BinarySortModel
+from src.dir_manager import DirManager, File
+from src.mainwindow import Model
+
+Stat = namedtuple("Stat", "st_dev st_ino st_size st_mtime_ns")
+
+
+class LessThanProxyModel(QSortFilterProxyModel):
+    """Sorts by the binary numbers of both rows, looked up on every comparison"""
+
+    def __init__(self, column):
+        super().__init__()
+        self.column = column - BinarySortModel.BINCOUNTCOL
+
+    def lessThan(self, left, right):
+        model = self.sourceModel()
+        return (model.binaryValues(left) or BinarySortModel.UNKNOWN)[self.column] < \
+            (model.binaryValues(right) or BinarySortModel.UNKNOWN)[self.column]
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - t0
+
+
+def traverse(root, n):
+    """The heaviest directories by a traversal of the whole tree"""
+    dirs = []
+    stack = [root]
+    while stack:
+        dir = stack.pop()
+        dirs.append(dir)
+        stack.extend(dir.dirs)
+    return heapq.nlargest(n, dirs, key=lambda d: d.totalBinSize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="directories in the sorted level")
+    parser.add_argument("--top", type=int, default=20, help="number of the heaviest directories queried")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    rnd = random.Random(1)
+    root = tempfile.mkdtemp(prefix="sfb_bench_")
+    try:
+        for i in range(args.rows):
+            os.mkdir(os.path.join(root, f"d{i}"))
+        mgr = DirManager(dir=root, classify=False)
+        ino = 0
+        for dir in mgr.dir.dirs:
+            files = []
+            for j in range(rnd.randint(1, 4)):
+                ino += 1
+                files.append(File(f"f{j}", None, dir, stat=Stat(1, ino, rnd.randint(0, 1 << 20), 0)))
+            dir.addFiles(files)
+            for file in files:
+                file.setBinary(rnd.random() < 0.3)
+        model = Model()
+        index = model.setRootPath(root)
+        model.setDirManager(mgr)
+        waitForRows(app, model, index, args.rows, timeout=120)
+        print(f"{model.rowCount(index)} rows")
+
+        for column, name in ((BinarySortModel.BINSIZECOL, "bytes"), (BinarySortModel.BINCOUNTCOL, "files")):
+            proxy = LessThanProxyModel(column)
+            proxy.setSourceModel(model)
+            proxy.rowCount(proxy.mapFromSource(index))  # Maps the level, so that the sort covers it
+            _, t = timed(lambda: proxy.sort(0, Qt.DescendingOrder))
+            print(f"{'lessThan':>15}: sort by {name:5} {t:8.3f} s")
+        proxy = BinarySortModel()
+        proxy.setSourceModel(model)
+        proxy.rowCount(proxy.mapFromSource(index))
+        for column, name in ((BinarySortModel.BINSIZECOL, "bytes"), (BinarySortModel.BINCOUNTCOL, "files")):
+            _, t = timed(lambda: proxy.sort(column, Qt.DescendingOrder))
+            print(f"{'BinarySortModel':>15}: sort by {name:5} {t:8.3f} s")
+
+        top, t = timed(lambda: traverse(mgr.dir, args.top))
+        print(f"{'traversal':>15}: top {args.top} {1e3 * t:8.2f} ms")
+        indexed, t = timed(lambda: mgr.heaviest(args.top))
+        assert [d.totalBinSize for d in top if d.totalBinSize] == [d.totalBinSize for d in indexed]
+        print(f"{'index build':>15}: top {args.top} {1e3 * t:8.2f} ms")
+        file = mgr.dir.dirs[0].files[0]
+        file.invalidate()
+        file.setBinary(True)
+        _, t = timed(lambda: mgr.heaviest(args.top))
+        print(f"{'index query':>15}: top {args.top} {1e3 * t:8.2f} ms")
+        model.stop()
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 12:05 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Start-up time of fresh interpreters: importing the core (the scanner, the classifier and the tree, without Qt), a
+headless scan of a small tree, loading the form of the main window with uic and from its cache, and importing and
+showing the GUI. The medians of the wall times are printed, with the start of a bare interpreter for reference.
+Runs the GUI on the offscreen Qt platform.
+
+    python -m bench.bench_startup [--runs 11]
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.tree_generator import generateTree
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UI = os.path.join(ROOT, "src", "mainwindow.ui")
+
+CASES = [
+    ("interpreter", "pass"),
+    ("core import", "import src.cli"),
+    ("headless scan", "import sys, io; from src.cli import scan; from src.report import NdjsonWriter; "
+                      "scan(sys.argv[1], NdjsonWriter(io.StringIO()), workers=1)"),
+    ("form with uic", f"import PyQt5.QtWidgets; from PyQt5 import uic; uic.loadUiType({UI!r})"),
+    ("cached form", f"import PyQt5.QtWidgets; from src.forms import loadUiType; loadUiType({UI!r})"),
+    ("GUI import", "from src import MainWindow"),
+    ("GUI shown", "import sys; from PyQt5.QtWidgets import QApplication; from src import MainWindow; "
+                  "app = QApplication(sys.argv[:1]); w = MainWindow(); w.show(); app.processEvents()"),
+]
+
+
+def run(code, dir, runs):
+    """Return the median wall time of running the code in fresh interpreters"""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code, dir], check=True, cwd=ROOT, env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=11, help="interpreters started per case")
+    args = parser.parse_args()
+
+    dir = tempfile.mkdtemp(prefix="sfb_bench_")
+    try:
+        generateTree(dir, depth=2, fanout=5, filesPerDir=10)
+        run(CASES[-1][1], dir, 1)  # Writes the compiled modules and the cached form
+        for label, code in CASES:
+            print(f"{label:>14}: {1e3 * run(code, dir, args.runs):7.1f} ms")
+    finally:
+        shutil.rmtree(dir)
+
+
+if __name__ == '__main__':
+    main()
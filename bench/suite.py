@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 22:10 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Benchmark suite. Synthetic trees of the chosen shapes are generated and the scan, the classification, the aggregate
+queries, Model.data() and the painting of the PercentBarDelegate are measured on each of them. The GUI parts run
+on the offscreen Qt platform. The results are written as JSON and can be compared with a stored baseline; the exit
+code is 1 if any result is worse than the baseline by more than the tolerance.
+
+    python -m bench.suite [--shapes balanced deep wide] [--sizes tiny] [--binary-ratio 0.3]
+                          [--output results.json] [--baseline baseline.json] [--tolerance 0.25]
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication, QStyleOptionViewItem
+
+from bench.tree_generator import generateShape, SHAPES, SIZES
+from src.classifier import ClassificationEngine
+from src.dir_manager import DirManager, Dir
+from src.mainwindow import Model, PercentBarDelegate
+from src.utils import isText
+
+
+def measure(fn, repeat=3):
+    """Return the best time of repeated calls of fn"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def result(value, unit, better="lower"):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def benchScan(tree, nfiles, repeat):
+    t = measure(lambda: DirManager(dir=tree, classify=False), repeat)
+    return {"scan": result(t, "s"), "scanRate": result(nfiles / t, "files/s", "higher")}
+
+
+def benchClassify(tree, nfiles, repeat):
+    mgr = DirManager(dir=tree, classify=False)
+    files = list(mgr.dir.allFiles())
+
+    def classify():
+        for file in files:
+            file.invalidate()
+        ClassificationEngine().classify(files)
+
+    t = measure(classify, repeat)
+    paths = [f.path for f in files]
+    tText = measure(lambda: [isText(p) for p in paths], repeat)
+    return {"classify": result(t, "s"), "classifyRate": result(nfiles / t, "files/s", "higher"),
+            "isText": result(1e6 * tText / len(paths), "us/file")}
+
+
+def benchAggregates(mgr, repeat):
+    dirs = [item for path, item in mgr.items.items() if isinstance(item, Dir)]
+    paths = [d.path for d in dirs]
+
+    def query():
+        for dir in dirs:
+            dir.binCount(), dir.binSize(), dir.txtCount(), dir.totalFiles(), dir.complete()
+
+    def lookup():
+        for path in paths:
+            mgr.items.get(path)
+
+    return {"aggregateQuery": result(1e6 * measure(query, repeat) / len(dirs), "us/dir"),
+            "itemLookup": result(1e6 * measure(lookup, repeat) / len(paths), "us/path")}
+
+
+def modelIndexes(model, mgr, limit):
+    """Indexes of up to limit files and directories of the tree, in the column of the given role"""
+    files = []
+    dirs = []
+    for path, item in mgr.items.items():
+        if isinstance(item, Dir):
+            if len(dirs) < limit:
+                dirs.append(model.index(path, Model.DATACOL))
+        elif len(files) < limit:
+            files.append(model.index(path, 0))
+        if len(files) >= limit and len(dirs) >= limit:
+            break
+    return files, dirs
+
+
+def benchModel(tree, mgr, repeat, limit=2000):
+    model = Model()
+    model.setRootPath(tree)
+    model.setDirManager(mgr)
+    files, dirs = modelIndexes(model, mgr, limit)
+
+    def foreground():
+        for index in files:
+            model.data(index, Qt.ForegroundRole)
+
+    def totals():
+        for index in dirs:
+            model.data(index, Model.TotalBinaryRole)
+
+    results = {"dataForeground": result(1e6 * measure(foreground, repeat) / len(files), "us/call"),
+               "dataTotals": result(1e6 * measure(totals, repeat) / len(dirs), "us/call")}
+    model.stop()
+    return results
+
+
+def benchPaint(tree, mgr, repeat, limit=500):
+    model = Model()
+    model.setRootPath(tree)
+    model.setDirManager(mgr)
+    _, dirs = modelIndexes(model, mgr, limit)
+    delegate = PercentBarDelegate()
+    image = QImage(300, 24, QImage.Format_ARGB32_Premultiplied)
+    option = QStyleOptionViewItem()
+    option.rect = QRect(0, 0, 300, 24)
+
+    def paint():
+        painter = QPainter(image)
+        for index in dirs:
+            delegate.paint(painter, option, index)
+        painter.end()
+
+    t = measure(paint, repeat)
+    model.stop()
+    return {"paint": result(1e6 * t / len(dirs), "us/paint"), "paintFps": result(len(dirs) / t, "paints/s", "higher")}
+
+
+def runShape(shape, sizes, binaryRatio, repeat):
+    root = tempfile.mkdtemp(prefix="sfb_bench_")
+    try:
+        tree = os.path.join(root, "tree")
+        nfiles = generateShape(tree, shape, sizes=sizes, binaryRatio=binaryRatio)
+        results = {"files": result(nfiles, "files", "none")}
+        results.update(benchScan(tree, nfiles, repeat))
+        results.update(benchClassify(tree, nfiles, repeat))
+        mgr = DirManager(dir=tree)
+        results.update(benchAggregates(mgr, repeat))
+        results.update(benchModel(tree, mgr, repeat))
+        results.update(benchPaint(tree, mgr, repeat))
+        return results
+    finally:
+        shutil.rmtree(root)
+
+
+def compare(results, baseline, tolerance):
+    """Print the comparison with the baseline and return the names of the regressed results"""
+    regressions = []
+    for name, current in sorted(results.items()):
+        old = baseline.get(name)
+        if old is None or current["better"] == "none" or not old["value"]:
+            continue
+        ratio = current["value"] / old["value"]
+        worse = ratio - 1 if current["better"] == "lower" else 1 / max(ratio, 1e-12) - 1
+        flag = "REGRESSION" if worse > tolerance else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:32} {old['value']:14.4g} -> {current['value']:14.4g} {current['unit']:10} {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shapes", nargs="+", choices=sorted(SHAPES), default=["balanced", "deep", "wide"])
+    parser.add_argument("--sizes", choices=sorted(SIZES), default="tiny", help="file size distribution")
+    parser.add_argument("--binary-ratio", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results with this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    for shape in args.shapes:
+        for name, value in runShape(shape, args.sizes, args.binary_ratio, args.repeat).items():
+            results[f"{shape}.{name}"] = value
+            print(f"{shape + '.' + name:32} {value['value']:14.4g} {value['unit']}")
+
+    report = {"meta": {"python": platform.python_version(), "platform": platform.platform(),
+                       "cpus": os.cpu_count(), "sizes": args.sizes, "binaryRatio": args.binary_ratio,
+                       "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+              "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        print(f"\nComparison with {args.baseline} (tolerance {args.tolerance:.0%})")
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 09:41 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Generator of synthetic directory trees used by the benchmarks
+"""
+
+__all__ = ['generateTree', 'generateShape', 'SHAPES', 'SIZES']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import random
+
+BINARY_CONTENT = bytes([120, 3, 255, 0, 100])
+TEXT_CONTENT = b"blabla\n"
+
+# File size distributions: functions of a random.Random returning the size in bytes. None keeps the file contents
+# at their minimum length
+SIZES = {
+    "tiny": None,
+    "uniform": lambda rnd: rnd.randint(0, 64 * 1024),
+    "lognormal": lambda rnd: min(int(rnd.lognormvariate(8, 2)), 64 * 1024 * 1024),
+}
+
+# Typical tree shapes as keyword arguments of generateTree
+SHAPES = {
+    "balanced": dict(depth=3, fanout=6, filesPerDir=20),
+    "deep": dict(depth=300, fanout=1, filesPerDir=10),
+    "wide": dict(depth=1, fanout=1000, filesPerDir=3),
+    "flat": dict(depth=0, fanout=0, filesPerDir=20000),
+}
+
+
+def content(template, size):
+    """Return size bytes repeating the template. A binary template is kept whole, so that the file stays binary"""
+    if size is None:
+        return template
+    if template is BINARY_CONTENT:
+        size = max(size, len(template))
+    return (template * (size // len(template) + 1))[:size]
+
+
+def generateTree(root, depth=3, fanout=4, filesPerDir=10, binaryRatio=0.3, seed=0, sizes=None):
+    """
+    Create a tree of directories under root, in which every directory has fanout subdirectories (down to the
+    given depth) and filesPerDir files. Returns the number of files created.
+
+    :param sizes: name of a size distribution in SIZES or a function of a random.Random returning the file size
+    """
+    rnd = random.Random(seed)
+    if isinstance(sizes, str):
+        sizes = SIZES[sizes]
+    nfiles = 0
+    stack = [(root, 0)]
+    while stack:
+        path, level = stack.pop()
+        os.makedirs(path, exist_ok=True)
+        for i in range(filesPerDir):
+            binary = rnd.random() < binaryRatio
+            size = sizes(rnd) if sizes is not None else None
+            with open(os.path.join(path, f"file{i}.{'dat' if binary else 'txt'}"), 'wb') as f:
+                f.write(content(BINARY_CONTENT if binary else TEXT_CONTENT, size))
+            nfiles += 1
+        if level < depth:
+            stack.extend((os.path.join(path, f"d{i}"), level + 1) for i in range(fanout))
+    return nfiles
+
+
+def generateShape(root, shape="balanced", **kwargs):
+    """Create a tree of one of the SHAPES; the keyword arguments override those of the shape"""
+    return generateTree(root, **dict(SHAPES[shape], **kwargs))
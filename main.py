@@ -8,12 +8,13 @@ Created on 19.11.2021 16:08 11
 __date__ = '2021-11-19'
 __authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
 
+import argparse
 import logging
 import os
 import sys
-from PyQt5.QtWidgets import *
 
-from src import MainWindow
+from src import cli
+from src.stats import stats, profiled
 
 
 def print_exceptions(etype, value, tb):
@@ -24,19 +25,31 @@ def print_exceptions(etype, value, tb):
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Shows which files of a directory tree are binary")
+    parser.add_argument("dir", nargs="?", help="directory to open in the GUI")
+    parser.add_argument("--open-snapshot", metavar="FILE", help="open the tree saved in the snapshot FILE in the GUI")
+    cli.addArguments(parser)
+    args = parser.parse_args()
+
     logging.basicConfig(level=logging.INFO,
                         format="%(asctime)s [%(levelname)s] %(message)s",
                         handlers=[
-                            logging.StreamHandler(sys.stdout)
+                            # Keep the standard output clean for the results of a headless scan
+                            logging.StreamHandler(sys.stderr if args.scan or args.diff else sys.stdout)
                         ]
                         )
-    app = QApplication(sys.argv)
-    if len(sys.argv)>1:
-        dir = sys.argv[1]
-    else:
-        dir = None
-    gui = MainWindow(dir=dir)
-    gui.model.setRootPath(os.getcwd())
-    gui.show()
-
-    sys.exit(app.exec_())
+    with profiled(args.profile):
+        if args.scan or args.diff:
+            code = cli.run(args)
+        else:
+            from PyQt5.QtWidgets import QApplication
+            from src import MainWindow
+
+            app = QApplication(sys.argv)
+            gui = MainWindow(dir=args.dir, snapshot=args.open_snapshot)
+            gui.model.setRootPath(os.getcwd())
+            gui.show()
+            code = app.exec_()
+    if args.stats:
+        print(stats.report(), file=sys.stderr)
+    sys.exit(code)
@@ -1,14 +1,29 @@
 # -*- coding: utf-8 -*-
 """
 Created on 19.11.2021 16:13 11
- 
+
 @author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+The names below are imported on first access, so that importing the core modules (e.g. src.dir_manager or src.cli)
+does not load the GUI and PyQt5
 """
 
 __all__ = ['MainWindow', 'PercentBar']
 __date__ = '2021-11-19'
 __authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
 
-from .mainwindow import MainWindow
-from .utils import isText
-from .percent_bar import PercentBar
\ No newline at end of file
+import importlib
+
+_LAZY = {"MainWindow": ".mainwindow", "PercentBar": ".percent_bar", "isText": ".utils"}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
@@ -0,0 +1,441 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 20.10.2026 10:30 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Proxy models of the Model of the main window: BinaryFilterModel hides the items below thresholds of their binary
+numbers and BinarySortModel adds the columns of the binary numbers and sorts the tree by them. The proxies take the
+roles and the numbers from the Model at the bottom of their chain of sources, so they do not import it.
+"""
+
+__all__ = ['BinaryFilterModel', 'BinarySortModel', 'modelIndex']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import time
+import typing
+
+from PyQt5.QtCore import Qt, QAbstractItemModel, QAbstractProxyModel, QModelIndex, QObject, QPersistentModelIndex, \
+    QSortFilterProxyModel, QTimer, pyqtSlot
+
+from .dir_manager import Dir
+from .stats import stats
+
+
+def modelIndex(index):
+    """Map an index of a chain of proxies, e.g. of a view, to the index of the underlying model"""
+    while isinstance(index.model(), QAbstractProxyModel):
+        index = index.model().mapToSource(index)
+    return index
+
+
+class BinaryFilterModel(QSortFilterProxyModel):
+    """
+    Proxy of the Model hiding the items below thresholds of their binary numbers. The rows keep the order of the
+    Model; a row is filtered again whenever the Model reports a change of its numbers
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.minFiles = 0
+        self.minBytes = 0
+        self.minShare = 0.0
+
+    def setThresholds(self, files=0, bytes=0, share=0.0):
+        """Hide the items with fewer binary files, bytes or a smaller share of them; zeros show all items"""
+        self.minFiles = files
+        self.minBytes = bytes
+        self.minShare = share
+        self.invalidateFilter()
+
+    def setSourceModel(self, source: QAbstractItemModel) -> None:
+        super().setSourceModel(source)
+        self.setFilterRole(source.FilterRole)
+
+    def filterAcceptsRow(self, row: int, parent: QModelIndex) -> bool:
+        if not (self.minFiles or self.minBytes or self.minShare):
+            return True
+        model = self.sourceModel()
+        item = model.item(model.index(row, 0, parent))
+        if item is None or item.parent is None:
+            return True  # Outside of the analyzed tree or its root
+        values = model.itemValues(item)
+        if values is None:
+            return True  # Not classified yet
+        files, bytes, share = values
+        return files >= self.minFiles and bytes >= self.minBytes and share >= self.minShare
+
+
+class _Level:
+    """The rows of the children of one parent in a BinarySortModel"""
+    __slots__ = ("parent", "toSource", "fromSource", "dirty", "stale")
+
+    def __init__(self, parent):
+        self.parent = parent  # QPersistentModelIndex of the parent in the source; invalid for the top level
+        self.toSource = None  # Proxy row -> source row; None while the rows are in the order of the source
+        self.fromSource = None  # Source row -> proxy row, -1 for the rows being removed
+        self.dirty = False  # Whether the numbers of the rows may have changed since they were sorted
+        self.stale = False  # Whether the cached numbers of all rows have to be looked up again
+
+    def setOrder(self, toSource, nsource=None):
+        self.toSource = toSource
+        fromSource = [-1] * (len(toSource) if nsource is None else nsource)
+        for row, sourceRow in enumerate(toSource):
+            fromSource[sourceRow] = row
+        self.fromSource = fromSource
+
+
+class BinarySortModel(QAbstractProxyModel):
+    """
+    Proxy of the Model, directly or through a BinaryFilterModel, adding the columns of the binary numbers and
+    sorting the tree by them. QSortFilterProxyModel would call a Python lessThan for every comparison, which takes
+    seconds for a level of 100k rows; here a level is sorted at once by Python, with the numbers looked up once per
+    row and cached per item, and the proxy keeps the permutation of every sorted level. The other columns are sorted
+    by the Model itself. Levels, whose numbers have changed, are sorted again after RESORT_INTERVAL ms
+    """
+    # Columns appended to those of the source: the binary files, their bytes and their share in percent
+    BINCOUNTCOL = 4
+    BINSIZECOL = 5
+    BINSHARECOL = 6
+    HEADERS = {BINCOUNTCOL: "Binary files", BINSIZECOL: "Binary bytes", BINSHARECOL: "Binary %"}
+    # Column clicked -> binary column sorted by; the percent bars of the Model (Model.DATACOL) are sorted by the share
+    SORTED = {BINCOUNTCOL: BINCOUNTCOL, BINSIZECOL: BINSIZECOL, BINSHARECOL: BINSHARECOL}
+    UNKNOWN = (-1, -1, -1.0)  # Sort key of the items without numbers
+    PLAIN_ROLES = frozenset((Qt.BackgroundRole, Qt.ToolTipRole))  # Roles of the source not affecting the numbers
+    RESORT_INTERVAL = 250
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.base = None  # The Model at the bottom of the chain of sources
+        self.nsource = 0  # Number of the columns of the source
+        self.top = _Level(QPersistentModelIndex())
+        self.levels = {}  # QPersistentModelIndex of a parent in the source -> _Level of its children
+        self.retired = []  # Levels of removed parents, kept alive for the indexes that may still refer to them
+        self.keys = {}  # Internal id of an index of the Model -> binary numbers of its item
+        self.keyColumn = None  # Binary column the rows are sorted by; None in the order of the source
+        self.order = Qt.AscendingOrder
+        self.pending = []  # Per insertion or removal of source rows in progress: whether its level is sorted
+        self.saved = None  # Persistent indexes during a change of the layout of the source
+        self.connections = []
+        self.resortTimer = QTimer(self)
+        self.resortTimer.setSingleShot(True)
+        self.resortTimer.setInterval(BinarySortModel.RESORT_INTERVAL)
+        self.resortTimer.timeout.connect(self.resort)
+
+    def setSourceModel(self, source: QAbstractItemModel) -> None:
+        for signal, slot in self.connections:
+            signal.disconnect(slot)
+        self.beginResetModel()
+        super().setSourceModel(source)
+        self.base = source
+        while isinstance(self.base, QAbstractProxyModel):
+            self.base = self.base.sourceModel()
+        self.nsource = source.columnCount()
+        self.connections = [
+            (source.dataChanged, self.onDataChanged), (source.headerDataChanged, self.headerDataChanged),
+            (source.rowsAboutToBeInserted, self.onRowsAboutToBeInserted), (source.rowsInserted, self.onRowsInserted),
+            (source.rowsAboutToBeRemoved, self.onRowsAboutToBeRemoved), (source.rowsRemoved, self.onRowsRemoved),
+            (source.layoutAboutToBeChanged, self.onLayoutAboutToBeChanged),
+            (source.layoutChanged, self.onLayoutChanged), (source.modelAboutToBeReset, self.beginResetModel),
+            (source.modelReset, self.onModelReset), (self.base.managerChanged, self.onManagerChanged),
+            (self.base.rowsRemoved, self.clearKeys)]  # The ids of the removed items may be reused
+        for signal, slot in self.connections:
+            signal.connect(slot)
+        self.resetLevels()
+        self.endResetModel()
+
+    def resetLevels(self):
+        self.retired.extend(self.levels.values())
+        self.levels = {}
+        self.top.toSource = self.top.fromSource = None
+        if self.keyColumn is not None:
+            self.sortLevel(self.top)
+
+    def level(self, sourceParent):
+        """Return the _Level of the children of the source index; it is created, and sorted, on first use"""
+        if not sourceParent.isValid():
+            return self.top
+        key = QPersistentModelIndex(sourceParent)
+        level = self.levels.get(key)
+        if level is None:
+            level = self.levels[key] = _Level(key)
+            if self.keyColumn is not None:
+                self.sortLevel(level)
+        return level
+
+    def levelRows(self, level, sourceParent):
+        if level.toSource is not None:
+            return len(level.toSource)
+        return self.sourceModel().rowCount(sourceParent)
+
+    def mapToSource(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        level = index.internalPointer()
+        row = index.row()
+        if level.toSource is not None:
+            row = level.toSource[row]
+        column = index.column()
+        # The binary columns are mapped to the first column of their row
+        return self.sourceModel().index(row, column if column < self.nsource else 0, QModelIndex(level.parent))
+
+    def mapFromSource(self, source: QModelIndex) -> QModelIndex:
+        if not source.isValid():
+            return QModelIndex()
+        level = self.level(source.parent())
+        row = source.row()
+        if level.fromSource is not None:
+            row = level.fromSource[row] if row < len(level.fromSource) else -1
+            if row < 0:
+                return QModelIndex()
+        return self.createIndex(row, source.column(), level)
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if row < 0 or column < 0 or column >= self.columnCount(parent):
+            return QModelIndex()
+        sourceParent = self.mapToSource(parent)
+        level = self.level(sourceParent)
+        if row >= self.levelRows(level, sourceParent):
+            return QModelIndex()
+        return self.createIndex(row, column, level)
+
+    def parent(self, child: QModelIndex = None) -> QModelIndex:
+        if child is None:
+            return QObject.parent(self)
+        if not child.isValid():
+            return QModelIndex()
+        level = child.internalPointer()
+        if level is self.top:
+            return QModelIndex()
+        return self.mapFromSource(QModelIndex(level.parent))
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        sourceParent = self.mapToSource(parent)
+        return self.levelRows(self.level(sourceParent), sourceParent)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.column() > 0 or self.sourceModel() is None:
+            return 0
+        return self.nsource + len(BinarySortModel.HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> typing.Any:
+        if index.column() < self.nsource:
+            return self.sourceModel().data(self.mapToSource(index), role)
+        if role == Qt.DisplayRole:
+            values = self.base.binaryValues(modelIndex(self.mapToSource(index)))
+            if values is None:
+                return None
+            value = values[index.column() - BinarySortModel.BINCOUNTCOL]
+            return f"{value:0.1f}" if index.column() == BinarySortModel.BINSHARECOL else f"{value:,}"
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignRight | Qt.AlignVCenter
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> typing.Any:
+        if orientation == Qt.Horizontal and section in BinarySortModel.HEADERS:
+            return BinarySortModel.HEADERS[section] if role == Qt.DisplayRole else None
+        if self.sourceModel() is None:
+            return None
+        return self.sourceModel().headerData(section, orientation, role)
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.AscendingOrder) -> None:
+        keyColumn = BinarySortModel.BINSHARECOL if column == self.base.DATACOL else BinarySortModel.SORTED.get(column)
+        self.layoutAboutToBeChanged.emit()
+        saved = self.savePersistent()
+        self.keyColumn = keyColumn
+        self.order = order
+        for level in [self.top] + list(self.levels.values()):
+            if keyColumn is None:
+                level.toSource = level.fromSource = None
+            else:
+                self.sortLevel(level)
+        self.restorePersistent(saved)
+        self.layoutChanged.emit()
+        if keyColumn is None and column >= 0:
+            self.base.sort(column, order)
+
+    def key(self, index, parentItem=None):
+        """
+        Return the binary numbers of the index of the Model, cached by its internal id. The item is looked up in
+        the Dir of the parent, if given, instead of by its path
+        """
+        id = index.internalId()
+        key = self.keys.get(id)
+        if key is None:
+            if isinstance(parentItem, Dir):
+                item = parentItem.child(self.base.fileName(index))
+            else:
+                item = self.base.item(index)
+            key = self.keys[id] = self.base.itemValues(item) or BinarySortModel.UNKNOWN
+        return key
+
+    def sortedRows(self, level):
+        """Return the source rows of the level in the order of the key column"""
+        start = time.perf_counter()
+        source = self.sourceModel()
+        parent = QModelIndex(level.parent)
+        indexes = [modelIndex(source.index(row, 0, parent)) for row in range(source.rowCount(parent))]
+        if level.stale:
+            for index in indexes:
+                self.keys.pop(index.internalId(), None)
+            level.stale = False
+        parentItem = self.base.item(modelIndex(parent)) if parent.isValid() else None
+        i = self.keyColumn - BinarySortModel.BINCOUNTCOL
+        keys = [self.key(index, parentItem)[i] for index in indexes]
+        rows = sorted(range(len(keys)), key=keys.__getitem__, reverse=self.order == Qt.DescendingOrder)
+        stats.add("sort", time.perf_counter() - start)
+        return rows
+
+    def sortLevel(self, level):
+        level.setOrder(self.sortedRows(level))
+        level.dirty = False
+
+    def markDirty(self, level):
+        level.dirty = True
+        if self.keyColumn is not None and not self.resortTimer.isActive():
+            self.resortTimer.start()
+
+    @pyqtSlot()
+    def resort(self):
+        """Sort the levels, whose numbers have changed, again"""
+        if self.keyColumn is None:
+            return
+        orders = {}
+        for level in [self.top] + list(self.levels.values()):
+            if level.dirty and level.toSource is not None:
+                level.dirty = False
+                rows = self.sortedRows(level)
+                if rows != level.toSource:
+                    orders[level] = rows
+        if not orders:
+            return
+        self.layoutAboutToBeChanged.emit()
+        saved = self.savePersistent()
+        for level, rows in orders.items():
+            level.setOrder(rows)
+        self.restorePersistent(saved)
+        self.layoutChanged.emit()
+
+    def savePersistent(self):
+        indexes = self.persistentIndexList()
+        return indexes, [(QPersistentModelIndex(self.mapToSource(index)), index.column()) for index in indexes]
+
+    def restorePersistent(self, saved):
+        indexes, sources = saved
+        new = []
+        for source, column in sources:
+            index = self.mapFromSource(QModelIndex(source))
+            if index.isValid() and index.column() != column:
+                index = self.createIndex(index.row(), column, index.internalPointer())
+            new.append(index)
+        self.changePersistentIndexList(indexes, new)
+
+    def purge(self):
+        """Retire the levels of the parents removed from the source"""
+        for key in [key for key in self.levels if not key.isValid()]:
+            self.retired.append(self.levels.pop(key))
+
+    def clearKeys(self, *args):
+        self.keys.clear()
+
+    @pyqtSlot()
+    def onManagerChanged(self):
+        self.keys.clear()
+        for level in [self.top] + list(self.levels.values()):
+            self.markDirty(level)
+
+    def onDataChanged(self, topLeft, bottomRight, roles=()):
+        parent = topLeft.parent()
+        level = self.levels.get(QPersistentModelIndex(parent)) if parent.isValid() else self.top
+        source = self.sourceModel()
+        rows = range(topLeft.row(), bottomRight.row() + 1)
+        numbers = not roles or not BinarySortModel.PLAIN_ROLES.issuperset(roles)
+        for row in rows if numbers else ():
+            index = source.index(row, 0, parent)
+            self.keys.pop(modelIndex(index).internalId(), None)
+            children = self.levels.get(QPersistentModelIndex(index))
+            if children is not None and children.toSource is not None:
+                # The numbers of a directory change with those of its files
+                children.stale = True
+                self.markDirty(children)
+        if level is None:
+            # No index of the rows has been handed out, so there is nothing to sort or repaint
+            return
+        if level.toSource is not None:
+            if numbers:
+                self.markDirty(level)
+            rows = [row for row in (level.fromSource[row] for row in rows) if row >= 0]
+            if not rows:
+                return
+        # The binary columns depend on all changes of the numbers
+        self.dataChanged.emit(self.createIndex(min(rows), topLeft.column(), level),
+                              self.createIndex(max(rows), self.columnCount() - 1, level), roles)
+
+    def onRowsAboutToBeInserted(self, parent, first, last):
+        level = self.level(parent)
+        sorted = level.toSource is not None
+        self.pending.append(sorted)
+        if sorted:
+            # Appended; sorted into place with the next resort
+            first, last = len(level.toSource), len(level.toSource) + last - first
+        self.beginInsertRows(self.mapFromSource(parent), first, last)
+
+    def onRowsInserted(self, parent, first, last):
+        if self.pending.pop():
+            level = self.level(parent)
+            count = last - first + 1
+            level.setOrder([row + count if row >= first else row for row in level.toSource] +
+                           list(range(first, last + 1)))
+            self.markDirty(level)
+        self.endInsertRows()
+
+    def onRowsAboutToBeRemoved(self, parent, first, last):
+        level = self.level(parent)
+        proxyParent = self.mapFromSource(parent)
+        self.pending.append(level.toSource is not None)
+        if level.toSource is None:
+            self.beginRemoveRows(proxyParent, first, last)
+            return
+        # The rows are scattered in the sorted level: they are removed in contiguous ranges, from the bottom
+        nsource = len(level.fromSource)
+        rows = sorted(level.fromSource[row] for row in range(first, last + 1))
+        while rows:
+            end = start = rows.pop()
+            while rows and rows[-1] == start - 1:
+                start = rows.pop()
+            self.beginRemoveRows(proxyParent, start, end)
+            del level.toSource[start:end + 1]
+            level.setOrder(level.toSource, nsource)
+            self.endRemoveRows()
+
+    def onRowsRemoved(self, parent, first, last):
+        if self.pending.pop():
+            level = self.level(parent)
+            count = last - first + 1
+            level.setOrder([row - count if row > last else row for row in level.toSource])
+        else:
+            self.endRemoveRows()
+        self.purge()
+
+    def onLayoutAboutToBeChanged(self, *args):
+        self.layoutAboutToBeChanged.emit()
+        self.saved = self.savePersistent()
+
+    def onLayoutChanged(self, *args):
+        self.purge()
+        if self.keyColumn is not None:
+            # The source rows have been permuted
+            for level in [self.top] + list(self.levels.values()):
+                self.sortLevel(level)
+        if self.saved is not None:
+            self.restorePersistent(self.saved)
+            self.saved = None
+        self.layoutChanged.emit()
+
+    def onModelReset(self):
+        self.keys.clear()
+        self.resetLevels()
+        self.endResetModel()
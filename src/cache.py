@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 14:10 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Persistent cache of the binary/text classification results, so that files unchanged since the last session
+do not have to be read again. The results are stored in an SQLite database in the user cache directory and
+identified by the device and inode of the file. A result is only valid if the size and the modification time
+of the file have not changed.
+"""
+
+__all__ = ['ClassificationCache', 'defaultCachePath']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from src.stats import stats
+
+
+def defaultCachePath():
+    """Return the path of the cache database in the platform's user cache directory"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "SimpleFileBrowser", "classification.sqlite")
+
+
+class ClassificationCache:
+    """
+    Cache of the classification results keyed by (device, inode, size, mtime_ns). Lookups and inserts are done in
+    bulk. The number of entries is limited to maxEntries; the least recently used entries are evicted first.
+    The cache can be used from several threads.
+    """
+    BATCH = 500  # Maximum number of keys in a single query
+
+    def __init__(self, path=None, maxEntries=2000000, readonly=False):
+        self.path = path or defaultCachePath()
+        self.maxEntries = maxEntries
+        self.readonly = readonly  # Lookups only, e.g. from worker processes; the entries are not marked as used
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+        if readonly:
+            self._db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._count = self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            return
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS files ("
+                         "ino INTEGER, dev INTEGER, size INTEGER, mtime INTEGER, binary INTEGER, used INTEGER, "
+                         "PRIMARY KEY (ino, dev)) WITHOUT ROWID")
+        self._db.execute("CREATE INDEX IF NOT EXISTS files_used ON files (used)")
+        self._db.commit()
+        self._count = self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    @classmethod
+    def open(cls, path=None, maxEntries=2000000, readonly=False):
+        """Return the cache or None, if the database cannot be opened"""
+        try:
+            return cls(path, maxEntries, readonly)
+        except (OSError, sqlite3.Error) as e:
+            logging.warning(f"Classification cache not available: {e}")
+            return None
+
+    def __len__(self):
+        return self._count
+
+    def lookup(self, keys):
+        """
+        Look the results up.
+
+        :param keys: iterable of (device, inode, size, mtime_ns) tuples
+        :return: dict mapping the keys found in the cache to the binary flags
+        """
+        keys = list(keys)
+        found = {}
+        now = time.time_ns()
+        with self._lock:
+            for i in range(0, len(keys), self.BATCH):
+                batch = keys[i:i + self.BATCH]
+                rows = self._db.execute(f"SELECT dev, ino, size, mtime, binary FROM files WHERE ino IN "
+                                        f"({','.join('?' * len(batch))})", [k[1] for k in batch]).fetchall()
+                stored = {row[:4]: row[4] for row in rows}
+                used = []
+                for key in batch:
+                    if key in stored:
+                        found[key] = bool(stored[key])
+                        used.append((now, key[1], key[0]))
+                if not self.readonly:
+                    self._db.executemany("UPDATE files SET used=? WHERE ino=? AND dev=?", used)
+            if not self.readonly:
+                self._db.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        stats.count("cacheHits", len(found))
+        stats.count("cacheMisses", len(keys) - len(found))
+        return found
+
+    def store(self, results):
+        """
+        Store the results.
+
+        :param results: iterable of ((device, inode, size, mtime_ns), binary) tuples
+        """
+        now = time.time_ns()
+        rows = [(ino, dev, size, mtime, int(binary), now) for (dev, ino, size, mtime), binary in results]
+        if not rows:
+            return
+        with self._lock:
+            for i in range(0, len(rows), self.BATCH):
+                batch = rows[i:i + self.BATCH]
+                before = self._db.total_changes
+                self._db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", batch)
+                # REPLACE counts as a change too, so the count may overestimate; it is corrected on eviction
+                self._count += self._db.total_changes - before
+            if self._count > self.maxEntries:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Remove the least recently used entries, so that the cache is filled to 90%"""
+        self._count = self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        excess = self._count - int(0.9 * self.maxEntries)
+        if self._count <= self.maxEntries or excess <= 0:
+            return
+        self._db.execute("DELETE FROM files WHERE (ino, dev) IN (SELECT ino, dev FROM files ORDER BY used LIMIT ?)",
+                         (excess,))
+        self._count -= excess
+        self.evicted += excess
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM files")
+            self._db.commit()
+            self._count = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stats(self):
+        """Return a dict with the hit/miss statistics"""
+        total = self.hits + self.misses
+        return {"entries": self._count, "hits": self.hits, "misses": self.misses, "evicted": self.evicted,
+                "hitRate": self.hits / total if total else 0.0}
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 10:45 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Engine classifying files as binary or text concurrently. The files are read by a pool of worker threads
+(or processes), which only get the file paths. The results are applied to the File objects on the thread
+consuming them, so the tree and DirManager.items are never modified by the workers. The files are read in the order
+given by the ReadScheduler, by default the order of their inodes.
+"""
+
+__all__ = ['ClassificationEngine']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from src.scheduler import ReadScheduler
+from src.stats import stats
+from src.tiered import TieredClassifier
+from src.utils import isText
+
+
+def classifyBatch(paths, sizes=None, classifier=None):
+    """
+    Return the list of binary flags of the given paths and the counts of the classifier. Runs in the workers
+
+    :param sizes: optional list of the file sizes
+    :param classifier: TieredClassifier; None checks every file fully with isText
+    """
+    if classifier is None:
+        return [not isText(path) for path in paths], {"tierFull": len(paths)}
+    classifier = classifier.forBatch()
+    return classifier.classifyAll(paths, sizes), classifier.counts
+
+
+class ClassificationEngine:
+    """Classifies File objects in batches using a thread pool (default) or a process pool"""
+
+    CACHE_CHUNK = 5000  # Number of files looked up in the cache at once
+
+    def __init__(self, workers=None, processes=False, batchSize=64, cache=None, classifier=None, scheduler=None):
+        if workers is None:
+            # Reading is I/O bound, so there may be more threads than cores. Processes are limited by the cores
+            workers = (os.cpu_count() or 1) if processes else min(32, (os.cpu_count() or 1) + 4)
+        self.workers = max(1, workers)
+        self.processes = processes
+        self.batchSize = batchSize
+        self.cache = cache  # Optional ClassificationCache
+        self.classifier = classifier if classifier is not None else TieredClassifier()
+        self.scheduler = scheduler if scheduler is not None else ReadScheduler()
+        self.classified = 0  # Number of files classified so far
+        self.elapsed = 0.0  # Time spent classifying so far [s]
+
+    def rate(self):
+        """Return the throughput in files per second"""
+        if self.elapsed == 0:
+            return 0.0
+        return self.classified / self.elapsed
+
+    def batches(self, files, cancelled=None):
+        """
+        Classify the files, that have not been classified yet, and yield lists of (file, binary) tuples as the
+        batches are completed. The results are not applied to the files.
+
+        :param files: iterable of File objects
+        :param cancelled: optional callable. If it returns True, pending batches are dropped and the iteration stops
+        """
+        files = [f for f in files if f.binary is None]
+        start = time.perf_counter()
+        links = None
+        if any(f.primary is not None for f in files):
+            files, known, links = self.shareLinks(files)
+            if known:
+                yield known
+        try:
+            if self.cache is not None:
+                missing = []
+                for i in range(0, len(files), self.CACHE_CHUNK):
+                    if cancelled is not None and cancelled():
+                        return
+                    chunk = files[i:i + self.CACHE_CHUNK]
+                    found = self.cache.lookup(k for k in (f.cacheKey() for f in chunk) if k is not None)
+                    hits = [f for f in chunk if f.cacheKey() in found]
+                    missing.extend(f for f in chunk if f.cacheKey() not in found)
+                    if hits:
+                        yield self.withLinks(self._done(hits, [found[f.cacheKey()] for f in hits], store=False), links)
+                files = missing
+            files = self.scheduler.schedule(files)
+            chunks = [files[i:i + self.batchSize] for i in range(0, len(files), self.batchSize)]
+            if len(chunks) <= 1 or self.workers == 1:
+                for chunk in chunks:
+                    if cancelled is not None and cancelled():
+                        return
+                    yield self.withLinks(self._done(chunk, *self._classify(chunk)), links)
+                return
+            if self.processes:
+                # Imported on use: it loads multiprocessing, which would slow down every import of the engine
+                from concurrent.futures import ProcessPoolExecutor as executor
+            else:
+                executor = ThreadPoolExecutor
+            with executor(max_workers=self.workers) as pool:
+                pending = iter(chunks)
+                inflight = {}
+                # Keep a bounded number of batches in flight instead of submitting the whole tree at once
+                for chunk in pending:
+                    inflight[self._submit(pool, chunk)] = chunk
+                    if len(inflight) >= 2 * self.workers:
+                        break
+                while inflight:
+                    done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        chunk = inflight.pop(future)
+                        yield self.withLinks(self._done(chunk, *future.result()), links)
+                        if cancelled is not None and cancelled():
+                            for f in inflight:
+                                f.cancel()
+                            return
+                        for chunk in pending:
+                            inflight[self._submit(pool, chunk)] = chunk
+                            break
+        finally:
+            self.elapsed += time.perf_counter() - start
+            stats.add("classify", time.perf_counter() - start)
+
+    @staticmethod
+    def shareLinks(files):
+        """
+        Split the hard links (File.primary) off the files, so that each file is read once, with its primary.
+
+        :return: tuple (files, known, links): the files to be read, including the primaries not classified yet,
+            the (link, binary) results of the links whose primary is classified already and the dict of the links
+            waiting for the result of each primary
+        """
+        unique = [f for f in files if f.primary is None]
+        queued = set(unique)
+        known = []
+        links = {}
+        for link in files:
+            primary = link.primary
+            if primary is None:
+                continue
+            if primary.statKey != link.statKey:  # The primary has been modified or replaced meanwhile
+                unique.append(link)
+            elif primary.binary is not None:
+                known.append((link, primary.binary))
+            else:
+                links.setdefault(primary, []).append(link)
+                if primary not in queued:
+                    queued.add(primary)
+                    unique.append(primary)
+        stats.count("linksShared", len(files) - len(queued))
+        return unique, known, links
+
+    @staticmethod
+    def withLinks(batch, links):
+        """Add the results of the hard links waiting for the files of the batch"""
+        if links:
+            batch.extend((link, binary) for file, binary in list(batch) for link in links.pop(file, ()))
+        return batch
+
+    def _classify(self, chunk):
+        return classifyBatch([f.path for f in chunk], [f.bytes for f in chunk], self.classifier)
+
+    def _submit(self, pool, chunk):
+        return pool.submit(classifyBatch, [f.path for f in chunk], [f.bytes for f in chunk], self.classifier)
+
+    def _done(self, chunk, results, counts=None, store=True):
+        self.classified += len(chunk)
+        stats.count("classified", len(chunk))
+        for name, n in (counts or {}).items():
+            stats.count(name, n)
+        pairs = list(zip(chunk, results))
+        if store and self.cache is not None:
+            self.cache.store((f.cacheKey(), binary) for f, binary in pairs if f.cacheKey() is not None)
+        return pairs
+
+    def classifyOne(self, file):
+        """Classify a single file on the calling thread and return whether it is binary"""
+        primary = file.primary
+        if primary is not None and primary.binary is not None and primary.statKey == file.statKey:
+            return primary.binary
+        key = file.cacheKey() if self.cache is not None else None
+        if key is not None:
+            found = self.cache.lookup([key])
+            if key in found:
+                return found[key]
+        return self._done([file], *self._classify([file]), store=key is not None)[0][1]
+
+    def classify(self, files, cancelled=None):
+        """
+        Classify the files and apply the results on the calling thread. Returns the number of files classified
+        """
+        classified = self.classified
+        elapsed = self.elapsed
+        for batch in self.batches(files, cancelled):
+            for file, binary in batch:
+                file.setBinary(binary)
+        n = self.classified - classified
+        if n:
+            dt = self.elapsed - elapsed
+            logging.info(f"Classified {n} files in {dt:0.2f} s ({n / max(dt, 1e-9):0.0f} files/s)")
+        return n
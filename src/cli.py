@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 19:55 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Headless scan of a directory tree, e.g. for cron jobs on machines without display. The results are streamed with
+one of the writers of the report module: a file record as soon as the file is classified and a directory record
+as soon as its whole subtree is done (i.e. children before their parents), followed by a summary.
+
+    python main.py --scan PATH [--format ndjson|json|csv] [--workers N] [--depth N] [--output FILE]
+                         [--exclude PATTERN]... [--gitignore] [--max-size BYTES]
+                         [--fast-classify] [--verify-classify] [--read-order inode|extent|listing]
+                         [--snapshot FILE [--compress-snapshot]]
+
+The differences between two scans, each given as a snapshot file or a directory to be analyzed, are written in the
+same formats: a delta record per changed directory and a record per added, removed, changed or flipped file.
+
+    python main.py --diff OLD NEW [--format ndjson|json|csv] [--output FILE]
+"""
+
+__all__ = ['scan', 'writeDiff', 'addArguments', 'run']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import logging
+import os
+import sys
+import time
+
+from .cache import ClassificationCache
+from .diff import diff, DirDelta, KINDS
+from .dir_manager import DirManager
+from .report import WRITERS, DIFF_COLUMNS, fileRecord, dirRecord, changeRecord, deltaRecord
+from .rules import ExcludeRules
+from .scheduler import ReadScheduler
+from .snapshot import Snapshot
+from .tiered import TieredClassifier
+
+CHUNK = 5000  # Number of files listed ahead of the classification
+
+
+def scan(path, writer, workers=None, depth=None, cache=None, cancelled=None, classifier=None, scheduler=None,
+         rules=None, snapshot=None, compress=False, followSymlinks=True, oneFilesystem=False, uniqueBytes=False):
+    """
+    Scan and classify the tree below path, writing the records with the writer as they are produced.
+    Directories deeper than depth levels below path are not scanned. The subtree of a directory is released as soon
+    as its record has been written, so the memory use does not grow with the size of the tree.
+
+    :param classifier: optional TieredClassifier replacing the default one
+    :param scheduler: optional ReadScheduler replacing the default one
+    :param rules: optional ExcludeRules; depth, if given, overrides their maxDepth
+    :param snapshot: optional path of a snapshot file, to which the tree is saved at the end. The tree is kept in
+                     memory then
+    :param compress: if True, the snapshot is compressed
+    :param followSymlinks, oneFilesystem, uniqueBytes: the traversal options of the DirManager
+
+    :return: the summary dict, also written as the last record
+    """
+    start = time.perf_counter()
+    path = os.path.normpath(path)
+    rules = rules if rules is not None else ExcludeRules()
+    if depth is not None:
+        rules.maxDepth = depth
+    mgr = DirManager(dir=path, workers=workers, lazy=True, cache=cache, classifier=classifier, scheduler=scheduler,
+                     rules=rules, followSymlinks=followSymlinks, oneFilesystem=oneFilesystem, uniqueBytes=uniqueBytes)
+    walker = mgr.walker()
+    done = set()  # Dirs written, until the batch in which their parent has been written is processed
+    released = []  # Dirs whose parent has been written
+    written = {}  # Dir -> number of its subdirectories written
+
+    def finish(dir):
+        """Write the records of the directory and its ancestors whose subtrees are done"""
+        while dir is not None and dir not in done and dir.complete() and \
+                dir.nTotalBin + dir.nTotalTxt == dir.nTotalFiles and written.get(dir, 0) == len(dir.dirs):
+            writer.write(dirRecord(dir.path, dir))
+            released.extend(dir.dirs)
+            done.add(dir)
+            written.pop(dir, None)
+            if snapshot is None:
+                dir.release()
+            dir = dir.parent
+            if dir is not None:
+                written[dir] = written.get(dir, 0) + 1
+
+    def files():
+        """Generator of the files of the tree, listing the directories on the way"""
+        pending = {path: mgr.dir}
+        for dirpath, dirs, entries in walker.walk(path):
+            if cancelled is not None and cancelled():
+                return
+            dir = pending.pop(dirpath)
+            newFiles, newDirs = dir.populate(dirs, entries)
+            for subdir in newDirs:
+                pending[os.path.join(dirpath, subdir.name)] = subdir
+            if newFiles:
+                yield from newFiles
+            else:
+                finish(dir)
+
+    def chunks():
+        """The files in chunks, because the engine takes all files passed to it at once"""
+        chunk = []
+        for file in files():
+            chunk.append(file)
+            if len(chunk) >= CHUNK:
+                yield chunk
+                chunk = []
+        yield chunk
+
+    writer.begin(path)
+    for chunk in chunks():
+        for batch in mgr.engine.batches(chunk, cancelled):
+            parents = set()
+            for file, binary in batch:
+                file.setBinary(binary)
+                writer.write(fileRecord(file.path, binary, file.size()))
+                parents.add(file.parent)
+            for dir in parents:
+                finish(dir)
+            done.difference_update(released)
+            released.clear()
+            writer.flush()
+    elapsed = time.perf_counter() - start
+    root = mgr.dir
+    summary = dirRecord(path, root)
+    del summary["type"]
+    summary.update(complete=root in done, seconds=round(elapsed, 3),
+                   rate=round(root.totalFiles() / max(elapsed, 1e-9), 1), prunedDirs=rules.prunedDirs,
+                   prunedFiles=rules.prunedFiles, prunedBytes=rules.prunedBytes, skippedDirs=walker.skipped)
+    writer.end(summary)
+    if snapshot is not None:
+        mgr.save(snapshot, compress)
+    return summary
+
+
+def writeDiff(old, new, writer, root=""):
+    """
+    Write the differences between the old and the new tree (Dir or Snapshot) with the writer.
+
+    :return: the summary dict with the numbers of the changes of each kind and the differences of the root numbers
+    """
+    start = time.perf_counter()
+    summary = dict.fromkeys(KINDS, 0)
+    summary.update(files=0, binFiles=0, txtFiles=0, binSize=0, txtSize=0)
+    writer.begin(root)
+    for record in diff(old, new):
+        if isinstance(record, DirDelta):
+            if record.path == os.curdir:
+                summary.update(record._asdict())
+                del summary["path"]
+            writer.write(deltaRecord(record))
+        else:
+            summary[record.kind] += 1
+            writer.write(changeRecord(record))
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    writer.end(summary)
+    return summary
+
+
+def addArguments(parser):
+    """Add the options of the headless scan and the diagnostics to the argparse parser"""
+    group = parser.add_argument_group("headless scan")
+    group.add_argument("--scan", metavar="PATH", help="scan PATH without GUI and write the results")
+    group.add_argument("--format", choices=sorted(WRITERS), default="ndjson", help="output format (default ndjson)")
+    group.add_argument("--output", metavar="FILE", help="output file (default standard output)")
+    group.add_argument("--workers", type=int, help="number of classification threads")
+    group.add_argument("--depth", type=int, help="maximum depth of the scanned directories below PATH")
+    group.add_argument("--exclude", metavar="PATTERN", action="append", default=[],
+                       help="leave out the paths matching the gitignore-style PATTERN; may be repeated")
+    group.add_argument("--gitignore", action="store_true", help="honour the .gitignore files in the tree")
+    group.add_argument("--max-size", type=int, metavar="BYTES", help="leave out the files larger than BYTES")
+    group.add_argument("--symlinks", choices=["follow", "skip"], default="follow",
+                       help="follow the symbolic links or leave them out (default follow)")
+    group.add_argument("--one-file-system", action="store_true",
+                       help="leave out the directories on other file systems than PATH")
+    group.add_argument("--unique-bytes", action="store_true",
+                       help="count the bytes of a file with several hard links once, not once per link")
+    group.add_argument("--snapshot", metavar="FILE", help="save the scanned tree to a snapshot FILE, e.g. for the GUI")
+    group.add_argument("--compress-snapshot", action="store_true", help="compress the snapshot")
+    group.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"),
+                       help="write the differences between two snapshot files or directories")
+    group.add_argument("--no-cache", action="store_true", help="do not use the persistent classification cache")
+    group.add_argument("--fast-classify", action="store_true",
+                       help="classify the files with well-known extensions without reading them")
+    group.add_argument("--verify-classify", action="store_true",
+                       help="check the fast classification against the full check and count the disagreements")
+    group.add_argument("--read-order", choices=["inode", "extent", "listing"], default="inode",
+                       help="order of the reads: by inode (default), by physical extent or as listed")
+    group = parser.add_argument_group("diagnostics")
+    group.add_argument("--stats", action="store_true", help="print the counters and timers of the phases at exit")
+    group.add_argument("--profile", metavar="FILE", help="profile the run with cProfile and write the profile to FILE")
+
+
+def traversal(args):
+    """Return the traversal options of the DirManager given by the parsed arguments"""
+    return dict(followSymlinks=args.symlinks == "follow", oneFilesystem=args.one_file_system,
+                uniqueBytes=args.unique_bytes)
+
+
+def run(args):
+    """Run the headless scan or diff as configured by the parsed arguments. Returns the exit code"""
+    if args.diff:
+        return runDiff(args)
+    if not os.path.isdir(args.scan):
+        logging.error(f"Not a directory: {args.scan}")
+        return 2
+    cache = None if args.no_cache else ClassificationCache.open()
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        classifier = TieredClassifier(extensions=args.fast_classify, verify=args.verify_classify)
+        scheduler = ReadScheduler(None if args.read_order == "listing" else args.read_order)
+        rules = ExcludeRules(args.exclude, maxSize=args.max_size, gitignore=args.gitignore)
+        summary = scan(args.scan, WRITERS[args.format](out), args.workers, args.depth, cache, classifier=classifier,
+                       scheduler=scheduler, rules=rules, snapshot=args.snapshot, compress=args.compress_snapshot,
+                       **traversal(args))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if cache is not None:
+            cache.close()
+    logging.info(f"Scanned {summary['files']} files ({summary['binFiles']} binary, {summary['txtFiles']} text) "
+                 f"in {summary['seconds']:0.2f} s")
+    if summary['prunedDirs'] or summary['prunedFiles']:
+        logging.info(f"Excluded {summary['prunedDirs']} directories and {summary['prunedFiles']} files "
+                     f"({summary['prunedBytes']} bytes)")
+    if summary['skippedDirs']:
+        logging.info(f"Left out {summary['skippedDirs']} directories reached again or on other file systems")
+    return 0
+
+
+def runDiff(args):
+    """Write the differences between the trees given by args.diff. Returns the exit code"""
+    cache = None if args.no_cache else ClassificationCache.open()
+    trees = []
+    try:
+        for path in args.diff:
+            if os.path.isdir(path):
+                rules = ExcludeRules(args.exclude, args.depth, args.max_size, args.gitignore)
+                trees.append(DirManager(dir=path, workers=args.workers, cache=cache, rules=rules,
+                                        **traversal(args)).dir)
+            else:
+                try:
+                    trees.append(Snapshot(path))
+                except (OSError, ValueError) as e:
+                    logging.error(f"Neither a directory nor a snapshot: {path} ({e})")
+                    return 2
+        out = open(args.output, "w", newline="") if args.output else sys.stdout
+        try:
+            summary = writeDiff(trees[0], trees[1], WRITERS[args.format](out, DIFF_COLUMNS), args.diff[1])
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    finally:
+        for tree in trees:
+            if isinstance(tree, Snapshot):
+                tree.close()
+        if cache is not None:
+            cache.close()
+    logging.info(f"{summary['added']} files added, {summary['removed']} removed, {summary['changed']} changed, "
+                 f"{summary['flipped']} flipped; binary files {summary['binFiles']:+d} ({summary['binSize']:+d} bytes)")
+    return 0
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 20:45 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Column-oriented representation of a (part of a) directory tree. Instead of one object per entry, the directories
+and files are stored as rows of typed arrays, which makes the data cheap to build, to serialize and to send between
+processes.
+"""
+
+__all__ = ['TreeColumns', 'UNKNOWN', 'CACHED']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+from array import array
+from collections import namedtuple
+
+UNKNOWN = 2  # Value of fileBinary for files not classified
+CACHED = 4  # Flag of fileBinary: the result has been taken from the cache
+
+FileStat = namedtuple("FileStat", "st_dev st_ino st_size st_mtime_ns st_nlink")
+
+
+class TreeColumns:
+    """
+    Directories and files in listing order. The parent of a directory is always stored before the directory, so a
+    tree can be rebuilt in a single pass. The first directories may be roots (parent -1), whose name is a full path.
+    dirDev and dirIno identify the directories (0 if not known), so that the ones reached again can be left out.
+    fileBinary holds 0 (text), 1 (binary) or UNKNOWN, possibly or'ed with CACHED.
+    """
+
+    def __init__(self):
+        self.dirNames = []
+        self.dirParent = array('i')
+        self.dirListed = bytearray()
+        self.dirDev = array('Q')
+        self.dirIno = array('Q')
+        self.fileNames = []
+        self.fileDir = array('i')
+        self.fileSize = array('q')
+        self.fileMtime = array('q')
+        self.fileIno = array('Q')
+        self.fileDev = array('Q')
+        self.fileNlink = array('Q')
+        self.fileBinary = bytearray()
+
+    def __len__(self):
+        """Number of entries (directories and files)"""
+        return len(self.dirParent) + len(self.fileDir)
+
+    def addDir(self, name, parent=-1):
+        """Add an unlisted directory and return its index"""
+        self.dirNames.append(name)
+        self.dirParent.append(parent)
+        self.dirListed.append(0)
+        self.dirDev.append(0)
+        self.dirIno.append(0)
+        return len(self.dirParent) - 1
+
+    def addFile(self, dir, name, stat):
+        """Add an unclassified file of the directory with given index, taking the data from the os.stat_result"""
+        self.fileNames.append(name)
+        self.fileDir.append(dir)
+        self.fileSize.append(stat.st_size)
+        self.fileMtime.append(stat.st_mtime_ns)
+        self.fileIno.append(stat.st_ino)
+        self.fileDev.append(stat.st_dev)
+        self.fileNlink.append(stat.st_nlink)
+        self.fileBinary.append(UNKNOWN)
+
+    def statKey(self, i):
+        """The (device, inode, size, mtime_ns) key of the i-th file, as used by the classification cache"""
+        return self.fileDev[i], self.fileIno[i], self.fileSize[i], self.fileMtime[i]
+
+    def stat(self, i):
+        """The stat data of the i-th file, as taken by DirManager.newFile"""
+        return FileStat(self.fileDev[i], self.fileIno[i], self.fileSize[i], self.fileMtime[i], self.fileNlink[i])
+
+    def pack(self):
+        """Return a tuple of strings and bytes, which can be pickled cheaply"""
+        return ("\0".join(self.dirNames), self.dirParent.tobytes(), bytes(self.dirListed), self.dirDev.tobytes(),
+                self.dirIno.tobytes(), "\0".join(self.fileNames), self.fileDir.tobytes(), self.fileSize.tobytes(),
+                self.fileMtime.tobytes(), self.fileIno.tobytes(), self.fileDev.tobytes(), self.fileNlink.tobytes(),
+                bytes(self.fileBinary))
+
+    @classmethod
+    def unpack(cls, data):
+        """Inverse of pack()"""
+        cols = cls()
+        dirNames, dirParent, dirListed, dirDev, dirIno, fileNames, fileDir, size, mtime, ino, dev, nlink, binary = data
+        for column, raw in ((cols.dirParent, dirParent), (cols.dirDev, dirDev), (cols.dirIno, dirIno),
+                            (cols.fileDir, fileDir), (cols.fileSize, size), (cols.fileMtime, mtime),
+                            (cols.fileIno, ino), (cols.fileDev, dev), (cols.fileNlink, nlink)):
+            column.frombytes(raw)
+        cols.dirListed = bytearray(dirListed)
+        cols.fileBinary = bytearray(binary)
+        cols.dirNames = dirNames.split("\0") if len(cols.dirParent) else []
+        cols.fileNames = fileNames.split("\0") if len(cols.fileDir) else []
+        return cols
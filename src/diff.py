@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 05:50 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Differences between two scans of a tree, e.g. a snapshot of last night and the tree analyzed now. Both trees are
+traversed together; at every directory, the sorted listings of the two sides are merged by name, so the diff takes
+time linear in the number of entries. The files are compared by their stat data and binary flags. The deltas of
+the directories are taken from the aggregates of the two sides, without visiting their subtrees.
+
+Either side may be a Dir (e.g. the tree of a DirManager) or a Snapshot; a snapshot is diffed on its columns,
+without creating the Dir and File objects.
+"""
+
+__all__ = ['diff', 'Diff', 'FileChange', 'DirDelta', 'ADDED', 'REMOVED', 'CHANGED', 'FLIPPED', 'KINDS']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import time
+from collections import namedtuple
+
+from src.snapshot import Snapshot
+from src.stats import stats
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"  # Modified: the size or the modification time differs
+FLIPPED = "flipped"  # The binary flag differs, whether the file has been modified or not
+KINDS = (ADDED, REMOVED, CHANGED, FLIPPED)
+
+# A file added, removed or changed. The old or the new values are None for added and removed files
+FileChange = namedtuple("FileChange", "kind path oldSize newSize oldBinary newBinary")
+# The differences new - old of the numbers aggregated over the subtree of a directory
+DirDelta = namedtuple("DirDelta", "path files binFiles txtFiles binSize txtSize")
+
+_NO_TOTALS = (0, 0, 0, 0, 0)
+_FLAGS = (False, True, None)  # Binary flag by the value of the fileBinary column of a snapshot
+
+
+class _DirSource:
+    """Side of a diff given by a Dir tree"""
+
+    def __init__(self, root):
+        self.root = root
+
+    @staticmethod
+    def listing(dir):
+        """Return the sorted lists of the files as (name, size, mtime, binary) and of the subdirs as (name, node)"""
+        files = sorted((f.name, f.bytes, f.mtime, f.binary) for f in dir.files)
+        dirs = sorted(((d.name, d) for d in dir.dirs), key=lambda d: d[0])
+        return files, dirs
+
+    @staticmethod
+    def totals(dir):
+        return dir.nTotalFiles, dir.nTotalBin, dir.nTotalTxt, dir.totalBinSize, dir.totalTxtSize
+
+
+class _SnapshotSource:
+    """Side of a diff given by a Snapshot; the nodes are the rows of the directories"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.root = 0
+        self.columns = {name: snapshot.column(name) for name in (
+            "dirFirstDir", "dirNDirs", "dirFirstFile", "dirNFiles", "fileSize", "fileMtime", "fileIno", "fileBinary",
+            "dirTotalFiles", "dirTotalBin", "dirTotalTxt", "dirBinSize", "dirTxtSize")}
+
+    def listing(self, row):
+        c = self.columns
+        names = self.snapshot.names
+        size, mtime, ino, binary = c["fileSize"], c["fileMtime"], c["fileIno"], c["fileBinary"]
+        first, n = c["dirFirstFile"][row], c["dirNFiles"][row]
+        files = sorted((name, size[i] if size[i] >= 0 else None, mtime[i] if ino[i] else None,
+                        _FLAGS[binary[i]]) for i, name in enumerate(names("file", first, n), first))
+        first, n = c["dirFirstDir"][row], c["dirNDirs"][row]
+        dirs = sorted(zip(names("dir", first, n), range(first, first + n)), key=lambda d: d[0])
+        return files, dirs
+
+    def totals(self, row):
+        c = self.columns
+        return (c["dirTotalFiles"][row], c["dirTotalBin"][row], c["dirTotalTxt"][row], c["dirBinSize"][row],
+                c["dirTxtSize"][row])
+
+
+def _source(tree):
+    if isinstance(tree, Snapshot):
+        return _SnapshotSource(tree)
+    return _DirSource(tree)
+
+
+def _merge(old, new):
+    """Merge two lists sorted by their first item into (old, new) pairs; the missing side is None"""
+    i = j = 0
+    while i < len(old) or j < len(new):
+        if j == len(new) or (i < len(old) and old[i][0] < new[j][0]):
+            yield old[i], None
+            i += 1
+        elif i == len(old) or new[j][0] < old[i][0]:
+            yield None, new[j]
+            j += 1
+        else:
+            yield old[i], new[j]
+            i += 1
+            j += 1
+
+
+def diff(old, new):
+    """
+    Generator of the differences between the old and the new tree: a DirDelta for every directory whose numbers
+    differ, followed by the FileChanges of its files, directory by directory in depth-first pre-order. The paths
+    are relative to the roots, "." for the roots themselves.
+
+    :param old: Dir or Snapshot
+    :param new: Dir or Snapshot
+    """
+    start = time.perf_counter()
+    old, new = _source(old), _source(new)
+    stack = [(os.curdir, old.root, new.root)]
+    entries = 0
+    try:
+        while stack:
+            path, a, b = stack.pop()
+            oldTotals = old.totals(a) if a is not None else _NO_TOTALS
+            newTotals = new.totals(b) if b is not None else _NO_TOTALS
+            if oldTotals != newTotals or a is None or b is None:
+                yield DirDelta(path, *(n - o for o, n in zip(oldTotals, newTotals)))
+            oldFiles, oldDirs = old.listing(a) if a is not None else ([], [])
+            newFiles, newDirs = new.listing(b) if b is not None else ([], [])
+            entries += len(oldFiles) + len(newFiles)
+            prefix = "" if path == os.curdir else path + os.sep
+            for f, g in _merge(oldFiles, newFiles):
+                if f is None:
+                    yield FileChange(ADDED, prefix + g[0], None, g[1], None, g[3])
+                elif g is None:
+                    yield FileChange(REMOVED, prefix + f[0], f[1], None, f[3], None)
+                elif f[3] is not None and g[3] is not None and f[3] != g[3]:
+                    yield FileChange(FLIPPED, prefix + f[0], f[1], g[1], f[3], g[3])
+                elif f[1:3] != g[1:3]:
+                    yield FileChange(CHANGED, prefix + f[0], f[1], g[1], f[3], g[3])
+            subdirs = [(prefix + (d or e)[0], d[1] if d else None, e[1] if e else None)
+                       for d, e in _merge(oldDirs, newDirs)]
+            stack.extend(reversed(subdirs))
+    finally:
+        stats.add("diff", time.perf_counter() - start)
+        stats.count("diffEntries", entries)
+
+
+class Diff:
+    """The differences between two trees collected by path, e.g. to highlight them in a view"""
+
+    def __init__(self, old, new):
+        self.files = {}  # Relative path -> FileChange
+        self.dirs = {}  # Relative path -> DirDelta
+        self.counts = dict.fromkeys(KINDS, 0)
+        for record in diff(old, new):
+            if isinstance(record, DirDelta):
+                self.dirs[record.path] = record
+            else:
+                self.files[record.path] = record
+                self.counts[record.kind] += 1
+
+    def __bool__(self):
+        return bool(self.files) or bool(self.dirs)
+
+    def root(self):
+        """DirDelta of the roots, with zero differences if the trees have the same numbers"""
+        return self.dirs.get(os.curdir, DirDelta(os.curdir, 0, 0, 0, 0, 0))
+
+    def summary(self):
+        """Dict of the numbers of the changes of each kind and of the differences of the root numbers"""
+        summary = dict(self.counts)
+        summary.update(self.root()._asdict())
+        del summary["path"]
+        return summary
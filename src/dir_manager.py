@@ -12,115 +12,764 @@ __all__ = ['DirManager']
 __date__ = '2021-11-20'
 __authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
 
-import logging
+import math
 import os
+import sys
+import time
+from collections.abc import Mapping
 
-from PyQt5.QtCore import QObject
-from PyQt5.QtWidgets import QFileSystemModel
+from src.classifier import ClassificationEngine
+from src.estimate import estimate, Z95
+from src.lru import LRUCache
+from src.scheduler import ReadScheduler
+from src.stats import stats
+from src.walker import Walker
 
-from src.utils import isText
 
+ESTIMATE_CHUNK = 1000  # Number of files classified at once when refining the estimates
+TREE_CACHE_FILES = 1000000  # Number of files of the trees of recent roots, kept for re-rooting
 
-class DirManager(QObject):
-    """A class that collects the information about file tree and manages the files and directories"""
 
-    def __init__(self, parent=None, dir=None):
+def isBelow(path, root):
+    """Return True if the normalized path is strictly below the normalized root"""
+    return path.startswith(root if root.endswith(os.sep) else root + os.sep)
+
+
+class DirManager:
+    """
+    A class that collects the information about file tree and manages the files and directories. It does not depend
+    on Qt, so that scripts and worker processes can use it without loading PyQt5; the Model adapts it to the view
+    """
+
+    def __init__(self, parent=None, dir=None, workers=None, processes=False, classify=True, cancelled=None,
+                 cache=None, lazy=False, sharded=False, classifier=None, scheduler=None, estimate=None, rules=None,
+                 followSymlinks=True, oneFilesystem=False, uniqueBytes=False):
         assert os.path.isdir(dir)
-        super().__init__(parent)
-        self.items = {}
+        self.parent = parent  # Owner of the manager, if any
+        self.items = ItemIndex(self)
         self.dir = None
-        self.model = None
-        self.map = {}
-        self.setDir(dir)
+        self.map = None  # IndexMap of the model set with setModel
+        self.version = 0  # Incremented when items are removed from the tree or the root changes
+        self.engine = ClassificationEngine(workers=workers, processes=processes, cache=cache, classifier=classifier,
+                                           scheduler=scheduler)
+        self.workers = workers
+        self.estimate = estimate  # Fraction of the files sampled by setDir in the estimate mode, None if exact
+        self.unsampled = []  # Files not classified yet in the estimate mode, in the sample order
+        self.rules = rules  # Optional ExcludeRules pruning the tree; bound to the root by setDir
+        self.snapshot = None  # Snapshot the tree has been loaded from, if any
+        self.binaryIndex = None  # HeaviestIndex of the tree, built by the first heaviest query
+        self.followSymlinks = followSymlinks  # Whether the symbolic links are followed; otherwise they are left out
+        self.oneFilesystem = oneFilesystem  # Whether the directories on other devices than the root are left out
+        self.uniqueBytes = uniqueBytes  # Whether the bytes of a file with several hard links are counted only once
+        self.visited = {}  # (device, inode) -> path of the directories entered, shared by the walkers of the tree
+        self.links = {}  # (device, inode) -> first File found of the files with several hard links
+        # Detached trees of recent roots (normalized path -> Dir), reused when the root changes
+        self.trees = LRUCache(TREE_CACHE_FILES, weight=lambda tree: tree.nTotalFiles + 1)
+        self.grafts = {}  # Subtrees waiting for the listing of their parent in the lazy mode, by normalized path
+        self.setDir(dir, classify, cancelled, lazy, sharded)
+
+    def setDir(self, dir, classify=True, cancelled=None, lazy=False, sharded=False):
+        """
+        Scan the directory tree.
 
-    def setDir(self, dir):
+        :param dir: root directory
+        :param classify: if False, the files are only collected and have to be classified later
+        :param cancelled: optional callable returning True if the scan shall be aborted
+        :param lazy: if True, nothing is scanned; the directories have to be listed on demand with listDir
+        :param sharded: if True, the tree is scanned and classified by a pool of processes
+
+        In the estimate mode, only the estimate fraction of the files is classified, in a stratified random sample.
+        The rest has to be classified with refine or in the chunks of refinements, e.g. in the background.
+
+        If the manager has a tree already, the subtrees below dir known from it and from the recent trees are not
+        scanned again, but grafted into the new tree; only their unclassified files are classified
+        """
         if not isinstance(dir, str):
             return
         if not os.path.isdir(dir):
             return
-        self.dir = Dir(dir, self)
+        self.binaryIndex = None
+        self.version += 1
+        self.links = {}
+        grafts = {}
+        if self.dir is not None and self.reusable():
+            for tree in self.grafts.values():
+                self.retire(tree)
+            self.grafts = {}
+            if os.path.normpath(self.dir.path) != os.path.normpath(dir):  # The same dir is scanned afresh
+                self.retire(self.dir)
+            self.trees.pop(os.path.normpath(dir))  # Superseded by the new tree
+            grafts = self.subtrees(os.path.normpath(dir))
+        if not grafts or sharded:
+            self.visited = {}
+        self.dir = Dir(dir, self, scan=False)
+        if self.rules is not None:
+            self.rules.setRoot(dir)
+        if lazy:
+            self.grafts = grafts
+            return
+        if sharded:
+            # Imported here, because the sharded scanner builds the Dir and File objects of this module
+            from src.sharded import ShardedScanner
+            scanner = ShardedScanner(self.workers, cache=self.engine.cache, classifier=self.engine.classifier,
+                                     rules=self.rules, walker=Walker(self.followSymlinks, self.rules,
+                                                                     self.oneFilesystem))
+            scanner.scan(self.dir, classify, cancelled)
+        elif self.estimate is not None:
+            self.dir.scan(False, cancelled, grafts)
+            if classify:
+                self.sample(self.estimate, cancelled)
+        else:
+            self.dir.scan(classify, cancelled, grafts)
+        for tree in grafts.values():
+            self.retire(tree)  # Not found in the new tree, e.g. removed meanwhile
+
+    def reusable(self):
+        """
+        Whether the analyzed directories can be reused for another root. They cannot with exclusion rules, which
+        depend on the root, for the tree of a snapshot, which is bound to its file, or when the bytes of the hard
+        links are counted once, since the link counted may be outside of the new root
+        """
+        return not self.rules and self.snapshot is None and not self.uniqueBytes
+
+    def walker(self):
+        """Return a Walker listing the directories of the tree with the traversal options of the manager"""
+        return Walker(self.followSymlinks, self.rules, self.oneFilesystem, self.visited,
+                      self.dir.path if self.dir is not None else None)
+
+    def traversal(self):
+        """Return the dict of the traversal options of the manager, as taken by the constructor"""
+        return dict(followSymlinks=self.followSymlinks, oneFilesystem=self.oneFilesystem, uniqueBytes=self.uniqueBytes)
+
+    def newFile(self, name, parent, stat):
+        """
+        Create the File of a listing entry. A further hard link of a file in the tree becomes a HardLink, which is
+        classified with the first one found and, with uniqueBytes, counted without its bytes
+        """
+        if stat.st_nlink < 2:
+            return File(name, None, parent, stat=stat)
+        key = stat.st_dev, stat.st_ino
+        primary = self.links.get(key)
+        if primary is None or not self.holds(primary) or primary.statKey != key + (stat.st_size, stat.st_mtime_ns):
+            file = self.links[key] = File(name, None, parent, stat=stat)
+            return file
+        link = (UniqueLink if self.uniqueBytes else HardLink)(name, None, parent, stat=stat)
+        link.primary = primary
+        stats.count("hardLinks")
+        return link
+
+    def holds(self, item):
+        """Return True if the item is in the current tree, i.e. has not been removed from it"""
+        return self.items.get(item.path) is item
+
+    def reroot(self, dir):
+        """
+        Make dir the root of the tree without scanning anything, if its directory is known: if it is below the
+        current root or in one of the recent trees. The previous tree is kept in the cache of the recent trees, so
+        going back to it costs nothing either. In the lazy mode, the new tree may be incomplete.
+
+        :return: True if the tree has been re-rooted; otherwise it is unchanged and the new root has to be scanned
+            with setDir, which reuses the known subtrees
+        """
+        if self.dir is None or not self.reusable():
+            return False
+        dir = os.path.normpath(dir)
+        old = self.dir
+        current = os.path.normpath(old.path)
+        if dir == current:
+            return True
+        start = time.perf_counter()
+        for tree in self.grafts.values():
+            self.retire(tree)
+        self.grafts = {}
+        tree = old.find(dir) if isBelow(dir, current) else None
+        if isinstance(tree, Dir):
+            tree.parent.removeDir(tree)
+            self.retire(old)
+        else:
+            tree = self.take(dir)
+            if tree is None:
+                return False
+            if not (isBelow(current, dir) and self.graft(tree, old)):
+                self.retire(old)
+        self.dir = tree
+        self.binaryIndex = None
+        self.version += 1
+        if self.estimate is not None:
+            self.sampleOrder()
+        stats.add("reroot", time.perf_counter() - start)
+        return True
+
+    @staticmethod
+    def graft(tree, dir):
+        """
+        Add the detached dir to the tree, if the tree holds its listed parent, which misses it. Return True if added
+        """
+        path = os.path.normpath(dir.path)
+        parent = tree.find(os.path.dirname(path))
+        if not isinstance(parent, Dir) or not parent.listed or parent.child(os.path.basename(path)) is not None:
+            return False
+        parent.addDir(dir)
+        return True
+
+    def retire(self, tree):
+        """
+        Put a detached tree into the cache of the recent trees. It is grafted back into the cached tree it has
+        been cut out of, if any, and the cached trees cut out of it are grafted back into it
+        """
+        path = os.path.normpath(tree.path)
+        for root, cached in self.trees.items():
+            if isBelow(root, path) and self.graft(tree, cached):
+                self.trees.pop(root)
+        for root, cached in self.trees.items():
+            if isBelow(path, root) and self.graft(cached, tree):
+                self.trees[root] = cached  # Weighed again
+                return
+        self.trees[path] = tree
+
+    def take(self, path):
+        """Cut the directory of the normalized path out of the recent trees and return it; None if not found"""
+        for root, cached in self.trees.items():
+            if path == root:
+                return self.trees.pop(root)
+            if isBelow(path, root):
+                dir = cached.find(path)
+                if isinstance(dir, Dir):
+                    dir.parent.removeDir(dir)
+                    self.trees[root] = cached
+                    return dir
+        return None
+
+    def subtrees(self, path):
+        """Remove the recent trees below the normalized path from the cache and return them by their paths"""
+        trees = {root: tree for root, tree in self.trees.items() if isBelow(root, path)}
+        for root in trees:
+            self.trees.pop(root)
+        return trees
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """
+        Create a manager with the tree of a snapshot file, written by save. The tree is created lazily from the
+        memory-mapped file; it can be brought up to date with the file system with validate and refreshDir.
+        The other keyword arguments are passed to the constructor
+        """
+        # Imported here, because the snapshot module builds the Dir and File objects of this module
+        from src.snapshot import Snapshot
+        snapshot = Snapshot(path)
+        kwargs.setdefault("rules", snapshot.rules())
+        for name, value in snapshot.traversal().items():
+            kwargs.setdefault(name, value)
+        mgr = cls(dir=snapshot.root, lazy=True, **kwargs)
+        mgr.dir = snapshot.tree(mgr)
+        mgr.binaryIndex = None
+        mgr.snapshot = snapshot
+        return mgr
+
+    def save(self, path, compress=False):
+        """
+        Save the tree to a snapshot file
+
+        :param compress: if True, the file is compressed; it takes longer to write and to open then
+        :return: the size of the file in bytes
+        """
+        from src.snapshot import save
+        return save(self.dir, path, compress, self.rules, self.traversal())
+
+    def validate(self, cancelled=None):
+        """
+        Generator of the paths of the directories of a tree loaded from a snapshot, that differ from the file system.
+        Only the snapshot file is read, not the tree, so it can be run in the background
+        """
+        if self.snapshot is None:
+            return
+        yield from self.snapshot.validate(cancelled, walker=self.walker())
+
+    def heaviest(self, n=10):
+        """
+        Return the list of the n directories holding the most binary data, largest first. The first query builds
+        an index of all directories (for a snapshot, that creates the directories, but not the files); the index
+        is then kept up to date as the files are classified, so later queries do not traverse the tree
+        """
+        if self.binaryIndex is None or self.binaryIndex.root is not self.dir:
+            # Imported here, like the other helpers building on the Dir objects of this module
+            from src.heaviest import HeaviestIndex
+            self.binaryIndex = HeaviestIndex(self.dir)
+        return self.binaryIndex.top(n)
+
+    def sampleOrder(self):
+        """Put the files, that are not classified yet, in the sample order for the estimate mode"""
+        self.unsampled = ReadScheduler("sample").schedule(f for f in self.dir.allFiles() if f.binary is None)
+        self.unsampled.reverse()  # The next file is taken from the end
+
+    def sample(self, fraction, cancelled=None):
+        """Classify the given fraction of the files not classified yet, as a stratified random sample"""
+        self.sampleOrder()
+        n = math.ceil(fraction * len(self.unsampled))
+        if n > 0:
+            self.engine.classify(next(self.refinements(n)), cancelled)
+
+    def refinements(self, chunk=ESTIMATE_CHUNK):
+        """
+        Generator of lists of the next files to be classified in the estimate mode. The files are handed out in
+        chunks, so that the estimates stay unbiased, although the engine reorders each chunk (e.g. cache hits first)
+        """
+        while self.unsampled:
+            files = self.unsampled[-chunk:]
+            del self.unsampled[-chunk:]
+            files.reverse()
+            yield files
+
+    def refine(self, cancelled=None):
+        """Classify the remaining files of the estimate mode, so that the estimates become exact"""
+        for files in self.refinements():
+            self.engine.classify(files, cancelled)
+            if cancelled is not None and cancelled():
+                return
+
+    def listDir(self, path, dirs, files):
+        """
+        Add the listing of a directory, obtained with Walker.listDir, to a directory not listed yet.
+
+        :return: tuple (files, dirs) of the created File and Dir objects
+        """
+        dir = self.items.get(path)
+        if not isinstance(dir, Dir) or dir.listed:
+            return [], []
+        return dir.populate(dirs, files, self.grafts)
 
     def getDir(self):
         """Return the own path"""
         return self.dir.path
 
+    def refreshDir(self, path):
+        """
+        Bring a single directory up to date with the file system. New files and subtrees are added, vanished ones
+        are removed and files whose size or modification time have changed are reset to unclassified.
+
+        :param path: path of a directory in the tree
+        :return: tuple (dirs, files): the directories whose numbers have changed and the files to be classified
+        """
+        dir = self.items.get(path)
+        if not isinstance(dir, Dir) or not dir.listed:
+            return [], []
+        if not os.path.isdir(path):
+            # The directory itself is gone; this is handled by its parent
+            if dir.parent is None:
+                return [], []
+            return self.refreshDir(dir.parent.path)
+        subdirs, files = self.walker().listDir(path)
+        return self.updateDir(path, subdirs, files)
+
+    def updateDir(self, path, subdirs, files):
+        """
+        Bring a single directory up to date with its new listing, obtained with Walker.listDir, e.g. in a
+        background thread. Like refreshDir, but the directory is only listed again, if it has vanished meanwhile.
+
+        :return: tuple (dirs, files): the directories whose numbers have changed and the files to be classified
+        """
+        dir = self.items.get(path)
+        if not isinstance(dir, Dir) or not dir.listed:
+            return [], []
+        if not os.path.isdir(path):
+            return self.refreshDir(path)
+        toClassify = []
+        existing = {f.name: f for f in dir.files}
+        added = []
+        for name, st in files:
+            file = existing.pop(name, None)
+            if file is not None and file.primary is not None and not self.holds(file.primary):
+                dir.removeFile(file)  # Its primary is gone, so it is read and counted by itself again
+                self.version += 1
+                file = None
+            if file is None:
+                added.append(self.newFile(name, dir, st))
+            elif file.statKey != (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns):
+                file.invalidate()
+                file.setStat(st)
+                toClassify.append(file)
+        for file in existing.values():
+            dir.removeFile(file)
+        if existing:
+            self.version += 1
+        dir.addFiles(added)
+        toClassify.extend(added)
+
+        existing = {d.name: d for d in dir.dirs}
+        for name in subdirs:
+            if existing.pop(name, None) is None:
+                subdir = Dir(name, self, scan=False)
+                dir.addDir(subdir)
+                subdir.scan(classify=False)
+                toClassify.extend(subdir.allFiles())
+        for subdir in existing.values():
+            dir.removeDir(subdir)
+        if existing:
+            self.version += 1
+        return [dir], toClassify
+
     def setModel(self, model):
+        """
+        Map the indices of the QFileSystemModel to the items with map. The indices are resolved on demand, when
+        they are looked up, so that only the rows shown cost anything
+        """
+        from PyQt5.QtWidgets import QFileSystemModel  # Only the GUI maps the items to a model
+        from src.index_map import IndexMap
         assert isinstance(model, QFileSystemModel)
-        self.model = model
-        for path, item in self.items.items():
-            index = self.model.index(path)
-            self.map[index] = item
+        self.map = IndexMap(model, self)
 
 
-class DirTreeItem:
-    """Abstract class for directory tree items (directories, files etc)"""
+class ItemIndex(Mapping):
+    """
+    Read-only mapping of the full paths to the items of the manager's tree. Nothing is stored per item: a path is
+    resolved by descending from the root directory one name component at a time
+    """
 
-    def __init__(self, basepath, manager):
-        logging.debug(f"adding {type(self)}: {basepath}")
-        self.path = basepath
+    def __init__(self, manager):
         self.manager = manager
-        self.manager.items[self.path] = self
+
+    def __getitem__(self, path):
+        root = self.manager.dir
+        item = root.find(path) if root is not None and isinstance(path, str) else None
+        if item is None:
+            raise KeyError(path)
+        return item
+
+    def __contains__(self, path):
+        try:
+            self[path]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        for path, _ in self.items():
+            yield path
+
+    def __len__(self):
+        root = self.manager.dir
+        if root is None:
+            return 0
+        n = 1
+        stack = [root]
+        while stack:
+            dir = stack.pop()
+            n += len(dir.files) + len(dir.dirs)
+            stack.extend(dir.dirs)
+        return n
+
+    def items(self):
+        """Generator of (path, item) tuples of the whole tree; the paths are built top-down along the way"""
+        root = self.manager.dir
+        if root is None:
+            return
+        stack = [(root.name, root)]
+        while stack:
+            path, dir = stack.pop()
+            yield path, dir
+            for file in dir.files:
+                yield os.path.join(path, file.name), file
+            stack.extend((os.path.join(path, d.name), d) for d in reversed(dir.dirs))
+
+
+class DirTreeItem:
+    """
+    Abstract class for directory tree items (directories, files etc). To keep millions of items affordable, an item
+    only stores its own name and a reference to its parent; the full path is built on demand. Only a root item,
+    i.e. one without parent, stores its full path as name and refers to the manager
+    """
+    __slots__ = ("name", "parent", "_manager")
+
+    def __init__(self, basepath, manager, parent=None):
+        self.parent = parent
+        if parent is None:
+            self.name = sys.intern(basepath)
+            self._manager = manager
+        else:
+            self.name = sys.intern(os.path.basename(basepath))
+            self._manager = None
+
+    @property
+    def path(self):
+        """The full path, built from the names of the item and its ancestors"""
+        if self.parent is None:
+            return self.name
+        names = []
+        item = self
+        while item.parent is not None:
+            names.append(item.name)
+            item = item.parent
+        names.append(item.name)
+        return os.path.join(*reversed(names))
+
+    @property
+    def manager(self):
+        item = self
+        while item.parent is not None:
+            item = item.parent
+        return item._manager
+
+    def attach(self, parent):
+        """Make the item a child of the parent; only the last component of its path is kept"""
+        self.name = sys.intern(os.path.basename(self.name))
+        self._manager = None
+        self.parent = parent
+
+    def detach(self):
+        """Make the item a root item again, keeping its full path"""
+        if self.parent is None:
+            return
+        self.name = sys.intern(self.path)
+        self._manager = self.manager
+        self.parent = None
 
 
 class Dir(DirTreeItem):
-    def __init__(self, basepath, manager):
-        super().__init__(basepath, manager)
+    """
+    Directory in the tree. Besides the numbers of binary and non binary files directly in the directory, it keeps
+    the numbers and sizes aggregated over the whole subtree. The aggregates are updated bottom-up whenever a file
+    is classified, added or removed, so that querying them does not need to visit the subtree
+    """
+    __slots__ = ("dirs", "files", "nbinFiles", "ntxtFiles", "listed", "nTotalFiles", "nTotalBin", "nTotalTxt",
+                 "totalBinSize", "totalTxtSize", "totalBinSize2", "nTotalUnlisted", "_index")
+
+    def __init__(self, basepath, manager, parent=None, scan=True):
+        super().__init__(basepath, manager, parent)
         self.dirs = []
         self.files = []
         self.nbinFiles = 0
         self.ntxtFiles = 0
-        try:
-            subdirs = os.listdir(self.path)
-        except (PermissionError, FileNotFoundError) as e:
-            err = str(type(e))[:-2].rsplit("'", 1)[1]
-            logging.debug(f"{err}: {self.path}")
-            return
-        for item in subdirs:
-            path = os.path.join(self.path, item)
-            if os.path.isfile(path):
-                self.files.append(File(path, self.manager))
-            elif os.path.isdir(path):
-                self.dirs.append(Dir(path, self.manager))
-        self.analyzeFiles()
+        self.listed = False  # Whether the content of the directory has been read
+        # Aggregates over this directory and all subdirectories
+        self.nTotalFiles = 0
+        self.nTotalBin = 0
+        self.nTotalTxt = 0
+        self.totalBinSize = 0
+        self.totalTxtSize = 0
+        self.totalBinSize2 = 0  # Sum of the squared sizes of the binary files, for the variance of the estimates
+        self.nTotalUnlisted = 1
+        self._index = None  # name -> child item, built on the first lookup
+        if scan:
+            self.scan()
+
+    def scan(self, classify=True, cancelled=None, grafts=None):
+        """
+        Populate the whole subtree in a single pass of the non-recursive walker and analyze the files.
+        The file sizes are taken from the stat data collected while listing the directories
+
+        :param grafts: optional dict of detached subtrees by normalized path; they are grafted in instead of being
+            scanned and removed from the dict
+        """
+        with stats.timer("scan"):
+            pending = {self.path: self}
+            for path, dirs, files in self.manager.walker().walk(self.path):
+                if cancelled is not None and cancelled():
+                    return
+                subdirs = pending.pop(path).populate(dirs, files, grafts)[1]
+                if len(subdirs) < len(dirs):
+                    dirs[:] = [subdir.name for subdir in subdirs]  # The grafted subtrees are not walked
+                for subdir in subdirs:
+                    pending[os.path.join(path, subdir.name)] = subdir
+        if classify:
+            self.manager.engine.classify((f for f in self.allFiles() if f.binary is None), cancelled)
+
+    def populate(self, dirs, files, grafts=None):
+        """
+        Fill the directory with its listing and mark it as listed. The subdirectories are not listed.
+
+        :param dirs: list of subdirectory names
+        :param files: list of (name, os.stat_result) tuples
+        :param grafts: optional dict of detached subtrees by normalized path, which are grafted in, and removed
+            from the dict, instead of creating new subdirectories
+        :return: tuple (files, dirs) of the created File and Dir objects
+        """
+        start = time.perf_counter()
+        manager = self.manager
+        if manager is None:
+            files = [File(name, None, self, stat=st) for name, st in files]
+        else:
+            files = [File(name, None, self, stat=st) if st.st_nlink < 2 else manager.newFile(name, self, st)
+                     for name, st in files]
+        self.addFiles(files)
+        subdirs = []
+        path = os.path.normpath(self.path) if grafts else None
+        for name in dirs:
+            subdir = grafts.pop(os.path.join(path, name), None) if grafts else None
+            if subdir is None:
+                subdir = Dir(name, None, scan=False)
+                subdirs.append(subdir)
+            self.addDir(subdir)
+        self.listed = True
+        self.propagate(unlisted=-1)
+        stats.add("build", time.perf_counter() - start)
+        stats.count("items", len(files) + len(subdirs))
+        return files, subdirs
+
+    def find(self, path):
+        """
+        Return the item of the path in the subtree of this root directory or None. The path is resolved by
+        descending one name component at a time
+        """
+        item = self
+        root = self.name
+        if path == root:
+            return item
+        prefix = root if root.endswith(os.sep) else root + os.sep
+        if not path.startswith(prefix):
+            return None
+        for name in path[len(prefix):].split(os.sep):
+            item = item.child(name) if isinstance(item, Dir) else None
+            if item is None:
+                return None
+        return item
+
+    def child(self, name):
+        """Return the file or subdirectory with the given name or None"""
+        if self._index is None:
+            self._index = {item.name: item for item in self.files}
+            self._index.update((d.name, d) for d in self.dirs)
+        return self._index.get(name)
+
+    def addFiles(self, files):
+        """Append the files to this directory and update the aggregates"""
+        self.files.extend(files)
+        self._index = None
+        nbin = [f for f in files if f.binary is True]
+        ntxt = [f for f in files if f.binary is False]
+        self.nbinFiles += len(nbin)
+        self.ntxtFiles += len(ntxt)
+        self.propagate(len(files), len(nbin), len(ntxt), sum(f.size() for f in nbin), sum(f.size() for f in ntxt),
+                       binSize2=sum(f.size() ** 2 for f in nbin))
+
+    def addDir(self, dir):
+        """Append a (possibly populated) subdirectory, that is not attached to any parent yet, and update the aggregates"""
+        dir.attach(self)
+        self.dirs.append(dir)
+        self._index = None
+        self.propagate(dir.nTotalFiles, dir.nTotalBin, dir.nTotalTxt, dir.totalBinSize, dir.totalTxtSize,
+                       dir.nTotalUnlisted, dir.totalBinSize2)
+        index = self.binaryIndex()
+        if index is not None:
+            index.add(dir)
+
+    def release(self):
+        """
+        Drop the files and subdirectories, e.g. once they have been reported, keeping the aggregates. The items
+        are not detached, so the ones still referenced elsewhere, e.g. as the primaries of hard links, stay valid
+        """
+        self.files = []
+        self.dirs = []
+        self._index = None
+
+    def removeFile(self, file):
+        """Remove the file from this directory and update the aggregates"""
+        self.files.remove(file)
+        self._index = None
+        if file.binary is not None:
+            file.count(-1)
+        self.propagate(-1)
+        file.detach()
+
+    def removeDir(self, dir):
+        """Remove the subdirectory with its whole subtree from this directory"""
+        self.dirs.remove(dir)
+        self._index = None
+        self.propagate(-dir.nTotalFiles, -dir.nTotalBin, -dir.nTotalTxt, -dir.totalBinSize, -dir.totalTxtSize,
+                       -dir.nTotalUnlisted, -dir.totalBinSize2)
+        dir.detach()
+
+    def propagate(self, files=0, bins=0, txts=0, binSize=0, txtSize=0, unlisted=0, binSize2=0):
+        """
+        Add the given differences to the aggregates of this directory and all its ancestors. If the size of the
+        binary files changes, the directories are marked in the HeaviestIndex of the manager, if it has one
+        """
+        dir = self
+        while True:
+            dir.nTotalFiles += files
+            dir.nTotalBin += bins
+            dir.nTotalTxt += txts
+            dir.totalBinSize += binSize
+            dir.totalTxtSize += txtSize
+            dir.nTotalUnlisted += unlisted
+            dir.totalBinSize2 += binSize2
+            if dir.parent is None:
+                break
+            dir = dir.parent
+        if binSize and dir._manager is not None and dir._manager.binaryIndex is not None:
+            dir._manager.binaryIndex.touch(self)
+
+    def binaryIndex(self):
+        """Return the HeaviestIndex of the manager of the tree or None"""
+        manager = self.manager
+        return manager.binaryIndex if manager is not None else None
 
     def totalFiles(self):
         """
         Returns the total number of files in this and child directories
         """
-        return len(self.files) + sum([d.totalFiles() for d in self.dirs])
+        return self.nTotalFiles
+
+    def complete(self):
+        """Return True if all directories of the subtree have been listed, i.e. the total numbers are known"""
+        return self.nTotalUnlisted == 0
+
+    def allFiles(self):
+        """Generator of all files in this and child directories"""
+        stack = [self]
+        while stack:
+            dir = stack.pop()
+            yield from dir.files
+            stack.extend(reversed(dir.dirs))
 
-    # ToDo: move to threads
     def analyzeFiles(self):
         """
-        Count the number of binary and non binary files in dir
+        Classify the files in dir using the manager's classification engine. The numbers of binary and non binary
+        files are counted as the files get classified
         """
-        for f in self.files:
-            f.size()
-            if f.isBinary():
-                self.nbinFiles += 1
-            else:
-                self.ntxtFiles += 1
+        self.manager.engine.classify(self.files)
 
     def binCount(self):
         """Return the number of binary files in this and subdirecoties"""
-        return self.nbinFiles + sum([d.binCount() for d in self.dirs])
+        return self.nTotalBin
 
     def txtCount(self):
         """Return the number of non-binary files in this and subdirecoties"""
-        return self.ntxtFiles + sum([d.txtCount() for d in self.dirs])
+        return self.nTotalTxt
 
     def binSize(self):
-        return sum([f.size() for f in self.files if f.isBinary()]) + sum([d.binSize() for d in self.dirs])
+        """Return the size of the binary files in this and subdirecoties"""
+        return self.totalBinSize
 
     def txtSize(self):
-        return sum([f.size() for f in self.files if not f.isBinary()]) + sum([d.txtSize() for d in self.dirs])
+        """Return the size of the non-binary files in this and subdirecoties"""
+        return self.totalTxtSize
+
+    def estimate(self, z=Z95):
+        """Return the Estimate of the binary files in this and subdirectories from the files classified so far"""
+        return estimate(self, z)
+
+
+_devices = {}  # One shared int object per device number
 
 
 class File(DirTreeItem):
-    def __init__(self, basepath, manager):
-        super().__init__(basepath, manager)
+    __slots__ = ("binary", "bytes", "dev", "ino", "mtime")
+    primary = None  # For a HardLink, the file classified for it
+
+    def __init__(self, basepath, manager, parent=None, size=None, stat=None):
+        super().__init__(basepath, manager, parent)
         self.binary = None
-        self.bytes = None
+        self.bytes = size
+        self.dev = self.ino = self.mtime = None
+        if stat is not None:
+            self.setStat(stat)
+
+    @property
+    def statKey(self):
+        """(device, inode, size, mtime_ns) tuple or None if the stat data is not known"""
+        if self.ino is None:
+            return None
+        return self.dev, self.ino, self.bytes, self.mtime
 
     def isBinary(self):
         """
@@ -128,10 +777,84 @@ class File(DirTreeItem):
         :return:
         """
         if not isinstance(self.binary, bool):
-            self.binary = not isText(self.path)
+            self.setBinary(self.manager.engine.classifyOne(self))
         return self.binary
 
+    def setStat(self, stat):
+        """Take the size and the identity of the file from the os.stat_result"""
+        self.dev = _devices.setdefault(stat.st_dev, stat.st_dev)
+        self.ino = stat.st_ino
+        self.mtime = stat.st_mtime_ns
+        self.setSize(stat.st_size)
+
+    def cacheKey(self):
+        """Return the (device, inode, size, mtime_ns) tuple identifying the file content or None if not available"""
+        if self.ino is None:
+            try:
+                self.setStat(os.stat(self.path))
+            except OSError:
+                return None
+        return self.statKey
+
+    def setBinary(self, binary):
+        """Store the classification result and update the counters of the parent directories"""
+        if self.binary is binary:
+            return
+        if self.parent is not None and self.binary is not None:
+            self.count(-1)
+        self.binary = binary
+        if self.parent is not None:
+            self.count(1)
+
+    def count(self, n):
+        """Add (n=1) or subtract (n=-1) the classified file to/from the counters of the parent directories"""
+        size = n * self.size()
+        if self.binary:
+            self.parent.nbinFiles += n
+            self.parent.propagate(bins=n, binSize=size, binSize2=n * self.size() ** 2)
+        else:
+            self.parent.ntxtFiles += n
+            self.parent.propagate(txts=n, txtSize=size)
+
+    def invalidate(self):
+        """Forget the classification result, e.g. because the file has been modified"""
+        if self.binary is None:
+            return
+        if self.parent is not None:
+            self.count(-1)
+        self.binary = None
+
     def size(self):
         if self.bytes is None:
             self.bytes = os.stat(self.path).st_size
         return self.bytes
+
+    def setSize(self, size):
+        """Update the file size, e.g. after the file has been modified"""
+        if self.parent is not None and self.binary is not None:
+            self.count(-1)
+            self.bytes = size
+            self.count(1)
+        else:
+            self.bytes = size
+
+
+class HardLink(File):
+    """
+    Further hard link of a File in the tree. It is not read: it takes the classification of its primary, the first
+    link found, as long as their stat data are the same
+    """
+    __slots__ = ("primary",)
+
+
+class UniqueLink(HardLink):
+    """HardLink counted without its bytes, which are counted with the primary (DirManager.uniqueBytes)"""
+    __slots__ = ()
+
+    def count(self, n):
+        if self.binary:
+            self.parent.nbinFiles += n
+            self.parent.propagate(bins=n)
+        else:
+            self.parent.ntxtFiles += n
+            self.parent.propagate(txts=n)
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 02:05 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Estimates of the binary files of a directory from the files classified so far. In the estimate mode, the files are
+classified in a proportional stratified random order (see ReadScheduler), so at any moment the classified files are a
+sample, in which every directory has about the same share. Such a sample is self-weighting, so the estimates follow
+from the aggregates of the subtree alone; the intervals of simple random sampling are a conservative approximation of
+the stratified ones. The interval of the binary size relies on the normal approximation, which is too narrow for
+small samples of heavy tailed size distributions. The estimates become exact when all files have been classified.
+"""
+
+__all__ = ['Estimate', 'estimate', 'Z95']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import math
+from collections import namedtuple
+
+Z95 = 1.96  # Quantile of the normal distribution for the 95% confidence intervals
+
+# The estimated numbers and the half-widths of their confidence intervals; classified out of total files
+Estimate = namedtuple("Estimate", "binCount binCountError binSize binSizeError classified total")
+
+
+def estimate(dir, z=Z95):
+    """Return the Estimate of the binary files of the (listed part of the) subtree of dir, None if no file is known"""
+    N = dir.nTotalFiles
+    n = dir.nTotalBin + dir.nTotalTxt
+    if n == 0:
+        return None
+    if n >= N:
+        return Estimate(dir.nTotalBin, 0.0, dir.totalBinSize, 0.0, n, N)
+    fpc = 1 - n / N  # Finite population correction
+    # Adjusted (Agresti-Coull) proportion, so that a sample without binary or without text files is not certain
+    p = (dir.nTotalBin + z * z / 2) / (n + z * z)
+    countError = z * N * math.sqrt(fpc * p * (1 - p) / (n + z * z))
+    mean = dir.totalBinSize / n  # Mean binary size per classified file
+    if n > 1:
+        variance = max(dir.totalBinSize2 - n * mean * mean, 0.0) / (n - 1)
+        sizeError = z * N * math.sqrt(fpc * variance / n)
+    else:
+        sizeError = math.inf
+    return Estimate(N * dir.nTotalBin / n, countError, N * mean, sizeError, n, N)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 11:20 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Loading of the Qt Designer forms. uic.loadUiType parses the .ui file and generates the Python code of the form on
+every start, and importing uic alone takes about 30 ms. The generated code is therefore cached compiled in the
+__pycache__ next to the form and reused until the .ui file changes; uic is only imported to regenerate it.
+"""
+
+__all__ = ['loadUiType']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import importlib.util
+import io
+import marshal
+import os
+import sys
+import time
+
+from src.stats import stats
+
+MAGIC = b"SFBUI\x01"
+
+
+def cachePath(path):
+    """Return the path of the compiled form of the .ui file"""
+    dir, name = os.path.split(path)
+    return os.path.join(dir, "__pycache__", f"{os.path.splitext(name)[0]}.ui.{sys.implementation.cache_tag}.pyc")
+
+
+def header(path):
+    """Return the header of the cache matching the current .ui file and interpreter"""
+    st = os.stat(path)
+    return MAGIC + importlib.util.MAGIC_NUMBER + f"{st.st_mtime_ns}:{st.st_size}\n".encode()
+
+
+def compileForm(path):
+    """Return the name of the base class and the code object of the form generated by uic"""
+    import xml.etree.ElementTree as ElementTree
+    from PyQt5 import uic
+    source = io.StringIO()
+    uic.compileUi(path, source)
+    base = ElementTree.parse(path).getroot().find("widget").get("class")
+    return base, compile(source.getvalue(), path, "exec")
+
+
+def loadUiType(path):
+    """
+    Return the form class and its Qt base class of the .ui file, like uic.loadUiType. If the cache cannot be
+    written, e.g. in a read-only installation, the form is generated on every call
+    """
+    start = time.perf_counter()
+    expected = header(path)
+    cache = cachePath(path)
+    form = None
+    try:
+        with open(cache, "rb") as f:
+            if f.read(len(expected)) == expected:
+                form = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        form = None
+    if form is None:
+        form = compileForm(path)
+        tmp = f"{cache}.{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(cache), exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(expected)
+                marshal.dump(form, f)
+            os.replace(tmp, cache)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    base, code = form
+    namespace = {}
+    exec(code, namespace)
+    formClass = next(value for name, value in namespace.items() if name.startswith("Ui_"))
+    from PyQt5 import QtWidgets
+    stats.add("loadForm", time.perf_counter() - start)
+    return formClass, getattr(QtWidgets, base)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 15:50 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Keeps the tree of a DirManager up to date with the file system. Changes are reported by QFileSystemWatcher (inotify
+on Linux); where directories cannot be watched, e.g. because the inotify watch limit is exhausted, they are polled.
+A watched directory only reports its entries being added, removed or renamed, not a file written in place, so the
+stat data of the files are also polled, which costs no inotify watches.
+"""
+
+__all__ = ['FileSystemWatcher']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import logging
+import os
+import time
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QThread, QTimer, pyqtSignal, pyqtSlot
+
+from .watcher import Debouncer, PollingWatcher
+from .worker import ClassificationWorker
+
+
+class FileSystemWatcher(QObject):
+    """
+    Applies the changes of the file system to the tree of the manager. The changed directories are refreshed after
+    the changes have settled; only new and modified files are classified again, in a background thread.
+    The changed signal carries the set of directories whose numbers have changed.
+    """
+    changed = pyqtSignal(object)
+
+    def __init__(self, mgr, parent=None, quiet=0.5, maxDelay=5.0, pollInterval=5.0, maxWatches=8000, poll=False):
+        super().__init__(parent)
+        self.mgr = mgr
+        self.maxWatches = maxWatches
+        self.debouncer = Debouncer(quiet, maxDelay)
+        self.poller = None  # PollingWatcher replacing the notifications
+        self.checker = None  # PollingWatcher finding the files written in place, alongside the notifications
+        self.watched = set()
+        self.threads = {}
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.onDirectoryChanged)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+        self.pollTimer = QTimer(self)
+        self.pollTimer.setInterval(int(pollInterval * 1000))
+        self.pollTimer.timeout.connect(self.onPoll)
+
+        if poll:
+            self.startPolling()
+        else:
+            self.watch(self.mgr.dir)
+            if self.poller is None:
+                self.checker = PollingWatcher(self.mgr)
+                self.checker.start()
+                self.pollTimer.start()
+
+    def watch(self, dir):
+        """Watch the directory and its subdirectories. Falls back to polling if that is not possible"""
+        paths = []
+        stack = [dir]
+        while stack:
+            d = stack.pop()
+            if d.path not in self.watched:
+                paths.append(d.path)
+            stack.extend(d.dirs)
+        if self.poller is not None or not paths:
+            return
+        room = max(0, self.maxWatches - len(self.watched))
+        failed = self.watcher.addPaths(paths[:room]) if room else []
+        self.watched.update(p for p in paths[:room] if p not in failed)
+        if failed or len(paths) > room:
+            logging.info(f"Cannot watch {len(failed) + max(0, len(paths) - room)} directories, polling instead")
+            self.startPolling()
+
+    def startPolling(self):
+        if self.watched:
+            self.watcher.removePaths(list(self.watched))
+            self.watched = set()
+        self.checker = None
+        self.poller = PollingWatcher(self.mgr)
+        self.poller.start()
+        self.pollTimer.start()
+
+    def stop(self):
+        """Stop watching and cancel the running classification"""
+        self.timer.stop()
+        self.pollTimer.stop()
+        if self.watched:
+            self.watcher.removePaths(list(self.watched))
+            self.watched = set()
+        for thread, worker in list(self.threads.items()):
+            worker.cancel()
+            thread.quit()
+            thread.wait()
+
+    @pyqtSlot(str)
+    def onDirectoryChanged(self, path):
+        self.debouncer.add(os.path.normpath(path))
+        self.schedule()
+
+    @pyqtSlot()
+    def onPoll(self):
+        poller = self.poller if self.poller is not None else self.checker
+        for path in poller.poll():
+            self.debouncer.add(path)
+        self.schedule()
+
+    def schedule(self):
+        deadline = self.debouncer.deadline()
+        if deadline is not None:
+            self.timer.start(max(0, int(1000 * (deadline - time.monotonic()))))
+
+    @pyqtSlot()
+    def flush(self):
+        """Refresh the directories changed since the last flush"""
+        if not self.debouncer.due():
+            self.schedule()
+            return
+        paths = self.debouncer.take()
+        dirs = set()
+        files = []
+        for path in paths:
+            changed, toClassify = self.mgr.refreshDir(path)
+            dirs.update(changed)
+            files.extend(toClassify)
+            for poller in (self.poller, self.checker):
+                if poller is not None:
+                    poller.refreshed(path)
+        stale = [p for p in self.watched if p not in self.mgr.items]
+        if stale:
+            self.watcher.removePaths(stale)
+            self.watched.difference_update(stale)
+        for dir in dirs:
+            self.watch(dir)
+        logging.debug(f"Refreshed {len(paths)} directories, {len(files)} files to classify")
+        if dirs:
+            self.changed.emit(dirs)
+        if files:
+            self.classify(files)
+
+    def classify(self, files):
+        thread = QThread(self)
+        worker = ClassificationWorker(self.mgr.engine, files)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.batchReady.connect(self.onBatchReady)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(lambda: self.threads.pop(thread, None))
+        self.threads[thread] = worker
+        thread.start()
+
+    @pyqtSlot(object)
+    def onBatchReady(self, batch):
+        if self.sender().isCancelled():
+            return
+        dirs = set()
+        for file, binary in batch:
+            file.setBinary(binary)
+            if file.parent is not None:
+                dirs.add(file.parent)
+        self.changed.emit(dirs)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 08:10 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Index of the directories of a tree by the size of the binary files in their subtrees, answering "which directories
+hold the most binary data" without traversing the tree. The index is a heap that is not updated in place: the
+directories whose numbers change are only marked dirty by Dir.propagate and pushed again with their new size on the
+next query. Entries that do not match the current size of their directory any more are stale; they are dropped when
+they reach the top of the heap, and the heap is rebuilt when they outnumber the live entries.
+"""
+
+__all__ = ['HeaviestIndex']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import heapq
+import itertools
+import time
+
+from src.stats import stats
+
+
+class HeaviestIndex:
+    """Heap of the directories of the tree under root by their total size of binary files, largest first"""
+
+    def __init__(self, root):
+        self.root = root
+        self.heap = []  # [-size, sequence number, dir]; the sequence number keeps Dir objects out of the comparisons
+        self.dirty = set()  # Directories whose numbers have changed since the last query
+        self.seq = itertools.count()
+        self.live = 0  # Number of the entries after the last rebuild, to decide when to rebuild
+        self.rebuild()
+
+    def rebuild(self):
+        """Build the heap anew from the tree, dropping all stale entries"""
+        start = time.perf_counter()
+        heap = []
+        stack = [self.root]
+        while stack:
+            dir = stack.pop()
+            heap.append((-dir.totalBinSize, next(self.seq), dir))
+            stack.extend(dir.dirs)
+        heapq.heapify(heap)
+        self.heap = heap
+        self.dirty.clear()
+        self.live = len(heap)
+        stats.add("heaviestRebuild", time.perf_counter() - start)
+
+    def touch(self, dir):
+        """Mark the directory and its ancestors as changed"""
+        dirty = self.dirty
+        while dir is not None:
+            dirty.add(dir)
+            dir = dir.parent
+
+    def add(self, dir):
+        """Register a subtree attached to the tree, e.g. a directory filled while detached"""
+        stack = [dir]
+        while stack:
+            dir = stack.pop()
+            self.dirty.add(dir)
+            self.live += 1
+            stack.extend(dir.dirs)
+
+    def attached(self, dir):
+        """Return True if the directory is still in the tree of the index"""
+        while dir.parent is not None:
+            dir = dir.parent
+        return dir is self.root
+
+    def top(self, n=10):
+        """
+        Return the list of the n directories with the largest total size of binary files, largest first. The root
+        comes first, as it holds all of them; directories without binary files are not returned
+        """
+        start = time.perf_counter()
+        heap = self.heap
+        for dir in self.dirty:
+            heapq.heappush(heap, (-dir.totalBinSize, next(self.seq), dir))
+        self.dirty.clear()
+        if len(heap) > 2 * self.live + 1024:
+            self.rebuild()
+            heap = self.heap
+        result = []
+        found = set()
+        kept = []
+        while heap and len(result) < n:
+            entry = heapq.heappop(heap)
+            size, _, dir = entry
+            if size == 0:
+                heapq.heappush(heap, entry)
+                break
+            if -size != dir.totalBinSize or dir in found or not self.attached(dir):
+                continue  # Stale or duplicate; dropped for good
+            found.add(dir)
+            result.append(dir)
+            kept.append(entry)
+        for entry in kept:
+            heapq.heappush(heap, entry)
+        stats.add("heaviest", time.perf_counter() - start)
+        return result
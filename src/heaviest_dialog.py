@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 08:40 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Dialog listing the directories holding the most binary data
+"""
+
+__all__ = ['HeaviestDialog']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QHBoxLayout, QLabel, QSpinBox, QTreeWidget, \
+    QTreeWidgetItem, QVBoxLayout
+
+
+class HeaviestDialog(QDialog):
+    """
+    Non-modal dialog refreshing the list of the heaviest binary directories of the DirManager periodically. The list
+    comes from the index of the manager, so refreshing it does not traverse the tree
+    """
+    activated = pyqtSignal(str)  # Path of the directory double-clicked
+
+    HEADERS = ["Directory", "Binary files", "Binary bytes", "Binary %"]
+
+    def __init__(self, parent=None, manager=None, interval=1000):
+        """
+        :param manager: callable returning the current DirManager or None
+        """
+        super().__init__(parent)
+        self.manager = manager
+        self.setWindowTitle("Heaviest binary directories")
+        self.resize(640, 420)
+        self.countSpinBox = QSpinBox(self)
+        self.countSpinBox.setRange(1, 1000)
+        self.countSpinBox.setValue(20)
+        self.countSpinBox.valueChanged.connect(self.refresh)
+        self.tree = QTreeWidget(self)
+        self.tree.setRootIsDecorated(False)
+        self.tree.setHeaderLabels(HeaviestDialog.HEADERS)
+        self.tree.itemDoubleClicked.connect(self.onItemDoubleClicked)
+        buttons = QDialogButtonBox(QDialogButtonBox.Close, self)
+        buttons.rejected.connect(self.close)
+        top = QHBoxLayout()
+        top.addWidget(QLabel("Directories:", self))
+        top.addWidget(self.countSpinBox)
+        top.addStretch()
+        layout = QVBoxLayout(self)
+        layout.addLayout(top)
+        layout.addWidget(self.tree)
+        layout.addWidget(buttons)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    @pyqtSlot()
+    def refresh(self):
+        mgr = self.manager() if self.manager is not None else None
+        self.tree.clear()
+        if mgr is None or mgr.dir is None:
+            return
+        items = []
+        for dir in mgr.heaviest(self.countSpinBox.value()):
+            classified = dir.nTotalBin + dir.nTotalTxt
+            share = 100.0 * dir.nTotalBin / classified if classified else 0.0
+            item = QTreeWidgetItem([dir.path, f"{dir.nTotalBin:,}", f"{dir.totalBinSize:,}", f"{share:0.1f}"])
+            for column in range(1, len(HeaviestDialog.HEADERS)):
+                item.setTextAlignment(column, Qt.AlignRight | Qt.AlignVCenter)
+            items.append(item)
+        self.tree.addTopLevelItems(items)
+
+    @pyqtSlot(QTreeWidgetItem, int)
+    def onItemDoubleClicked(self, item, column):
+        self.activated.emit(item.text(0))
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 15:30 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Mapping of the indices of a QFileSystemModel to the items of the tree of a DirManager. Nothing is resolved up front:
+an index is resolved through its path when it is first asked for, i.e. when its row is shown, and remembered by the
+internalId of the index, which identifies the node of the model for all columns of its row. The remembered entries
+are QPersistentModelIndex objects, which the model invalidates when it removes the node, so an internalId reused
+for another node is not mistaken for the old one; there are at most maxsize of them, since the model keeps every
+persistent index up to date on each change of its rows. Rows loaded later by the model are simply not remembered
+yet. The mapping is dropped whenever items are removed from the tree or its root changes (DirManager.version).
+"""
+
+__all__ = ['IndexMap']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+
+from PyQt5.QtCore import QPersistentModelIndex
+
+from src.lru import LRUCache
+
+
+class IndexMap:
+    """Read-only mapping of the QModelIndex objects of the model to the Dir and File items of the manager"""
+
+    def __init__(self, model, manager, maxsize=10000):
+        self.model = model
+        self.manager = manager
+        self.version = manager.version
+        self.entries = LRUCache(maxsize)  # internalId -> (QPersistentModelIndex, item)
+
+    def get(self, index, default=None):
+        """Return the item of the index, or default if the index is invalid or its path is not in the tree"""
+        if not index.isValid():
+            return default
+        if self.version != self.manager.version:
+            self.entries.clear()
+            self.version = self.manager.version
+        id = index.internalId()
+        entry = self.entries.get(id)
+        if entry is not None and entry[0].isValid():
+            return entry[1]
+        item = self.manager.items.get(os.path.normpath(self.model.filePath(index)))
+        if item is None:
+            return default
+        self.entries[id] = (QPersistentModelIndex(index), item)
+        return item
+
+    def __getitem__(self, index):
+        item = self.get(index)
+        if item is None:
+            raise KeyError(index)
+        return item
+
+    def __contains__(self, index):
+        return self.get(index) is not None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
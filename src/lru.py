@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 19:05 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Size bounded mapping, which drops the least recently used entries
+"""
+
+__all__ = ['LRUCache']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Mapping holding at most maxsize entries. Reading or writing an entry marks it as the most recently used.
+    With a weight function, maxsize bounds the total weight of the values instead of their number; the weight of a
+    value is taken when it is stored
+    """
+
+    def __init__(self, maxsize=10000, weight=None):
+        self.maxsize = maxsize
+        self.weight = weight
+        self.size = 0  # Total weight of the values, or their number
+        self._data = OrderedDict()  # key -> (value, weight)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return default
+        return self._data[key][0]
+
+    def __setitem__(self, key, value):
+        self.pop(key)
+        weight = self.weight(value) if self.weight is not None else 1
+        self._data[key] = (value, weight)
+        self.size += weight
+        while self.size > self.maxsize:
+            _, (_, weight) = self._data.popitem(last=False)
+            self.size -= weight
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        self.size -= entry[1]
+        return entry[0]
+
+    def items(self):
+        """List of the (key, value) tuples, the least recently used first; does not mark them as used"""
+        return [(key, value) for key, (value, _) in self._data.items()]
+
+    def clear(self):
+        self._data.clear()
+        self.size = 0
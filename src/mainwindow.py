@@ -5,44 +5,89 @@ Created on 19.11.2021 16:13 11
 @author: Piotr Gradkowski <grotsztaksel@o2.pl>
 """
 
-__all__ = ['MainWindow']
+__all__ = ['MainWindow', 'Model']
 __date__ = '2021-11-19'
 __authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
 
 import logging
 import os
+import time
 import typing
 from random import random
 
-from PyQt5 import uic
-from PyQt5.QtCore import Qt, QModelIndex, pyqtSlot
+from PyQt5.QtCore import Qt, QEvent, QModelIndex, QPoint, QThread, QTimer, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QColor, QPainter, QPalette, QKeySequence, QGuiApplication
 from PyQt5.QtWidgets import QFileSystemModel, QStyledItemDelegate, QStyleOptionViewItem, QFileDialog
 
-from .dir_manager import DirManager
-from .percent_bar import PercentBar
-from .utils import isText
+from .binary_proxy import BinaryFilterModel, BinarySortModel, modelIndex
+from .cache import ClassificationCache
+from .classifier import ClassificationEngine
+from .diff import Diff, DirDelta, ADDED, CHANGED, FLIPPED
+from .dir_manager import DirManager, Dir, File
+from .forms import loadUiType
+from .fs_watcher import FileSystemWatcher
+from .heaviest_dialog import HeaviestDialog
+from .lru import LRUCache
+from .percent_bar import PercentBarRenderer
+from .rules import ExcludeRules
+from .scan_queue import ScanQueue
+from .snapshot import Snapshot
+from .stats import stats
+from .stats_dialog import StatsDialog
+from .worker import AnalysisWorker, ClassificationWorker, LazyScanWorker, ValidationWorker
 
-Ui_MainWindow, QMainWindow = uic.loadUiType(os.path.join(os.path.dirname(__file__), "mainwindow.ui"))
+ESTIMATE_FRACTION = 0.01  # Share of the files classified before the first estimates are shown
+SNAPSHOT_FILTER = "Snapshots (*.sfbsnap);;All files (*)"
+
+Ui_MainWindow, QMainWindow = loadUiType(os.path.join(os.path.dirname(__file__), "mainwindow.ui"))
 
 
 class MainWindow(QMainWindow, Ui_MainWindow):
-    def __init__(self, parent=None, flags=Qt.WindowFlags(), dir=None):
+    def __init__(self, parent=None, flags=Qt.WindowFlags(), dir=None, snapshot=None):
         super().__init__(parent, flags)
         self.setupUi(self)
-        self.model = Model()
+        self.cache = ClassificationCache.open()
+        self.model = Model(cache=self.cache)
+        # Model -> filtered by the binary numbers -> sorted by them, with their columns -> tree view
+        self.filterModel = BinaryFilterModel(self)
+        self.filterModel.setSourceModel(self.model)
+        self.proxy = BinarySortModel(self)
+        self.proxy.setSourceModel(self.filterModel)
         self.mgr = None
+        self.rootDir = None
+        self.watcher = None
+        self.worker = None
+        self.threads = {}  # Running analysis threads and their workers
+        self.queue = None  # Work queue of the lazy scan
+        self.nclassified = 0
+        self.progress = 0
+        self.statsDialog = None
+        self.heaviestDialog = None
+
+        self.visibleTimer = QTimer(self)
+        self.visibleTimer.setSingleShot(True)
+        self.visibleTimer.setInterval(50)
+        self.visibleTimer.timeout.connect(self.updateVisible)
+        self.treeView.expanded.connect(self.scheduleVisibleUpdate)
+        self.treeView.verticalScrollBar().valueChanged.connect(self.scheduleVisibleUpdate)
+        self.model.directoryLoaded.connect(self.scheduleVisibleUpdate)
 
         self.treeView.setItemDelegate(PercentBarDelegate(self.treeView))
-        if dir is not None:
+        # Unsorted until a header is clicked: the Model lists the rows in its own order
+        self.treeView.header().setSortIndicator(-1, Qt.AscendingOrder)
+        self.treeView.setSortingEnabled(True)
+        self.treeView.viewport().installEventFilter(self)
+        if snapshot is not None:
+            self.openSnapshot(snapshot)
+        elif dir is not None:
             self.lineEdit.setText(dir)
             self.onTextAccepted()
 
     @pyqtSlot()
     def onDirButtonClicked(self):
         """Open a directory selection dialog"""
-        if isinstance(self.treeView.model(), Model):
-            root = self.treeView.model().rootPath()
+        if self.treeView.model() is self.proxy:
+            root = self.model.rootPath()
         else:
             root = os.getcwd()
         dir = QFileDialog.getExistingDirectory(self, "Select root directory", root)
@@ -69,100 +114,681 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         """Helper function to set the root path on all widgets and the model"""
         self.lineEdit.setText(dir)
         self.analyze(dir)
-        self.treeView.setModel(self.model)
-        self.treeView.setRootIndex(self.model.setRootPath(dir))
+        self.showRoot(dir)
+
+    def showRoot(self, dir):
+        """Show the tree of the dir in the view"""
+        self.treeView.setModel(self.proxy)
+        self.treeView.setRootIndex(self.viewIndex(self.model.setRootPath(dir)))
+
+    def viewIndex(self, index):
+        """Map the index of the Model to the index of the view"""
+        return self.proxy.mapFromSource(self.filterModel.mapFromSource(index))
 
-    def analyze(self, dir):
-        if self.mgr is not None and self.mgr.getDir() == dir:
+    def reveal(self, path):
+        """Select the item of the path in the view, expanding its ancestors"""
+        index = self.viewIndex(self.model.index(path))
+        if not index.isValid():
+            self.statusbar.showMessage(f"{path} is not shown")
             return
+        self.treeView.setCurrentIndex(index)
+        self.treeView.scrollTo(index)
+
+    def analyze(self, dir, force=False):
+        """
+        Start the analysis of the dir in the background. A running analysis is cancelled. Unless forced, a dir
+        that has already been analyzed is not analyzed again, and the directories analyzed for the previous roots
+        are reused: a dir known from them is shown at once, otherwise only the directories not known yet are scanned
+        """
+        if not force and dir == self.rootDir and (self.mgr is not None or self.worker is not None):
+            return
+        self.cancelAnalysis()
+        self.stopWatching()
+        self.rootDir = dir
         logging.info(f"Starting dir manager for {dir}")
-        self.mgr = DirManager(dir=dir)
-        self.model.setDirManager(self.mgr)
-        nf = self.mgr.dir.totalFiles()
-        logging.info(f"Total number of files: {nf}.")
-        progress_thresholds = list(range(0, nf, int(nf / 100)))
-        progress_thresholds.pop(0)
-        progress_thresholds.extend([nf, len(self.mgr.items)])  # The latter just in case progress reporting goes too far
-        i = 0
-        next_threshold = progress_thresholds.pop(0)
-        for path, item in self.mgr.items.items():
-            if not os.path.isfile(path):
-                continue
-            i += 1
+        previous = self.mgr
+        self.mgr = None
+        self.queue = None
+        self.model.setDirManager(None)
+        self.diffButton.setChecked(False)
+        self.nclassified = 0
+        self.progress = 0
+        rules = self.excludeRules()
+        if force or rules is not None or previous is None or not previous.reusable():
+            previous = None
+        elif previous.reroot(dir):
+            self.resume(previous)
+            return
 
-            item.isBinary()
-            if i >= next_threshold:
-                logging.info("{0:0.0f}% done ({1:d} of {2:d})".format(100.0 * i / nf, i, nf))
-                next_threshold = progress_thresholds.pop(0)
+        if self.lazyCheckBox.isChecked():
+            if previous is not None:
+                previous.setDir(dir, lazy=True)
+                self.mgr = previous
             else:
-                logging.debug("{0:0.0f}% done ({1:d} of {2:d})".format(100.0 * i / nf, i, nf))
+                self.mgr = DirManager(dir=dir, cache=self.cache, lazy=True, rules=rules)
+            self.queue = ScanQueue()
+            self.queue.push(ScanQueue.LIST, dir, ScanQueue.VISIBLE)
+            worker = LazyScanWorker(self.queue, self.mgr.engine, rules=rules, walker=self.mgr.walker())
+            worker.listed.connect(self.onListed)
+            self.model.setDirManager(self.mgr)
+            self.startWatching()
+        else:
+            estimate = ESTIMATE_FRACTION if self.estimateCheckBox.isChecked() else None
+            worker = AnalysisWorker(dir, cache=self.cache, estimate=estimate, rules=rules, mgr=previous)
+            worker.scanned.connect(self.onScanned)
+        self.startWorker(worker)
+        self.statusbar.showMessage(f"Scanning {dir}")
+
+    def resume(self, mgr):
+        """
+        Show the tree of a manager re-rooted to a known directory. The directories and files left unfinished by
+        the previous analyses are listed and classified in the background, like in the lazy scan
+        """
+        self.mgr = mgr
+        self.model.setDirManager(mgr)
+        self.nclassified = mgr.dir.nTotalBin + mgr.dir.nTotalTxt
+        self.queue = ScanQueue()
+        self.queuePending(mgr.dir)
+        worker = LazyScanWorker(self.queue, mgr.engine, walker=mgr.walker())
+        worker.listed.connect(self.onListed)
+        self.startWatching()
+        self.startWorker(worker)
+        self.statusbar.showMessage(f"Reused the analysis of {mgr.getDir()}")
+
+    def queuePending(self, dir):
+        """Queue the listing of the unlisted directories and the classification of the unclassified files of dir"""
+        stack = [dir]
+        while stack:
+            dir = stack.pop()
+            if not dir.listed:
+                self.queue.push(ScanQueue.LIST, dir.path, ScanQueue.BACKGROUND)
+                continue
+            files = [f for f in dir.files if f.binary is None]
+            if files:
+                self.queue.push(ScanQueue.CLASSIFY, dir.path, ScanQueue.BACKGROUND, files)
+            stack.extend(dir.dirs)
+
+    def openSnapshot(self, path):
+        """
+        Show the tree saved in a snapshot file. The snapshot is checked against the file system in the background;
+        the changed directories are updated and their new and modified files classified
+        """
+        try:
+            mgr = DirManager.load(path, cache=self.cache)
+        except (OSError, ValueError) as e:
+            logging.error(f"Cannot open the snapshot {path}: {e}")
+            self.statusbar.showMessage(f"Cannot open the snapshot {path}")
+            return False
+        self.cancelAnalysis()
+        self.stopWatching()
+        self.diffButton.setChecked(False)
+        self.mgr = mgr
+        self.rootDir = mgr.getDir()
+        self.nclassified = 0
+        self.progress = 0
+        self.lineEdit.setText(self.rootDir)
+        self.model.setDirManager(mgr)
+        self.showRoot(self.rootDir)
+        self.queue = ScanQueue()
+        worker = ValidationWorker(mgr, self.queue)
+        worker.listed.connect(self.onRefreshListed)
+        self.startWorker(worker)
+        self.statusbar.showMessage(f"Opened the snapshot {path}, checking it against the file system")
+        return True
+
+    def excludeRules(self):
+        """Return the ExcludeRules configured in the window or None, if nothing is excluded"""
+        rules = ExcludeRules(self.excludeLineEdit.text(), gitignore=self.gitignoreCheckBox.isChecked())
+        return rules if rules else None
+
+    def startWorker(self, worker):
+        """Run the analysis worker in a new thread"""
+        thread = QThread(self)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.batchReady.connect(self.onBatchReady)
+        worker.finished.connect(self.onAnalysisFinished)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(lambda: self.threads.pop(thread, None))
+        self.threads[thread] = worker
+        self.worker = worker
+        self.cancelButton.setEnabled(True)
+        thread.start()
+
+    def cancelAnalysis(self):
+        """
+        Stop the running analysis, if any. The thread is not waited for; it finishes in the background and its
+        results are ignored
+        """
+        if self.worker is None:
+            return
+        self.worker.cancel()
+        self.worker = None
+        self.cancelButton.setEnabled(False)
+        self.statusbar.showMessage("Analysis cancelled")
+
+    def startWatching(self):
+        self.watcher = FileSystemWatcher(self.mgr, self)
+        self.watcher.changed.connect(self.model.updateDirs)
+
+    def stopWatching(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher.deleteLater()
+            self.watcher = None
+
+    @pyqtSlot()
+    def onRescanClicked(self):
+        if self.rootDir is not None:
+            self.analyze(self.rootDir, force=True)
+
+    @pyqtSlot()
+    def onCancelClicked(self):
+        self.cancelAnalysis()
+
+    @pyqtSlot()
+    def onSaveClicked(self):
+        if self.mgr is None:
+            self.statusbar.showMessage("Nothing to save yet")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Save snapshot", self.rootDir, SNAPSHOT_FILTER)
+        if not path:
+            return
+        try:
+            size = self.mgr.save(path)
+        except OSError as e:
+            logging.error(f"Cannot save the snapshot {path}: {e}")
+            self.statusbar.showMessage(f"Cannot save the snapshot {path}")
+            return
+        self.statusbar.showMessage(f"Saved {self.mgr.dir.totalFiles()} files to {path} ({size} bytes)")
+
+    @pyqtSlot()
+    def onOpenClicked(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open snapshot", self.rootDir or os.getcwd(), SNAPSHOT_FILTER)
+        if path:
+            self.openSnapshot(path)
+
+    @pyqtSlot(bool)
+    def onDiffToggled(self, checked):
+        """Highlight the differences of the tree shown from a snapshot chosen by the user, or end the highlighting"""
+        if not checked:
+            self.model.setDiff(None)
+            return
+        path = None
+        if self.mgr is not None:
+            path, _ = QFileDialog.getOpenFileName(self, "Compare with snapshot", self.rootDir, SNAPSHOT_FILTER)
+        if not path or not self.showDiff(path):
+            self.diffButton.setChecked(False)
+
+    def showDiff(self, path):
+        """Highlight the differences between the snapshot file (old) and the tree shown (new)"""
+        try:
+            with Snapshot(path) as snapshot:
+                diff = Diff(snapshot, self.mgr.dir)
+        except (OSError, ValueError) as e:
+            logging.error(f"Cannot compare with the snapshot {path}: {e}")
+            self.statusbar.showMessage(f"Cannot compare with the snapshot {path}")
+            return False
+        self.model.setDiff(diff, self.rootDir)
+        summary = diff.summary()
+        self.statusbar.showMessage(f"Since the snapshot: {summary['added']} files added, {summary['removed']} removed, "
+                                   f"{summary['changed']} changed, {summary['flipped']} flipped; binary files "
+                                   f"{summary['binFiles']:+d} ({summary['binSize']:+d} bytes)")
+        return True
+
+    @pyqtSlot()
+    def onFilterChanged(self):
+        self.filterModel.setThresholds(bytes=self.binSizeSpinBox.value() * 1000000, share=self.shareSpinBox.value())
+
+    @pyqtSlot()
+    def onHeaviestClicked(self):
+        if self.heaviestDialog is None:
+            self.heaviestDialog = HeaviestDialog(self, lambda: self.mgr)
+            self.heaviestDialog.activated.connect(self.reveal)
+        self.heaviestDialog.show()
+        self.heaviestDialog.raise_()
+
+    @pyqtSlot()
+    def onStatsClicked(self):
+        if self.statsDialog is None:
+            self.statsDialog = StatsDialog(self)
+        self.statsDialog.show()
+        self.statsDialog.raise_()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and obj is self.treeView.viewport():
+            stats.count("frames")
+        return super().eventFilter(obj, event)
+
+    @pyqtSlot(object)
+    def onScanned(self, mgr):
+        if self.sender() is not self.worker:
+            return
+        self.mgr = mgr
+        self.model.setDirManager(mgr)
+        self.nclassified = mgr.dir.nTotalBin + mgr.dir.nTotalTxt  # Known from the previous roots
+        self.treeView.viewport().update()
+        self.startWatching()
+        logging.info(f"Total number of files: {mgr.dir.totalFiles()}.")
+
+    @pyqtSlot(str, object, object, int)
+    def onListed(self, path, dirs, files, priority):
+        """Add a directory listed by the lazy scan to the tree and queue the follow-up tasks"""
+        if self.sender() is not self.worker:
+            return
+        try:
+            grafts = len(self.mgr.grafts)
+            newFiles, newDirs = self.mgr.listDir(path, dirs, files)
+            if newFiles:
+                self.queue.push(ScanQueue.CLASSIFY, path, priority, newFiles)
+            for dir in newDirs:
+                self.queue.push(ScanQueue.LIST, dir.path, ScanQueue.BACKGROUND)
+            dir = self.mgr.items.get(path)
+            if dir is not None:
+                if len(self.mgr.grafts) < grafts:  # Subtrees of the previous roots have been grafted in
+                    fresh = set(newDirs)
+                    for graft in dir.dirs:
+                        if graft not in fresh:
+                            self.nclassified += graft.nTotalBin + graft.nTotalTxt
+                            self.queuePending(graft)
+                self.watcher.watch(dir)
+                self.model.updateDirs([dir])
+            if newDirs:
+                self.scheduleVisibleUpdate()
+        finally:
+            self.queue.taskDone()
+        self.statusbar.showMessage(f"Listed {path}")
+
+    @pyqtSlot(str, object, object, int)
+    def onRefreshListed(self, path, dirs, files, priority):
+        """Update a directory of a snapshot found changed by the validation and queue the classification"""
+        if self.sender() is not self.worker:
+            return
+        try:
+            changed, toClassify = self.mgr.updateDir(path, dirs, files)
+            if toClassify:
+                self.queue.push(ScanQueue.CLASSIFY, path, priority, toClassify)
+            self.model.updateDirs(changed)
+        finally:
+            self.queue.taskDone()
+        self.statusbar.showMessage(f"Updated {path}")
+
+    def scheduleVisibleUpdate(self):
+        if self.queue is not None:
+            self.visibleTimer.start()
+
+    @pyqtSlot()
+    def updateVisible(self):
+        """Move the tasks of the directories shown in the tree view ahead of the background sweep"""
+        if self.queue is None or self.mgr is None:
+            return
+        view = self.treeView
+        height = view.viewport().height()
+        index = view.indexAt(QPoint(0, 0))
+        while index.isValid() and view.visualRect(index).top() < height:
+            source = modelIndex(index)
+            if self.model.isDir(source):
+                self.prioritize(os.path.normpath(self.model.filePath(source)))
+            index = view.indexBelow(index)
+
+    def prioritize(self, path):
+        """Promote the tasks of the directory. If it is not known yet, the nearest known ancestor is promoted"""
+        item = self.mgr.items.get(path)
+        while item is None and os.path.dirname(path) != path:
+            path = os.path.dirname(path)
+            item = self.mgr.items.get(path)
+        if item is None:
+            return
+        self.queue.promote(ScanQueue.LIST, item.path)
+        self.queue.promote(ScanQueue.CLASSIFY, item.path)
+
+    @pyqtSlot(object)
+    def onBatchReady(self, batch):
+        if self.sender() is not self.worker:
+            return
+        dirs = set()
+        for file, binary in batch:
+            file.setBinary(binary)
+            dirs.add(file.parent)
+        self.model.updateDirs(dirs)
+
+        nf = self.mgr.dir.totalFiles()
+        self.nclassified += len(batch)
+        progress = int(100.0 * self.nclassified / max(nf, 1))
+        if progress > self.progress:
+            self.progress = progress
+            logging.info("{0:0.0f}% done ({1:d} of {2:d})".format(progress, self.nclassified, nf))
+        self.statusbar.showMessage(f"Analyzed {self.nclassified} of {nf} files")
+
+    @pyqtSlot()
+    def onAnalysisFinished(self):
+        if self.sender() is not self.worker:
+            return
+        self.worker = None
+        self.cancelButton.setEnabled(False)
+        if self.mgr is not None:
+            message = f"Analyzed {self.nclassified} files ({self.mgr.engine.rate():0.0f} files/s)"
+            if self.cache is not None:
+                stats = self.cache.stats()
+                message += f", cache hits: {stats['hits']}, misses: {stats['misses']}"
+            self.statusbar.showMessage(message)
+
+    def closeEvent(self, event):
+        self.cancelAnalysis()
+        self.stopWatching()
+        self.model.stop()
+        for thread in list(self.threads):
+            thread.quit()
+            thread.wait()
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        super().closeEvent(event)
 
     def keyPressEvent(self, event):
         if event.matches(QKeySequence.Copy):
             if self.treeView.currentIndex().isValid():
-                path = os.path.normpath(self.treeView.model().filePath(self.treeView.currentIndex()))
+                path = os.path.normpath(self.model.filePath(modelIndex(self.treeView.currentIndex())))
                 QGuiApplication.clipboard().setText(path)
                 logging.info(f"Copied {path} to clipboard")
 
 
 class Model(QFileSystemModel):
     """
-    File system model that shows whether the file is binary or not
+    File system model that shows whether the file is binary or not. data() never reads files: the verdicts are taken
+    from the tree of the DirManager or from a bounded cache. Files without a verdict are shown in a neutral colour
+    and classified in the background; dataChanged is emitted once their verdict is known
     """
     DATACOL = 1  # Column at which the custom data shall be presented
 
-    TotalBinaryRole = Qt.UserRole + 1
+    managerChanged = pyqtSignal()  # Emitted when the DirManager is replaced; all numbers may have changed
+
+    # Qt.UserRole + 1...3 are taken by QFileSystemModel (FilePathRole, FileNameRole, FilePermissions)
+    TotalBinaryRole = QFileSystemModel.FilePermissions + 1
+    EstimateRole = QFileSystemModel.FilePermissions + 2  # Estimate in the estimate mode, until the numbers are exact
+    FilterRole = QFileSystemModel.FilePermissions + 3  # Role of the changes of the numbers the filters depend on
+
+    PLACEHOLDER = QColor(Qt.gray)  # Colour of the files not classified yet
+    # Backgrounds of the highlighted differences: changed files by kind, directories by the change of binary data
+    DIFF_COLORS = {ADDED: QColor(210, 245, 210), CHANGED: QColor(250, 240, 200), FLIPPED: QColor(250, 210, 180)}
+    MORE_BINARY = QColor(250, 220, 220)
+    LESS_BINARY = QColor(215, 230, 250)
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, cache=None, maxVerdicts=100000):
         super().__init__(parent)
-        self.cache = {}
+        self.verdicts = LRUCache(maxVerdicts)  # path -> binary flag of files outside the tree of the manager
+        self.engine = ClassificationEngine(workers=2, cache=cache)
         self.mgr = None
+        self.map = None  # IndexMap of the indices to the items of the manager
+        self.diff = None  # Diff highlighted in the view
+        self.diffRoot = None  # Directory, to which the paths of the diff are relative
+        self.pending = {}  # path -> File waiting for its verdict
+        self.queued = []  # Files to be sent to the next classification worker
+        self.threads = {}
+        self.requestTimer = QTimer(self)
+        self.requestTimer.setSingleShot(True)
+        self.requestTimer.setInterval(20)
+        self.requestTimer.timeout.connect(self.classifyQueued)
 
     def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> typing.Any:
+        stats.count("dataCalls")
         col = index.column()
         if role == Qt.ForegroundRole and not self.isDir(index):
-            fp = self.filePath(index)
-            if not self.isText(fp):
+            binary = self.verdict(index)
+            if binary is None:
+                return Model.PLACEHOLDER
+            if binary:
                 # Make only non-text files (do not mark directories
                 return QColor(Qt.blue).lighter()
             else:
                 return super().data(index, role)
         elif role == Model.TotalBinaryRole and col == Model.DATACOL and self.mgr is not None:
-            fp = os.path.normpath(self.filePath(index))
-            if fp in self.mgr.items:
-                return [self.mgr.items[fp].binCount(),
-                        self.mgr.items[fp].binSize(),
-                        self.mgr.items[fp].txtCount(),
-                        self.mgr.items[fp].totalFiles()]
-            else:
-                pass
+            item = self.map.get(index)
+            if isinstance(item, Dir):
+                # The total is unknown ("?") until the whole subtree has been listed
+                total = item.totalFiles() if item.complete() else None
+                return [item.binCount(), item.binSize(), item.txtCount(), total]
+        elif role == Model.EstimateRole and col == Model.DATACOL and self.mgr is not None \
+                and self.mgr.estimate is not None:
+            item = self.map.get(index)
+            if isinstance(item, Dir) and item.complete():
+                estimate = item.estimate()
+                if estimate is not None and estimate.classified < estimate.total:
+                    return estimate
+            return None
+        elif role == Qt.DisplayRole and col == Model.DATACOL and self.isDir(index) and self.excluded(index):
+            return "excluded"
+        elif role in (Qt.BackgroundRole, Qt.ToolTipRole) and col == 0 and self.diff is not None:
+            change = self.change(index)
+            if change is not None:
+                return self.diffBackground(change) if role == Qt.BackgroundRole else self.diffToolTip(change)
         return super().data(index, role)
 
+    def item(self, index):
+        """Return the Dir or File of the DirManager for the index or None"""
+        if self.mgr is None:
+            return None
+        return self.map.get(index)
+
+    def binaryValues(self, index):
+        """
+        Return the binary numbers of the index: (binary files, their bytes, their share in percent of the classified
+        files), taken from the aggregates of a directory. None if they are not known
+        """
+        return self.itemValues(self.item(index))
+
+    @staticmethod
+    def itemValues(item):
+        """Return the binary numbers of the Dir or File as binaryValues"""
+        if isinstance(item, Dir):
+            bins = item.nTotalBin
+            classified = bins + item.nTotalTxt
+            return bins, item.totalBinSize, 100.0 * bins / classified if classified else 0.0
+        if isinstance(item, File) and item.binary is not None:
+            return (1, item.size(), 100.0) if item.binary else (0, 0, 0.0)
+        return None
+
+    def setDiff(self, diff, root=None):
+        """Highlight the differences of the Diff, whose paths are relative to root; None ends the highlighting"""
+        indexes = self.diffIndexes()
+        self.diff = diff
+        self.diffRoot = os.path.normpath(root) if root is not None else None
+        indexes.extend(self.diffIndexes())
+        # Only the rows highlighted before or now are repainted, in a range per parent
+        ranges = {}
+        for index in indexes:
+            parent = index.parent()
+            first, last = ranges.get(parent, (index.row(), index.row()))
+            ranges[parent] = min(first, index.row()), max(last, index.row())
+        for parent, (first, last) in ranges.items():
+            self.dataChanged.emit(self.index(first, 0, parent), self.index(last, 0, parent),
+                                  [Qt.BackgroundRole, Qt.ToolTipRole])
+
+    def diffIndexes(self):
+        """Return the indices of the loaded rows highlighted by the diff"""
+        if self.diff is None:
+            return []
+        loaded = {}
+        indexes = (self.loadedIndex(os.path.normpath(rel), loaded)
+                   for paths in (self.diff.dirs, self.diff.files) for rel in paths)
+        return [index for index in indexes if index.isValid()]
+
+    def loadedIndex(self, rel, loaded):
+        """
+        Return the index of the path relative to the diff root, if its directory has been loaded, else an invalid
+        index. index(path) would load the directories on the way, which no view has shown yet
+        """
+        index = loaded.get(rel)
+        if index is None:
+            if rel == os.curdir:
+                index = self.index(self.diffRoot)
+            else:
+                parent = self.loadedIndex(os.path.dirname(rel) or os.curdir, loaded)
+                loadedParent = parent.isValid() and not self.canFetchMore(parent)
+                index = self.index(os.path.join(self.diffRoot, rel)) if loadedParent else QModelIndex()
+            loaded[rel] = index
+        return index
+
+    def change(self, index):
+        """Return the FileChange or DirDelta of the diff for the index or None"""
+        path = os.path.normpath(self.filePath(index))
+        if path == self.diffRoot:
+            return self.diff.dirs.get(os.curdir)
+        if not path.startswith(self.diffRoot + os.sep):
+            return None
+        rel = path[len(self.diffRoot) + 1:]
+        return self.diff.dirs.get(rel) if self.isDir(index) else self.diff.files.get(rel)
+
+    @staticmethod
+    def diffBackground(change):
+        if isinstance(change, DirDelta):
+            if change.binFiles > 0 or change.binSize > 0:
+                return Model.MORE_BINARY
+            if change.binFiles < 0 or change.binSize < 0:
+                return Model.LESS_BINARY
+            return None
+        return Model.DIFF_COLORS.get(change.kind)
+
+    @staticmethod
+    def diffToolTip(change):
+        if isinstance(change, DirDelta):
+            return (f"Files {change.files:+d}, binary {change.binFiles:+d} ({change.binSize:+d} bytes), "
+                    f"text {change.txtFiles:+d} ({change.txtSize:+d} bytes)")
+        if change.kind == ADDED:
+            return "Added"
+        kinds = {True: "binary", False: "text", None: "not classified"}
+        text = f"{change.kind.capitalize()}: {kinds[change.oldBinary]}, {change.oldSize} bytes"
+        return text + f" -> {kinds[change.newBinary]}, {change.newSize} bytes"
+
+    def excluded(self, index):
+        """Return True if the item has been pruned by the exclusion rules of the DirManager"""
+        if self.mgr is None or self.mgr.rules is None:
+            return False
+        if index in self.map:
+            return False
+        path = os.path.normpath(self.filePath(index))
+        return self.mgr.rules.excluded(path, self.isDir(index), None if self.isDir(index) else self.size(index))
+
     def setDirManager(self, manager):
         self.mgr = manager
+        self.map = None  # IndexMap of the indices to the items of the manager
+        if manager is not None:
+            manager.setModel(self)
+            self.map = manager.map
+        self.pending = {}
+        self.queued = []
+        self.managerChanged.emit()
 
-    def isText(self, file):
+    def verdict(self, index):
         """
-        Instead of interrogating the file every time on data() call, keep the information whether it is a text
-        file in the cache once it has been checked
+        Return whether the file of the index is binary or None, if it is not known yet. In that case the file is
+        queued for the classification
         """
-        if file not in self.cache:
-            self.cache[file] = isText(file)
-        return self.cache[file]
+        item = self.item(index)
+        if isinstance(item, File) and item.binary is not None:
+            return item.binary
+        path = os.path.normpath(self.filePath(index))
+        if not isinstance(item, File):
+            if self.mgr is not None and self.mgr.rules is not None and self.mgr.rules.excluded(path, False):
+                return None  # Pruned; not classified
+            binary = self.verdicts.get(path)
+            if binary is not None:
+                return binary
+        if path not in self.pending:
+            file = item if isinstance(item, File) else File(path, None)
+            self.pending[path] = file
+            self.queued.append(file)
+            self.requestTimer.start()
+        return None
+
+    @pyqtSlot()
+    def classifyQueued(self):
+        """Classify the queued files in a background thread"""
+        files, self.queued = self.queued, []
+        if not files:
+            return
+        thread = QThread(self)
+        worker = ClassificationWorker(self.engine, files, interval=0.05)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.batchReady.connect(self.onBatchReady)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(self.onThreadFinished)
+        self.threads[thread] = worker
+        thread.start()
+
+    @pyqtSlot()
+    def onThreadFinished(self):
+        # A slot of the model rather than a lambda, so that the call is dropped, if the model is deleted meanwhile
+        self.threads.pop(self.sender(), None)
+
+    @pyqtSlot(object)
+    def onBatchReady(self, batch):
+        dirs = set()
+        for file, binary in batch:
+            if file.parent is not None:
+                file.setBinary(binary)
+                dirs.add(file.parent)
+            else:
+                self.verdicts[file.path] = binary
+        self.updateFiles()
+        if dirs:
+            self.updateDirs(dirs)
+
+    def updateFiles(self):
+        """Notify the views about the files that were shown without a verdict and have got it meanwhile"""
+        for path, file in list(self.pending.items()):
+            if file.binary is None and self.verdicts.get(path) is None:
+                continue
+            del self.pending[path]
+            first = self.index(path, 0)
+            if first.isValid():
+                last = first.sibling(first.row(), self.columnCount(first.parent()) - 1)
+                self.dataChanged.emit(first, last, [Qt.ForegroundRole])
+
+    def stop(self):
+        """Stop the classification of the queued files"""
+        self.requestTimer.stop()
+        for thread, worker in list(self.threads.items()):
+            worker.cancel()
+            thread.quit()
+            thread.wait()
+
+    def updateDirs(self, dirs):
+        """
+        Notify the views that the numbers of given directories have changed. The numbers are aggregated over the
+        subdirectories, so all ancestors are updated as well
+        """
+        changed = set()
+        for dir in dirs:
+            while dir is not None and dir not in changed:
+                changed.add(dir)
+                dir = dir.parent
+        for dir in changed:
+            index = self.index(dir.path, Model.DATACOL)
+            if index.isValid():
+                self.dataChanged.emit(index, index, [Model.TotalBinaryRole, Model.EstimateRole, Model.FilterRole])
+        if self.pending:
+            self.updateFiles()
 
 
 class PercentBarDelegate(QStyledItemDelegate):
     """
-    Delegate class that shows percentage of assessed files and how many of them are binary
+    Delegate class that shows percentage of assessed files and how many of them are binary. The bars are drawn by
+    a shared PercentBarRenderer, which caches them as pixmaps
     """
 
+    def __init__(self, parent=None, renderer=None):
+        super().__init__(parent)
+        self.renderer = renderer if renderer is not None else PercentBarRenderer()
+
     def paint(self, painter: QPainter, option: 'QStyleOptionViewItem', index: QModelIndex) -> None:
-        if self.percentBarRequired(index):
-            bar = PercentBar()
-            numbers = index.data(role=Model.TotalBinaryRole)
-            if numbers:
-                bar.numbers = numbers
-            bar.paint(painter, option.rect)
+        source = modelIndex(index)
+        if self.percentBarRequired(source) and not source.model().excluded(source):
+            start = time.perf_counter()
+            self.renderer.paint(painter, option.rect, source.data(role=Model.TotalBinaryRole),
+                                source.data(role=Model.EstimateRole))
+            stats.add("paint", time.perf_counter() - start)
         else:
             super().paint(painter, option, index)
 
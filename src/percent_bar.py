@@ -7,15 +7,18 @@ Created on 19.11.2021 21:52 11
 Custom widget used to display percentage of data analyzed and percentage of data fulfilling some criteria
 """
 
-__all__ = ['PercentBar']
+__all__ = ['PercentBar', 'PercentBarRenderer', 'drawBar', 'drawEstimate']
 __date__ = '2021-11-19'
 __authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
 
 from PyQt5.QtCore import Qt, QRect, pyqtSlot, QSize, QMargins, QPoint
 
-from PyQt5.QtGui import QPaintEvent, QColor, QPen, QPainter
+from PyQt5.QtGui import QPaintEvent, QBrush, QColor, QPen, QPainter, QPixmap
 from PyQt5.QtWidgets import QWidget
 
+from .lru import LRUCache
+from .stats import stats
+
 try:
     from humanize import naturalsize
 
@@ -23,12 +26,15 @@ try:
 except ImportError:
     HUMANSIZE_FOUND = False
 
+PATTERN_SIZE = 8  # Period of the Qt brush patterns in pixels
+
 
 class PercentBar(QWidget):
     def __init__(self, parent=None, tooltipFormat=None):
         super(PercentBar, self).__init__(parent)
         self.setMinimumSize(QSize(32, 16))
         self.numbers = 4 * [None]
+        self.estimate = None  # Estimate shown instead of the numbers, while they are not exact
         self.tf = "Analyzed: {}%\nTrue: {}%"
 
         self.unassessedColor = QColor(Qt.lightGray)
@@ -54,72 +60,190 @@ class PercentBar(QWidget):
         painter = QPainter(self)
         self.paint(painter, rec)
 
+    def colors(self):
+        return self.unassessedColor, self.assessedColor, self.trueColor, self.textColor
+
     def paint(self, painter, rec0) -> None:
-        painter.setPen(Qt.NoPen)
-        b = painter.brush()
-        b.setColor(self.unassessedColor)
-        b.setStyle(Qt.SolidPattern)
-        painter.setBrush(b)
-
-        rec0 = rec0.marginsRemoved(QMargins(2, 2, 2, 2))
-        rec = QRect(rec0)
-        painter.drawRect(rec0)
-        b.setColor(self.assessedColor)
-        painter.setBrush(b)
-        true = self.numbers[0]
-        binSize = self.numbers[1]
-        false = self.numbers[2]
-        total = self.numbers[3]
-        haveNumbers = isinstance(true, int) and isinstance(false, int) and isinstance(total, int)
-
-        if haveNumbers:
-            w = rec.width() * (true + false) / float(total)
-            b.setStyle(Qt.SolidPattern)
-        else:
-            true = "?"
-            total = "?"
-            w = 0.25 * rec.width()
-            b.setStyle(Qt.BDiagPattern)
-        painter.setBrush(b)
-        rec = QRect(rec.topLeft(), QSize(int(w), rec.height()))
-        painter.drawRect(rec)
-        b.setColor(self.trueColor)
-        painter.setBrush(b)
-        if haveNumbers:
-            if true + false == 0:
-                w = 0
-            else:
-                w = rec.width() * float(true) / (true + false)
-            b.setStyle(Qt.SolidPattern)
+        if self.estimate is not None:
+            drawEstimate(painter, rec0, self.estimate, self.colors())
         else:
-            w = 0.25 * rec.width()
-            b.setStyle(Qt.BDiagPattern)
+            drawBar(painter, rec0, self.numbers, self.colors())
 
-        rec = QRect(rec.topLeft(), QSize(int(w), rec.height()))
-        painter.drawRect(rec)
 
-        pen = QPen()
+class PercentBarRenderer:
+    """
+    Flyweight drawing the bars of any number of cells without a widget per cell. Every distinct bar is rendered once
+    into a QPixmap, which is kept in a bounded LRU cache keyed by everything the drawing depends on: the size, the
+    numbers or the estimate, the colours, the font and the device pixel ratio. The cached pixmap has the pixels drawBar would have
+    drawn directly.
+    """
+
+    def __init__(self, maxsize=2000):
+        self.unassessedColor = QColor(Qt.lightGray)
+        self.assessedColor = QColor(Qt.white)
+        self.trueColor = QColor(Qt.blue).lighter(180)
+        self.textColor = QColor(Qt.black)
+        self.pixmaps = LRUCache(maxsize)
+
+    def colors(self):
+        return self.unassessedColor, self.assessedColor, self.trueColor, self.textColor
 
-        b.setColor(self.textColor)
-        pen.setColor(self.textColor)
-        pen.setStyle(Qt.SolidLine)
-        pen.setBrush(b)
-        pen.setColor(b.color())
+    def paint(self, painter, rect, numbers=None, estimate=None) -> None:
+        numbers = tuple(numbers) if numbers else (None, None, None, None)
+        colors = self.colors()
         font = painter.font()
-        font.setPixelSize(rec.height() * 0.8)
-        font.setBold(True)
+        hints = int(painter.renderHints())
+        ratio = painter.device().devicePixelRatioF()
+        if None in numbers or estimate is not None:
+            # The hatch patterns of the unknown numbers and of the estimates are aligned to the brush origin
+            origin = rect.topLeft() - painter.brushOrigin()
+            phase = (origin.x() % PATTERN_SIZE, origin.y() % PATTERN_SIZE)
+        else:
+            phase = (0, 0)
+        key = (rect.width(), rect.height(), numbers, estimate, tuple(c.rgba() for c in colors), font.key(), hints, ratio,
+               phase)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is None:
+            stats.count("barCacheMisses")
+            pixmap = self.render(rect.size(), numbers, estimate, colors, font, hints, ratio, phase)
+            self.pixmaps[key] = pixmap
+        else:
+            stats.count("barCacheHits")
+        painter.drawPixmap(rect.topLeft(), pixmap)
+
+    @staticmethod
+    def render(size, numbers, estimate, colors, font, hints, ratio, phase):
+        pixmap = QPixmap(size * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHints(QPainter.RenderHints(hints))
+        painter.setBrushOrigin(-phase[0], -phase[1])
         painter.setFont(font)
-        painter.setPen(pen)
-        painter.setBrush(b)
-
-        if isinstance(binSize, int):
-            if HUMANSIZE_FOUND:
-                size = naturalsize(binSize)
-            else:
-                size = binSize
+        if estimate is not None:
+            drawEstimate(painter, QRect(QPoint(0, 0), size), estimate, colors)
         else:
-            size = "?"
-
-        leftText = f"{true} ({size})"
-        painter.drawText(rec0, Qt.AlignLeft | Qt.AlignVCenter, leftText)
-        painter.drawText(rec0, Qt.AlignRight | Qt.AlignVCenter, str(total))
+            drawBar(painter, QRect(QPoint(0, 0), size), numbers, colors)
+        painter.end()
+        return pixmap
+
+
+def drawBar(painter, rec0, numbers, colors) -> None:
+    """
+    Draw the bar into rec0 with the given painter. This is the drawing of both the PercentBar widget and the
+    PercentBarRenderer.
+
+    :param numbers: [binary count, binary size, text count, total count], None where unknown
+    :param colors: (unassessed, assessed, true, text) QColors
+    """
+    unassessedColor, assessedColor, trueColor, textColor = colors
+    painter.setPen(Qt.NoPen)
+    b = painter.brush()
+    b.setColor(unassessedColor)
+    b.setStyle(Qt.SolidPattern)
+    painter.setBrush(b)
+
+    rec0 = rec0.marginsRemoved(QMargins(2, 2, 2, 2))
+    rec = QRect(rec0)
+    painter.drawRect(rec0)
+    b.setColor(assessedColor)
+    painter.setBrush(b)
+    true = numbers[0]
+    binSize = numbers[1]
+    false = numbers[2]
+    total = numbers[3]
+    haveNumbers = isinstance(true, int) and isinstance(false, int) and isinstance(total, int)
+
+    if haveNumbers:
+        w = rec.width() * (true + false) / float(total) if total else 0
+        b.setStyle(Qt.SolidPattern)
+    else:
+        true = "?"
+        total = "?"
+        w = 0.25 * rec.width()
+        b.setStyle(Qt.BDiagPattern)
+    painter.setBrush(b)
+    rec = QRect(rec.topLeft(), QSize(int(w), rec.height()))
+    painter.drawRect(rec)
+    b.setColor(trueColor)
+    painter.setBrush(b)
+    if haveNumbers:
+        if true + false == 0:
+            w = 0
+        else:
+            w = rec.width() * float(true) / (true + false)
+        b.setStyle(Qt.SolidPattern)
+    else:
+        w = 0.25 * rec.width()
+        b.setStyle(Qt.BDiagPattern)
+
+    rec = QRect(rec.topLeft(), QSize(int(w), rec.height()))
+    painter.drawRect(rec)
+
+    pen = QPen()
+
+    b.setColor(textColor)
+    pen.setColor(textColor)
+    pen.setStyle(Qt.SolidLine)
+    pen.setBrush(b)
+    pen.setColor(b.color())
+    font = painter.font()
+    font.setPixelSize(int(rec.height() * 0.8))
+    font.setBold(True)
+    painter.setFont(font)
+    painter.setPen(pen)
+    painter.setBrush(b)
+
+    if isinstance(binSize, int):
+        if HUMANSIZE_FOUND:
+            size = naturalsize(binSize)
+        else:
+            size = binSize
+    else:
+        size = "?"
+
+    leftText = f"{true} ({size})"
+    painter.drawText(rec0, Qt.AlignLeft | Qt.AlignVCenter, leftText)
+    painter.drawText(rec0, Qt.AlignRight | Qt.AlignVCenter, str(total))
+
+
+def drawEstimate(painter, rec0, estimate, colors) -> None:
+    """
+    Draw the bar of an Estimate. Unlike the exact numbers, the binary share is hatched, the confidence interval of
+    the binary count is shown as a band along the bottom edge and the text is italic
+
+    :param estimate: src.estimate.Estimate
+    :param colors: (unassessed, assessed, true, text) QColors
+    """
+    unassessedColor, assessedColor, trueColor, textColor = colors
+    rec0 = rec0.marginsRemoved(QMargins(2, 2, 2, 2))
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(QBrush(assessedColor, Qt.SolidPattern))
+    painter.drawRect(rec0)
+
+    total = max(estimate.total, 1)
+
+    def x(count):
+        return int(rec0.width() * min(max(count / total, 0.0), 1.0))
+
+    painter.setBrush(QBrush(trueColor, Qt.Dense3Pattern))
+    painter.drawRect(QRect(rec0.topLeft(), QSize(x(estimate.binCount), rec0.height())))
+    low = x(estimate.binCount - estimate.binCountError)
+    high = x(estimate.binCount + estimate.binCountError)
+    band = max(2, rec0.height() // 5)
+    painter.setBrush(QBrush(trueColor.darker(150), Qt.SolidPattern))
+    painter.drawRect(QRect(rec0.left() + low, rec0.bottom() - band + 1, max(1, high - low), band))
+
+    font = painter.font()
+    font.setPixelSize(int(rec0.height() * 0.8))
+    font.setBold(True)
+    font.setItalic(True)
+    painter.setFont(font)
+    painter.setPen(QPen(textColor))
+    if HUMANSIZE_FOUND:
+        size = naturalsize(estimate.binSize)
+    else:
+        size = f"{estimate.binSize:.0f}"
+    painter.drawText(rec0, Qt.AlignLeft | Qt.AlignVCenter,
+                     f"~{estimate.binCount:.0f} ± {estimate.binCountError:.0f} ({size})")
+    painter.drawText(rec0, Qt.AlignRight | Qt.AlignVCenter, f"{estimate.classified}/{estimate.total}")
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 19:40 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Writers of the analysis results in machine readable formats. The records are written one by one as they are
+produced, so that a report never has to be held in memory as a whole.
+"""
+
+__all__ = ['ReportWriter', 'NdjsonWriter', 'JsonWriter', 'CsvWriter', 'WRITERS', 'DIFF_COLUMNS', 'fileRecord',
+           'dirRecord', 'changeRecord', 'deltaRecord']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import csv
+import json
+
+
+def fileRecord(path, binary, size):
+    return {"type": "file", "path": path, "binary": binary, "size": size}
+
+
+def dirRecord(path, dir):
+    """Record with the numbers aggregated over the subtree of the Dir"""
+    return {"type": "dir", "path": path, "files": dir.totalFiles(), "binFiles": dir.binCount(),
+            "txtFiles": dir.txtCount(), "binSize": dir.binSize(), "txtSize": dir.txtSize()}
+
+
+def changeRecord(change):
+    """Record of a diff.FileChange; binary and size are the new values"""
+    return {"type": change.kind, "path": change.path, "binary": change.newBinary, "size": change.newSize,
+            "oldBinary": change.oldBinary, "oldSize": change.oldSize}
+
+
+def deltaRecord(delta):
+    """Record of a diff.DirDelta: the differences of the numbers aggregated over the subtree"""
+    return dict(type="delta", **delta._asdict())
+
+
+# Columns of the CSV diff reports
+DIFF_COLUMNS = ["type", "path", "binary", "size", "oldBinary", "oldSize", "files", "binFiles", "txtFiles", "binSize",
+                "txtSize"]
+
+
+class ReportWriter:
+    """
+    Base class of the writers. A report is written with begin(), any number of write() calls and end().
+    The columns only matter for the formats with a fixed set of columns
+    """
+
+    def __init__(self, out, columns=None):
+        self.out = out
+
+    def begin(self, root):
+        pass
+
+    def write(self, record):
+        raise NotImplementedError
+
+    def end(self, summary):
+        self.write(dict(type="summary", **summary))
+        self.flush()
+
+    def flush(self):
+        self.out.flush()
+
+
+class NdjsonWriter(ReportWriter):
+    """One JSON object per line"""
+
+    def write(self, record):
+        self.out.write(json.dumps(record))
+        self.out.write("\n")
+
+
+class JsonWriter(ReportWriter):
+    """A single JSON document: {"root": ..., "entries": [...], "summary": {...}}"""
+
+    def __init__(self, out, columns=None):
+        super().__init__(out)
+        self.first = True
+
+    def begin(self, root):
+        self.out.write('{"root": %s, "entries": [' % json.dumps(root))
+
+    def write(self, record):
+        self.out.write("\n" if self.first else ",\n")
+        self.out.write(json.dumps(record))
+        self.first = False
+
+    def end(self, summary):
+        self.out.write('\n], "summary": %s}\n' % json.dumps(summary))
+        self.flush()
+
+
+class CsvWriter(ReportWriter):
+    """One row per record; the columns not applicable to the type of the record are empty"""
+    COLUMNS = ["type", "path", "binary", "size", "files", "binFiles", "txtFiles", "binSize", "txtSize"]
+
+    def __init__(self, out, columns=None):
+        super().__init__(out)
+        self.writer = csv.DictWriter(out, columns or self.COLUMNS, extrasaction="ignore", lineterminator="\n")
+
+    def begin(self, root):
+        self.writer.writeheader()
+
+    def write(self, record):
+        flags = {key: int(record[key]) for key in ("binary", "oldBinary") if isinstance(record.get(key), bool)}
+        if flags:
+            record = dict(record, **flags)
+        self.writer.writerow(record)
+
+
+WRITERS = {"ndjson": NdjsonWriter, "json": JsonWriter, "csv": CsvWriter}
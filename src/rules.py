@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 03:05 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Exclusion rules pruning the tree while it is walked: gitignore-style glob patterns, a depth limit, a file size limit
+and optionally the .gitignore files found in the tree. The patterns of a rule set are compiled into a single regular
+expression for the directories and one for the files, so every entry costs one match per rule set. The pruned
+directories are never listed. The pruned entries are counted, also in the process-wide stats.
+
+Supported pattern syntax (a subset of gitignore): "*", "?", "[...]" and "**" wildcards, a leading "/" or a "/" inside
+the pattern anchors it to the directory of the rule set, a trailing "/" matches directories only, a leading "!"
+re-includes what a previous pattern excluded and the last matching pattern wins. The rules of a .gitignore apply below
+its directory and take precedence over the rules of the ancestors and over the configured patterns.
+"""
+
+__all__ = ['ExcludeRules', 'RuleSet', 'globToRegex']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import logging
+import os
+import re
+
+from src.stats import stats
+
+GITIGNORE = ".gitignore"
+
+
+def globToRegex(glob):
+    """Translate the glob of a pattern, without the leading "!" and "/" and the trailing "/", to a regex string"""
+    result = []
+    i = 0
+    n = len(glob)
+    while i < n:
+        c = glob[i]
+        if glob.startswith("**/", i):
+            result.append("(?:.*/)?")
+            i += 3
+            continue
+        if glob.startswith("/**", i) and i + 3 == n:
+            result.append("/.*")
+            i += 3
+            continue
+        if glob.startswith("**", i):
+            result.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            result.append("[^/]*")
+        elif c == "?":
+            result.append("[^/]")
+        elif c == "[":
+            end = glob.find("]", i + 2 if glob.startswith("[!", i) or glob.startswith("[^", i) else i + 1)
+            if end < 0:
+                result.append(re.escape(c))
+            else:
+                body = glob[i + 1:end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                result.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            result.append(re.escape(glob[i]))
+        else:
+            result.append(re.escape(c))
+        i += 1
+    return "".join(result)
+
+
+class RuleSet:
+    """The patterns of one source (the configuration or a .gitignore), compiled for the paths relative to base"""
+
+    def __init__(self, patterns, base=""):
+        self.base = base  # Path of the directory of the rules relative to the root, "" for the root
+        dirAlternatives = []
+        fileAlternatives = []
+        self.negated = {}
+        # The alternatives are tried in reverse order, so the first one matching is the last pattern matching
+        for i, line in reversed(list(enumerate(patterns))):
+            line = line.rstrip("\n")
+            if not line.endswith("\\ "):  # An escaped trailing space is kept
+                line = line.rstrip(" ")
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated or line.startswith(("\\!", "\\#")):
+                line = line[1:]
+            dirOnly = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            body = globToRegex(line.lstrip("/"))
+            regex = f"(?P<p{i}>{body if anchored else '(?:.*/)?' + body})"
+            self.negated[f"p{i}"] = negated
+            dirAlternatives.append(regex)
+            if not dirOnly:
+                fileAlternatives.append(regex)
+        self.dirRegex = self._compile(dirAlternatives)
+        self.fileRegex = self._compile(fileAlternatives)
+
+    @staticmethod
+    def _compile(alternatives):
+        if not alternatives:
+            return None
+        return re.compile("(?:" + "|".join(alternatives) + r")\Z")
+
+    def __bool__(self):
+        return self.dirRegex is not None
+
+    def match(self, rel, isDir):
+        """
+        Return True if the path (relative to the root) is excluded, False if it is re-included and None if no
+        pattern matches
+        """
+        regex = self.dirRegex if isDir else self.fileRegex
+        if regex is None:
+            return None
+        if self.base:
+            rel = rel[len(self.base) + 1:]
+        m = regex.match(rel)
+        if m is None:
+            return None
+        return not self.negated[m.lastgroup]
+
+
+class ExcludeRules:
+    """
+    Configurable exclusion rules. Bound to the root of the scan with setRoot, they filter the listings of the
+    directories below it. Picklable, so that they can be passed to the worker processes.
+    """
+
+    def __init__(self, patterns=(), maxDepth=None, maxSize=None, gitignore=False):
+        """
+        :param patterns: gitignore-style patterns; a string is split at whitespace
+        :param maxDepth: the directories deeper than maxDepth levels below the root are not listed
+        :param maxSize: the files larger than maxSize bytes are left out
+        :param gitignore: if True, the .gitignore files in the tree are honoured
+        """
+        if isinstance(patterns, str):
+            patterns = patterns.split()
+        self.patterns = list(patterns)
+        self.rules = RuleSet(self.patterns)
+        self.maxDepth = maxDepth
+        self.maxSize = maxSize
+        self.gitignore = gitignore
+        self.root = None
+        self.chains = {}  # Relative path of a directory -> tuple of the RuleSets applying to it, the nearest first
+        self.prunedDirs = 0
+        self.prunedFiles = 0
+        self.prunedBytes = 0
+
+    def __bool__(self):
+        return bool(self.rules) or self.maxDepth is not None or self.maxSize is not None or self.gitignore
+
+    def setRoot(self, root):
+        self.root = os.path.normpath(root)
+        self.chains = {}
+
+    def relative(self, path):
+        """Path relative to the root with "/" separators, "" for the root itself"""
+        rel = os.path.relpath(path, self.root)
+        if rel == os.curdir:
+            return ""
+        return rel.replace(os.sep, "/")
+
+    def chain(self, rel, hasGitignore=None):
+        """
+        Return the RuleSets applying to the content of the directory at rel, the nearest first
+
+        :param hasGitignore: whether the directory contains a .gitignore, if known from its listing
+        """
+        chain = self.chains.get(rel)
+        if chain is not None:
+            return chain
+        if rel == "":
+            parent = (self.rules,) if self.rules else ()
+        else:
+            parent = self.chain(rel.rpartition("/")[0])
+        chain = parent
+        if self.gitignore and hasGitignore is not False:
+            path = os.path.join(self.root, rel) if rel else self.root
+            try:
+                with open(os.path.join(path, GITIGNORE), encoding="utf-8", errors="replace") as f:
+                    rules = RuleSet(f.readlines(), rel)
+                if rules:
+                    chain = (rules,) + parent
+            except OSError:
+                pass
+        self.chains[rel] = chain
+        return chain
+
+    def excluded(self, path, isDir, size=None):
+        """Return True if the path below the root, or one of its ancestors, is excluded by the rules"""
+        rel = self.relative(path)
+        if rel == "" or rel.startswith(".."):
+            return False
+        if not isDir and self.maxSize is not None and size is not None and size > self.maxSize:
+            return True
+        parts = rel.split("/")
+        if self.maxDepth is not None and len(parts) - (0 if isDir else 1) > self.maxDepth:
+            return True
+        for i in range(1, len(parts) + 1):
+            if self._match(self.chain("/".join(parts[:i - 1])), "/".join(parts[:i]), isDir or i < len(parts)):
+                return True
+        return False
+
+    def filter(self, path, dirs, files):
+        """
+        Remove the excluded entries from the listing of a directory, as returned by Walker.listDir
+
+        :return: the filtered (dirs, files) tuple
+        """
+        rel = self.relative(path)
+        if rel.startswith(".."):
+            logging.debug(f"Not below the root of the rules: {path}")
+            return dirs, files
+        chain = self.chain(rel, any(name == GITIGNORE for name, st in files))
+        prefix = rel + "/" if rel else ""
+        depth = rel.count("/") + 1 if rel else 0
+        if self.maxDepth is not None and depth + 1 > self.maxDepth:
+            keptDirs = []
+        else:
+            keptDirs = [name for name in dirs if not self._match(chain, prefix + name, True)]
+        keptFiles = [(name, st) for name, st in files
+                     if not (self.maxSize is not None and st.st_size > self.maxSize)
+                     and not self._match(chain, prefix + name, False)]
+        prunedDirs = len(dirs) - len(keptDirs)
+        prunedFiles = len(files) - len(keptFiles)
+        if prunedDirs or prunedFiles:
+            kept = {name for name, st in keptFiles}
+            prunedBytes = sum(st.st_size for name, st in files if name not in kept)
+            self.prunedDirs += prunedDirs
+            self.prunedFiles += prunedFiles
+            self.prunedBytes += prunedBytes
+            stats.count("prunedDirs", prunedDirs)
+            stats.count("prunedFiles", prunedFiles)
+            stats.count("prunedBytes", prunedBytes)
+        return keptDirs, keptFiles
+
+    @staticmethod
+    def _match(chain, rel, isDir):
+        for rules in chain:
+            result = rules.match(rel, isDir)
+            if result is not None:
+                return result
+        return False
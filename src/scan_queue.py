@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 17:10 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Prioritized work queue for the lazy scanning. Directories to be listed and directories whose files are to be
+classified are queued as tasks; the tasks for what the user is looking at are promoted ahead of the background sweep.
+"""
+
+__all__ = ['ScanQueue']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import heapq
+import itertools
+import threading
+
+
+class ScanQueue:
+    """
+    Thread-safe priority queue of (kind, path) tasks. Tasks of the same priority are served first in, first out,
+    which makes the background sweep breadth-first. A task stays unfinished from push until taskDone is called for
+    it, so that consumers can tell an empty queue from a finished job.
+    """
+    LIST = "list"
+    CLASSIFY = "classify"
+
+    VISIBLE = 0
+    BACKGROUND = 1
+
+    def __init__(self):
+        self._heap = []
+        self._tasks = {}  # (kind, path) -> (priority, payload)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.unfinished = 0
+
+    def __len__(self):
+        with self._cond:
+            return len(self._tasks)
+
+    def __contains__(self, key):
+        with self._cond:
+            return key in self._tasks
+
+    def push(self, kind, path, priority=BACKGROUND, payload=None):
+        """Queue a task. If the task is queued already, it is only promoted, if the priority is higher"""
+        with self._cond:
+            key = (kind, path)
+            task = self._tasks.get(key)
+            if task is None:
+                self.unfinished += 1
+            elif task[0] <= priority:
+                return
+            else:
+                payload = task[1]
+            self._tasks[key] = (priority, payload)
+            heapq.heappush(self._heap, (priority, next(self._seq), kind, path))
+            self._cond.notify()
+
+    def promote(self, kind, path, priority=VISIBLE):
+        """Raise the priority of a queued task. Returns False if the task is not queued"""
+        with self._cond:
+            if (kind, path) not in self._tasks:
+                return False
+        self.push(kind, path, priority)
+        return True
+
+    def priority(self, kind, path):
+        """Return the priority of a queued task or None"""
+        with self._cond:
+            task = self._tasks.get((kind, path))
+            return None if task is None else task[0]
+
+    def pop(self, timeout=None):
+        """
+        Return the next task as (kind, path, priority, payload) tuple. Blocks until a task is available.
+        Returns None on timeout, when the queue has been closed or when all tasks have been finished.
+        """
+        with self._cond:
+            while True:
+                while self._heap:
+                    priority, _, kind, path = heapq.heappop(self._heap)
+                    task = self._tasks.get((kind, path))
+                    if task is not None and task[0] == priority:
+                        del self._tasks[(kind, path)]
+                        return kind, path, priority, task[1]
+                if self._closed or self.unfinished == 0:
+                    return None
+                if not self._cond.wait(timeout):
+                    return None
+
+    def finished(self):
+        """Return True if the queue has been closed or all tasks have been finished"""
+        with self._cond:
+            return self._closed or self.unfinished == 0
+
+    def taskDone(self):
+        """Mark a popped task as finished"""
+        with self._cond:
+            self.unfinished -= 1
+            self._cond.notify_all()
+
+    def close(self):
+        """Wake up and stop all consumers"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
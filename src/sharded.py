@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 21:05 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Scan of a directory tree by a pool of processes, so that listing, stat and classification of the files are not
+serialized by the GIL. The tree is sharded by subdirectory. A worker lists and classifies its shard until it has
+seen a budget of entries; the directories it has not got to are handed back and shared out among the workers
+again, so uneven shards are split up between the idle workers. The results travel as packed TreeColumns and are
+merged into the Dir/File tree of the DirManager by the parent process. A directory reached again in another shard,
+e.g. through a symbolic link, is left out there, and the further hard links of a file are found across the shards,
+when the shards are merged.
+"""
+
+__all__ = ['ShardedScanner', 'scanShard']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from src.cache import ClassificationCache
+from src.classifier import classifyBatch
+from src.columnar import TreeColumns, UNKNOWN, CACHED
+from src.dir_manager import Dir, File
+from src.stats import stats
+from src.walker import Walker
+
+_caches = {}  # Read-only cache connection of a worker process per path
+
+
+def _cache(path):
+    if path not in _caches:
+        _caches[path] = ClassificationCache.open(path, readonly=True)
+    return _caches[path]
+
+
+def scanShard(roots, budget, classify=True, cachePath=None, classifier=None, rules=None, walker=None):
+    """
+    Runs in a worker process. Lists the directories below the roots depth first until budget entries have been
+    seen and classifies the files found. The directories are listed with a copy of the given walker, if any, which
+    leaves out the directories reached again within the shard; the ones of other shards are left out by the merge.
+
+    :return: packed TreeColumns; the roots are the first directories and the ones not listed are left unlisted
+    """
+    cols = TreeColumns()
+    paths = {}
+    dirPaths = list(roots)
+    for root in roots:
+        paths[cols.addDir(root)] = root
+    stack = list(reversed(range(len(roots))))
+    walker = walker if walker is not None else Walker(rules=rules)
+    filePaths = []
+    while stack and len(cols) < budget:
+        i = stack.pop()
+        path = paths.pop(i)
+        dirs, files = walker.listDir(path)
+        cols.dirListed[i] = 1
+        for name, st in files:
+            cols.addFile(i, name, st)
+            filePaths.append(os.path.join(path, name))
+        for name in reversed(dirs):
+            j = cols.addDir(name, i)
+            paths[j] = os.path.join(path, name)
+            dirPaths.append(paths[j])
+            stack.append(j)
+    keys = {path: key for key, path in walker.visited.items()}
+    for j in range(len(roots), len(dirPaths)):
+        cols.dirDev[j], cols.dirIno[j] = keys.get(dirPaths[j], (0, 0))
+    if classify and filePaths:
+        missing = range(len(filePaths))
+        cache = _cache(cachePath) if cachePath else None
+        if cache is not None:
+            keys = [cols.statKey(i) for i in missing]
+            found = cache.lookup(keys)
+            for i, key in enumerate(keys):
+                if key in found:
+                    cols.fileBinary[i] = found[key] | CACHED
+            missing = [i for i in missing if cols.fileBinary[i] == UNKNOWN]
+        missing = sorted(missing, key=lambda i: (cols.fileDev[i], cols.fileIno[i]))  # The order of the disk
+        flags, _ = classifyBatch([filePaths[i] for i in missing], [cols.fileSize[i] for i in missing], classifier)
+        for i, binary in zip(missing, flags):
+            cols.fileBinary[i] = binary
+    return cols.pack()
+
+
+class ShardedScanner:
+    """
+    Scans the subtree of an unlisted Dir with a process pool and merges the results into it.
+    The first shard only gets firstBudget entries, so that the work is spread over the workers early.
+    """
+
+    def __init__(self, workers=None, budget=20000, firstBudget=1000, cache=None, classifier=None, rules=None,
+                 walker=None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.budget = budget
+        self.firstBudget = firstBudget
+        self.cache = cache
+        self.classifier = classifier  # TieredClassifier passed to the workers
+        self.rules = rules  # ExcludeRules passed to the workers
+        self.walker = walker  # Walker with the traversal options passed to the workers, if not the default one
+        self.visited = {}  # (device, inode) -> path of the directories merged
+        self.skipped = 0  # Number of directories left out, because they have been merged from another shard already
+        self.shards = 0  # Number of shards scanned
+        self.entries = 0  # Number of entries merged
+        self.elapsed = 0.0
+
+    def scan(self, dir, classify=True, cancelled=None):
+        start = time.perf_counter()
+        cachePath = self.cache.path if self.cache is not None and self.cache.path != ":memory:" else None
+        self.visited = dir.manager.visited if dir.manager is not None else {}
+        try:
+            st = os.stat(dir.path)
+            if st.st_ino:
+                self.visited.setdefault((st.st_dev, st.st_ino), os.path.normpath(dir.path))
+        except OSError:
+            pass
+        pool = ProcessPoolExecutor(self.workers)
+        try:
+            inflight = {pool.submit(scanShard, [dir.path], self.firstBudget, classify, cachePath,
+                                    self.classifier, self.rules, self.walker): [dir]}
+            while inflight:
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                if cancelled is not None and cancelled():
+                    return
+                for future in done:
+                    unlisted = self.merge(inflight.pop(future), TreeColumns.unpack(future.result()))
+                    # Share the rest out among the workers; idle ones pick the groups up first
+                    ngroups = min(len(unlisted), self.workers)
+                    for k in range(ngroups):
+                        group = unlisted[k::ngroups]
+                        inflight[pool.submit(scanShard, [d.path for d in group], self.budget, classify,
+                                             cachePath, self.classifier, self.rules, self.walker)] = group
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.elapsed += time.perf_counter() - start
+        logging.info(f"Scanned {self.entries} entries in {self.shards} shards in {self.elapsed:0.2f} s")
+
+    def merge(self, roots, cols):
+        """
+        Build the Dir/File objects of a shard and attach them to the root Dirs. The directories merged from another
+        shard already are left out with their subtrees. Returns the Dirs left unlisted
+        """
+        start = time.perf_counter()
+        self.shards += 1
+        self.entries += len(cols)
+        stats.count("shards")
+        stats.count("items", len(cols) - len(roots))
+        manager = roots[0].manager if roots else None
+        dirs = list(roots) + [Dir(name, None, scan=False) for name in cols.dirNames[len(roots):]]
+        paths = [os.path.normpath(root.path) for root in roots]
+        kept = bytearray(b"\1") * len(dirs)
+        for i in range(len(roots), len(dirs)):
+            paths.append(os.path.join(paths[cols.dirParent[i]], cols.dirNames[i]))
+            if not kept[cols.dirParent[i]]:
+                kept[i] = 0
+                continue
+            key = cols.dirDev[i], cols.dirIno[i]
+            if key[1] and self.visited.setdefault(key, paths[i]) != paths[i]:
+                kept[i] = 0
+                self.skipped += 1
+                stats.count("dirsSkipped")
+        # The subtrees are filled while detached, so that the aggregates are propagated only once
+        files = []
+        links = []  # The files with several hard links are resolved by the manager, once the subtrees are attached
+        store = []
+        devices = {}
+        for i, name in enumerate(cols.fileNames):
+            if not kept[cols.fileDir[i]]:
+                continue
+            dir = dirs[cols.fileDir[i]]
+            binary = cols.fileBinary[i]
+            if binary != UNKNOWN and not binary & CACHED:
+                store.append((cols.statKey(i), bool(binary & 1)))
+            if manager is not None and cols.fileNlink[i] > 1:
+                links.append((dir, name, i))
+                continue
+            if files and files[-1].parent is not dir:
+                files[-1].parent.addFiles(files)
+                files = []
+            file = File(name, None, dir)
+            dev, file.ino, file.bytes, file.mtime = cols.statKey(i)
+            file.dev = devices.setdefault(dev, dev)
+            if binary != UNKNOWN:
+                file.binary = bool(binary & 1)
+            files.append(file)
+        if files:
+            files[-1].parent.addFiles(files)
+        unlisted = []
+        for i, dir in enumerate(dirs):
+            if not kept[i]:
+                continue
+            if cols.dirListed[i]:
+                dir.listed = True
+                dir.propagate(unlisted=-1)
+            else:
+                unlisted.append(dir)
+        for i in range(len(dirs) - 1, len(roots) - 1, -1):
+            if kept[i]:
+                dirs[cols.dirParent[i]].addDir(dirs[i])
+        for dir, name, i in links:
+            file = manager.newFile(name, dir, cols.stat(i))
+            dir.addFiles([file])
+            binary = cols.fileBinary[i]
+            if binary != UNKNOWN:
+                file.setBinary(bool(binary & 1))  # Counted as a link, e.g. without its bytes
+        if store and self.cache is not None:
+            self.cache.store(store)
+        stats.add("merge", time.perf_counter() - start)
+        return unlisted
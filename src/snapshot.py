@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 04:10 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Snapshots of the tree of a DirManager: the structure, the stat data, the binary flags and the aggregates are saved
+in a compact, versioned binary file, so that the state of a large tree can be reopened without scanning and
+classifying it again.
+
+The file starts with a fixed header, followed by a JSON block of metadata (root path, time of creation, exclusion
+rules, traversal options) and a table of the columns. The columns are typed arrays in native byte order, aligned to 8 bytes, each
+optionally compressed with zlib. The directories are stored in breadth-first order, so that the subdirectories and
+the files of a directory occupy contiguous ranges of rows.
+
+A snapshot is opened memory-mapped. Only the root Dir is created at first; the subdirectories and files of a
+directory are created from the columns when they are accessed for the first time. The aggregates are stored per
+directory, so nothing has to be propagated while loading. The compressed columns are decompressed on first use.
+"""
+
+__all__ = ['Snapshot', 'SnapshotDir', 'save', 'MAGIC', 'VERSION']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from src.columnar import UNKNOWN
+from src.dir_manager import Dir, File
+from src.rules import ExcludeRules
+from src.stats import stats
+from src.walker import Walker
+
+MAGIC = b"SFBSNAP\0"
+VERSION = 1
+COMPRESSED = 1  # Flag of the header: the columns are compressed
+BIG_ENDIAN = 2  # Flag of the header: the columns are in big endian byte order
+
+_HEADER = struct.Struct("<8sHHIqq")  # magic, version, flags, length of the metadata, number of dirs and files
+_ENTRY = struct.Struct("<QQQ")  # offset, stored length and raw length of a column
+_ALIGN = 8
+
+# Names and types of the columns, in the order of the file. The names are stored as one blob of the encoded names
+# per table and an array of the offsets of the names in it
+COLUMNS = (
+    ("dirNameOffsets", "Q"), ("dirNames", "B"), ("dirFirstDir", "q"), ("dirNDirs", "q"), ("dirFirstFile", "q"),
+    ("dirNFiles", "q"), ("dirListed", "B"), ("dirBin", "q"), ("dirTxt", "q"), ("dirTotalFiles", "q"),
+    ("dirTotalBin", "q"), ("dirTotalTxt", "q"), ("dirBinSize", "q"), ("dirTxtSize", "q"), ("dirBinSize2", "d"),
+    ("dirUnlisted", "q"),
+    ("fileNameOffsets", "Q"), ("fileNames", "B"), ("fileSize", "q"), ("fileMtime", "q"), ("fileIno", "Q"),
+    ("fileDev", "Q"), ("fileBinary", "B"),
+)
+
+
+def save(root, path, compress=False, rules=None, traversal=None):
+    """
+    Save the tree below the Dir root to a snapshot file. The file is written under a temporary name first and
+    replaced at once, so that a snapshot being read is never seen half-written.
+
+    :param compress: if True, the columns are compressed with zlib
+    :param rules: the ExcludeRules the tree has been scanned with, if any; they are stored with the snapshot
+    :param traversal: dict of the traversal options of the DirManager (followSymlinks, oneFilesystem, uniqueBytes)
+                      the tree has been scanned with, if not the default ones; they are stored with the snapshot
+    :return: the number of bytes written
+    """
+    start = time.perf_counter()
+    cols = {name: array(typecode) for name, typecode in COLUMNS}
+    dirNames = bytearray()
+    fileNames = bytearray()
+    cols["dirNameOffsets"].append(0)
+    cols["fileNameOffsets"].append(0)
+    dirs = [root]
+    i = 0
+    while i < len(dirs):
+        dir = dirs[i]
+        i += 1
+        dirNames += os.fsencode(dir.name)
+        cols["dirNameOffsets"].append(len(dirNames))
+        cols["dirFirstDir"].append(len(dirs))
+        cols["dirNDirs"].append(len(dir.dirs))
+        dirs.extend(dir.dirs)
+        cols["dirFirstFile"].append(len(cols["fileSize"]))
+        cols["dirNFiles"].append(len(dir.files))
+        cols["dirListed"].append(bool(dir.listed))
+        for name, value in (("dirBin", dir.nbinFiles), ("dirTxt", dir.ntxtFiles), ("dirTotalFiles", dir.nTotalFiles),
+                            ("dirTotalBin", dir.nTotalBin), ("dirTotalTxt", dir.nTotalTxt),
+                            ("dirBinSize", dir.totalBinSize), ("dirTxtSize", dir.totalTxtSize),
+                            ("dirBinSize2", dir.totalBinSize2), ("dirUnlisted", dir.nTotalUnlisted)):
+            cols[name].append(value)
+        for file in dir.files:
+            fileNames += os.fsencode(file.name)
+            cols["fileNameOffsets"].append(len(fileNames))
+            cols["fileSize"].append(-1 if file.bytes is None else file.bytes)
+            known = file.ino is not None
+            cols["fileMtime"].append(file.mtime if known else 0)
+            cols["fileIno"].append(file.ino if known else 0)
+            cols["fileDev"].append(file.dev if known else 0)
+            cols["fileBinary"].append(UNKNOWN if file.binary is None else int(file.binary))
+    cols["dirNames"] = array("B", dirNames)
+    cols["fileNames"] = array("B", fileNames)
+
+    meta = {"root": root.path, "created": time.time(), "rules": None, "traversal": dict(traversal or {})}
+    if rules:
+        meta["rules"] = {"patterns": rules.patterns, "maxDepth": rules.maxDepth, "maxSize": rules.maxSize,
+                         "gitignore": rules.gitignore}
+    meta = json.dumps(meta).encode()
+    flags = (COMPRESSED if compress else 0) | (BIG_ENDIAN if sys.byteorder == "big" else 0)
+    header = _HEADER.pack(MAGIC, VERSION, flags, len(meta), len(dirs), len(cols["fileSize"]))
+    offset = _aligned(len(header) + len(meta) + _ENTRY.size * len(COLUMNS))
+    entries = []
+    blocks = []
+    for name, _ in COLUMNS:
+        raw = cols[name].tobytes()
+        data = zlib.compress(raw, 1) if compress else raw
+        entries.append(_ENTRY.pack(offset, len(data), len(raw)))
+        blocks.append((offset, data))
+        offset = _aligned(offset + len(data))
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(meta)
+            f.write(b"".join(entries))
+            for position, data in blocks:
+                f.write(bytes(position - f.tell()))
+                f.write(data)
+            size = f.tell()
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    stats.add("snapshotSave", time.perf_counter() - start)
+    return size
+
+
+def _aligned(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class Snapshot:
+    """
+    Snapshot file opened for reading. The columns are memory-mapped views (or decompressed arrays) created on
+    first use. The file stays mapped until close() is called; the lazily created Dir objects read from it.
+    """
+
+    def __init__(self, path):
+        start = time.perf_counter()
+        self.path = path
+        self._columns = {}
+        self._views = []
+        self.devices = {}  # One shared int object per device number
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, flags, metaLength, self.ndirs, self.nfiles = _HEADER.unpack_from(self._mmap)
+        except struct.error:
+            self.close()
+            raise ValueError(f"Not a snapshot file: {path}")
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a snapshot file: {path}")
+        if version > VERSION:
+            self.close()
+            raise ValueError(f"Snapshot version {version} is not supported (up to {VERSION}): {path}")
+        self.compressed = bool(flags & COMPRESSED)
+        self.swapped = bool(flags & BIG_ENDIAN) != (sys.byteorder == "big")
+        self.meta = json.loads(self._mmap[_HEADER.size:_HEADER.size + metaLength])
+        self.root = self.meta["root"]
+        self.created = self.meta["created"]
+        self._entries = {}
+        position = _HEADER.size + metaLength
+        for name, typecode in COLUMNS:
+            self._entries[name] = (typecode,) + _ENTRY.unpack_from(self._mmap, position)
+            position += _ENTRY.size
+        stats.add("snapshotOpen", time.perf_counter() - start)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Release the mapping. The Dirs not created yet cannot be created anymore"""
+        self._columns = {}
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def column(self, name):
+        """Return the column as a sequence of its type"""
+        column = self._columns.get(name)
+        if column is None:
+            typecode, offset, length, rawLength = self._entries[name]
+            if self.compressed or self.swapped:
+                column = array(typecode)
+                data = self._mmap[offset:offset + length]
+                column.frombytes(zlib.decompress(data) if self.compressed else data)
+                if self.swapped:
+                    column.byteswap()
+            else:
+                view = memoryview(self._mmap)[offset:offset + length]
+                column = view.cast(typecode)
+                self._views.extend((view, column))
+            self._columns[name] = column
+        return column
+
+    def names(self, table, first, n):
+        """Return the list of the names of n directories or files from the first one on; table is "dir" or "file" """
+        if n <= 0:
+            return []
+        offsets = self.column(table + "NameOffsets")
+        base = offsets[first]
+        blob = bytes(self.column(table + "Names")[base:offsets[first + n]])
+        text = os.fsdecode(blob)
+        if len(text) == len(blob):
+            # Only single byte characters: the offsets in the blob are the offsets in the text
+            return [text[offsets[i] - base:offsets[i + 1] - base] for i in range(first, first + n)]
+        return [os.fsdecode(blob[offsets[i] - base:offsets[i + 1] - base]) for i in range(first, first + n)]
+
+    def rules(self):
+        """Return the ExcludeRules stored with the snapshot or None"""
+        rules = self.meta.get("rules")
+        if rules is None:
+            return None
+        return ExcludeRules(rules["patterns"], rules["maxDepth"], rules["maxSize"], rules["gitignore"])
+
+    def traversal(self):
+        """Return the dict of the traversal options of the DirManager stored with the snapshot; {} for the defaults"""
+        return dict(self.meta.get("traversal") or {})
+
+    def tree(self, manager):
+        """Return the root Dir of the snapshot for the manager; its subtree is created lazily"""
+        return SnapshotDir(self.root, manager, None, self, 0)
+
+    def dirPaths(self):
+        """Return the list of the full paths of the directories, in the order of the rows"""
+        paths = [self.root]
+        firstDir = self.column("dirFirstDir")
+        nDirs = self.column("dirNDirs")
+        for i in range(self.ndirs):
+            path = paths[i]
+            paths.extend(os.path.join(path, name) for name in self.names("dir", firstDir[i], nDirs[i]))
+        return paths
+
+    def validate(self, cancelled=None, rules=None, walker=None):
+        """
+        Compare the snapshot with the file system. Generator of the paths of the listed directories, whose content
+        differs: entries added or removed or files whose stat data has changed. Meant to be run in the background;
+        the directories can then be brought up to date with DirManager.refreshDir
+
+        :param rules: ExcludeRules to list the directories with, by default the ones stored with the snapshot
+        :param walker: Walker to list the directories with, by default one with the rules and the traversal options
+                       stored with the snapshot, so that the same directories are found as by the scan
+        """
+        if walker is None:
+            rules = rules if rules is not None else self.rules()
+            if rules is not None:
+                rules.setRoot(self.root)
+            traversal = self.traversal()
+            walker = Walker(traversal.get("followSymlinks", True), rules, traversal.get("oneFilesystem", False))
+        firstDir, nDirs = self.column("dirFirstDir"), self.column("dirNDirs")
+        firstFile, nFiles = self.column("dirFirstFile"), self.column("dirNFiles")
+        listed = self.column("dirListed")
+        size, mtime = self.column("fileSize"), self.column("fileMtime")
+        ino, dev = self.column("fileIno"), self.column("fileDev")
+        for i, path in enumerate(self.dirPaths()):
+            if cancelled is not None and cancelled():
+                return
+            if not listed[i]:
+                continue
+            dirs, files = walker.listDir(path)
+            if not dirs and not files and not os.path.isdir(path):
+                continue  # Gone; found with its parent
+            if sorted(self.names("dir", firstDir[i], nDirs[i])) != dirs or len(files) != nFiles[i]:
+                yield path
+                continue
+            rows = dict(zip(self.names("file", firstFile[i], nFiles[i]), range(firstFile[i], firstFile[i] + nFiles[i])))
+            for name, st in files:
+                j = rows.get(name)
+                if j is None or (dev[j], ino[j], size[j], mtime[j]) != \
+                        (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns):
+                    yield path
+                    break
+
+
+_dirsSlot = Dir.dirs
+_filesSlot = Dir.files
+
+
+class SnapshotDir(Dir):
+    """
+    Dir of a snapshot. Its aggregates are read from the snapshot when it is created; its subdirectories and files
+    are created on the first access to dirs or files
+    """
+    __slots__ = ("_snapshot", "_row")
+
+    def __init__(self, basepath, manager, parent, snapshot, row):
+        self._snapshot = None
+        super().__init__(basepath, manager, parent, scan=False)
+        self._row = row
+        self.listed = bool(snapshot.column("dirListed")[row])
+        self.nbinFiles = snapshot.column("dirBin")[row]
+        self.ntxtFiles = snapshot.column("dirTxt")[row]
+        self.nTotalFiles = snapshot.column("dirTotalFiles")[row]
+        self.nTotalBin = snapshot.column("dirTotalBin")[row]
+        self.nTotalTxt = snapshot.column("dirTotalTxt")[row]
+        self.totalBinSize = snapshot.column("dirBinSize")[row]
+        self.totalTxtSize = snapshot.column("dirTxtSize")[row]
+        self.totalBinSize2 = int(snapshot.column("dirBinSize2")[row])
+        self.nTotalUnlisted = snapshot.column("dirUnlisted")[row]
+        self._snapshot = snapshot
+
+    @property
+    def dirs(self):
+        if self._snapshot is not None:
+            self._materialize()
+        return _dirsSlot.__get__(self)
+
+    @dirs.setter
+    def dirs(self, value):
+        _dirsSlot.__set__(self, value)
+
+    @property
+    def files(self):
+        if self._snapshot is not None:
+            self._materialize()
+        return _filesSlot.__get__(self)
+
+    @files.setter
+    def files(self, value):
+        _filesSlot.__set__(self, value)
+
+    def _materialize(self):
+        """Create the subdirectories and the files from the snapshot"""
+        snapshot, row = self._snapshot, self._row
+        self._snapshot = None
+        start = time.perf_counter()
+        first = snapshot.column("dirFirstDir")[row]
+        names = snapshot.names("dir", first, snapshot.column("dirNDirs")[row])
+        _dirsSlot.__set__(self, [SnapshotDir(name, None, self, snapshot, i) for i, name in enumerate(names, first)])
+        first = snapshot.column("dirFirstFile")[row]
+        size, mtime = snapshot.column("fileSize"), snapshot.column("fileMtime")
+        ino, dev = snapshot.column("fileIno"), snapshot.column("fileDev")
+        binary = snapshot.column("fileBinary")
+        files = []
+        for i, name in enumerate(snapshot.names("file", first, snapshot.column("dirNFiles")[row]), first):
+            file = File(name, None, self)
+            file.bytes = size[i] if size[i] >= 0 else None
+            if ino[i]:
+                file.dev = snapshot.devices.setdefault(dev[i], dev[i])
+                file.ino = ino[i]
+                file.mtime = mtime[i]
+            if binary[i] != UNKNOWN:
+                file.binary = bool(binary[i])
+            files.append(file)
+        _filesSlot.__set__(self, files)
+        stats.add("materialize", time.perf_counter() - start)
+        stats.count("items", len(files) + len(_dirsSlot.__get__(self)))
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 22:40 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Instrumentation of the scan, the classification and the rendering. The hot paths add to process-wide counters and
+timers, which are shown in the stats dialog of the GUI and printed with --stats. The updates are made per directory
+or per batch rather than per file, so the instrumentation is cheap enough to be always on.
+Optionally, a whole run can be profiled with cProfile.
+"""
+
+__all__ = ['Stats', 'stats', 'profiled']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import contextlib
+import logging
+import threading
+import time
+
+
+class Stats:
+    """Named counters and timers. A timer accumulates the time spent and the number of timed sections"""
+
+    # Derived values: name -> (counter, timer) for rates per second, (timer, counter) for times per unit
+    RATES = {"listRate": ("entries", "list"), "classifyRate": ("classified", "classify")}
+    TIMES = {"paintPerFrame": ("paint", "frames")}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.timers = {}  # name -> [seconds, count]
+        self.started = time.monotonic()
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def add(self, name, seconds, n=1):
+        """Add n timed sections, which took the given time together"""
+        with self._lock:
+            timer = self.timers.setdefault(name, [0.0, 0])
+            timer[0] += seconds
+            timer[1] += n
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.timers = {}
+            self.started = time.monotonic()
+
+    def snapshot(self):
+        """Return a dict with the counters, the timers as {"seconds", "count"} dicts and the derived rates"""
+        with self._lock:
+            result = dict(self.counters)
+            for name, (seconds, n) in self.timers.items():
+                result[name] = {"seconds": seconds, "count": n}
+        for name, (counter, timer) in self.RATES.items():
+            if counter in result and timer in result and result[timer]["seconds"] > 0:
+                result[name] = result[counter] / result[timer]["seconds"]
+        for name, (timer, counter) in self.TIMES.items():
+            if timer in result and result.get(counter):
+                result[name] = result[timer]["seconds"] / result[counter]
+        return result
+
+    def report(self):
+        """Return the snapshot as human readable text"""
+        lines = [f"{'uptime':24} {time.monotonic() - self.started:14.1f} s"]
+        for name, value in sorted(self.snapshot().items()):
+            if isinstance(value, dict):
+                per = 1000 * value["seconds"] / value["count"] if value["count"] else 0.0
+                lines.append(f"{name:24} {value['seconds']:14.3f} s in {value['count']} ({per:0.3f} ms each)")
+            elif name in self.RATES:
+                lines.append(f"{name:24} {value:14.0f} /s")
+            elif name in self.TIMES:
+                lines.append(f"{name:24} {1000 * value:14.3f} ms")
+            else:
+                lines.append(f"{name:24} {value:14d}")
+        return "\n".join(lines)
+
+
+stats = Stats()
+
+
+@contextlib.contextmanager
+def profiled(path=None):
+    """Profile the block with cProfile and dump the profile to path (for pstats/snakeviz). No-op if path is None"""
+    if not path:
+        yield
+        return
+    import cProfile
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
+        logging.info(f"Profile written to {path}")
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 23:05 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Dialog showing the live instrumentation counters and timers
+"""
+
+__all__ = ['StatsDialog']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+from PyQt5.QtCore import QTimer, pyqtSlot
+from PyQt5.QtGui import QFontDatabase
+from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QPlainTextEdit, QPushButton, QVBoxLayout
+
+from .stats import stats
+
+
+class StatsDialog(QDialog):
+    """Non-modal dialog refreshing the report of the process-wide Stats periodically"""
+
+    def __init__(self, parent=None, interval=500):
+        super().__init__(parent)
+        self.setWindowTitle("Statistics")
+        self.resize(520, 420)
+        self.text = QPlainTextEdit(self)
+        self.text.setReadOnly(True)
+        self.text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        buttons = QDialogButtonBox(QDialogButtonBox.Close, self)
+        reset = QPushButton("Reset", self)
+        buttons.addButton(reset, QDialogButtonBox.ResetRole)
+        reset.clicked.connect(self.onResetClicked)
+        buttons.rejected.connect(self.close)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.text)
+        layout.addWidget(buttons)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    @pyqtSlot()
+    def refresh(self):
+        self.text.setPlainText(stats.report())
+
+    @pyqtSlot()
+    def onResetClicked(self):
+        stats.reset()
+        self.refresh()
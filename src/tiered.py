@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 23:55 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Tiered binary/text classification. Most files can be classified cheaper than by the full check of utils.isText:
+    1. without I/O: empty files are text and, if enabled, well-known extensions decide;
+    2. by a small read of the first MAGIC_SIZE bytes: a non-text byte (binary), the end of the file (the whole file
+       has been checked) or a known magic number of a binary format decide;
+    3. the remaining files are checked on the first READ_SIZE bytes, like isText does.
+Only the extension and the magic number rules may disagree with the full check. In the verify mode, the files decided
+by them are checked fully as well, the disagreements are counted and the result of the full check is returned.
+The files of a batch are opened at once and the readahead of their first READ_SIZE bytes is requested, so that the
+kernel can serve the reads in the order of the disk. They are opened with O_NOATIME, where permitted.
+"""
+
+__all__ = ['TieredClassifier', 'BINARY_EXTENSIONS', 'TEXT_EXTENSIONS', 'MAGIC', 'MAGIC_SIZE']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import copy
+import os
+import stat
+
+from src.utils import is_binary_string, READ_SIZE
+
+MAGIC_SIZE = 64  # Number of bytes read by the second tier
+
+# O_NONBLOCK prevents blocking on a FIFO, which replaced a file since it has been listed
+_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0) | getattr(os, "O_NONBLOCK", 0) | getattr(os, "O_CLOEXEC", 0)
+_NOATIME = getattr(os, "O_NOATIME", 0)
+_FADVISE = hasattr(os, "posix_fadvise")
+
+BINARY_EXTENSIONS = frozenset(
+    ".7z .a .avi .bin .bmp .bz2 .class .dll .dylib .exe .flac .gif .gz .ico .jar .jpeg .jpg .lib .mkv .mov .mp3 "
+    ".mp4 .npy .o .obj .ogg .otf .pdf .png .pyc .pyd .pyo .so .sqlite .tar .tgz .tif .tiff .ttf .wav .webm .webp "
+    ".whl .woff .woff2 .xz .zip .zst".split())
+
+TEXT_EXTENSIONS = frozenset(
+    ".bat .c .cfg .cmake .cpp .css .csv .cxx .h .hpp .html .ini .java .js .json .log .md .py .rst .sh .sql .svg "
+    ".toml .ts .tsv .txt .xml .yaml .yml".split())
+
+# Magic numbers of the formats, whose beginning looks like text -> binary. Formats starting with a non-text byte
+# (PNG, ZIP, ELF, gzip...) need no entry, because the second tier recognizes them anyway. A text header, like "#!",
+# decides nothing: a binary payload may follow it, e.g. in a self-extracting script, so the full check is needed
+MAGIC = {
+    b"%PDF-": True,
+    b"!<arch>\n": True,
+}
+
+
+class TieredClassifier:
+    """
+    Configurable tiered classifier. Picklable, so that it can be passed to the worker processes.
+    The counts of the decisions per tier, of the bytes read and of the disagreements found in the verify mode are
+    kept in the counts dict, named like the counters of stats.
+    """
+
+    def __init__(self, extensions=False, magic=True, verify=False, binaryExtensions=BINARY_EXTENSIONS,
+                 textExtensions=TEXT_EXTENSIONS, readahead=True, noatime=True):
+        """
+        :param extensions: if True, the files with the binary or text extensions are classified without any read
+        :param magic: if True, the files are first checked on MAGIC_SIZE bytes; otherwise all are checked fully
+        :param verify: if True, the decisions by extension and magic number are compared with the full check
+        :param readahead: if True, classifyAll requests the readahead of the files of the batch before reading them
+        :param noatime: if True, the files are opened with O_NOATIME, if the system and the owner permit it
+        """
+        self.extensions = {}
+        if extensions:
+            self.extensions.update((ext, True) for ext in binaryExtensions)
+            self.extensions.update((ext, False) for ext in textExtensions)
+        self.magic = magic
+        self.verify = verify
+        self.readahead = readahead and _FADVISE
+        self.noatime = noatime and bool(_NOATIME)
+        self.counts = {}
+
+    def _count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def forBatch(self):
+        """Return a copy with its own counts, so that the batches classified concurrently do not share them"""
+        classifier = copy.copy(self)
+        classifier.counts = {}
+        return classifier
+
+    def classifyAll(self, paths, sizes=None):
+        """Return the list of binary flags of the files"""
+        sizes = sizes or [None] * len(paths)
+        fds = {}
+        try:
+            if self.readahead:
+                for i, (path, size) in enumerate(zip(paths, sizes)):
+                    if self._needsRead(path, size):
+                        try:
+                            fds[i] = fd = self._open(path)
+                            os.posix_fadvise(fd, 0, READ_SIZE, os.POSIX_FADV_WILLNEED)
+                        except OSError:
+                            pass
+                self._count("readahead", len(fds))
+            return [self.isBinary(path, size, fds.get(i)) for i, (path, size) in enumerate(zip(paths, sizes))]
+        finally:
+            for fd in fds.values():
+                os.close(fd)
+
+    def _needsRead(self, path, size):
+        return size != 0 and (self.verify or os.path.splitext(path)[1].lower() not in self.extensions)
+
+    def _open(self, path):
+        if self.noatime:
+            try:
+                return os.open(path, _FLAGS | _NOATIME)
+            except PermissionError:
+                pass  # Only the owner of the file may use O_NOATIME
+        return os.open(path, _FLAGS)
+
+    def isBinary(self, path, size=None, fd=None):
+        """
+        Classify a file. Files, which cannot be read, are binary, like for isText
+
+        :param size: size of the file in bytes, if known
+        :param fd: file descriptor of the file opened by the caller, which closes it
+        """
+        if size == 0:
+            self._count("tierSize")
+            self._count("readsAvoided")
+            return False
+        binary = self.extensions.get(os.path.splitext(path)[1].lower())
+        if binary is not None:
+            self._count("tierExtension")
+            if not self.verify:
+                self._count("readsAvoided")
+                return binary
+        opened = fd is None
+        try:
+            if opened:
+                fd = self._open(path)
+            if not stat.S_ISREG(os.fstat(fd).st_mode):
+                return True
+            if binary is not None:
+                return self._verified("Extension", binary, self._read(fd, READ_SIZE))
+            return self._check(fd)
+        except OSError:
+            return True
+        finally:
+            if opened and fd is not None:
+                os.close(fd)
+
+    def _check(self, fd):
+        if not self.magic:
+            self._count("tierFull")
+            return is_binary_string(self._read(fd, READ_SIZE))
+        head = self._read(fd, MAGIC_SIZE)
+        if len(head) < MAGIC_SIZE or is_binary_string(head):
+            # The whole file has been read or a non-text byte seen: as good as the full check
+            self._count("tierMagic")
+            return is_binary_string(head)
+        for signature, binary in MAGIC.items():
+            if head.startswith(signature):
+                self._count("tierMagic")
+                if not self.verify:
+                    return binary
+                return self._verified("Magic", binary, head + self._read(fd, READ_SIZE - MAGIC_SIZE))
+        self._count("tierFull")
+        return is_binary_string(head + self._read(fd, READ_SIZE - MAGIC_SIZE))
+
+    def _read(self, fd, n):
+        data = os.read(fd, n)
+        self._count("bytesRead", len(data))
+        return data
+
+    def _verified(self, tier, binary, data):
+        """Compare a fast decision with the full check of the data; returns the result of the full check"""
+        full = is_binary_string(data)
+        self._count("verified")
+        if full != binary:
+            self._count(f"disagree{tier}")
+        return full
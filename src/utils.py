@@ -12,6 +12,8 @@ __authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
 
 import os
 
+READ_SIZE = 1024  # Number of bytes read to classify a file
+
 textchars = bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
 is_binary_string = lambda bytes: bool(bytes.translate(None, textchars))
 
@@ -30,4 +32,4 @@ def isText(file: str) -> bool:
         fh = open(file, 'rb')
     except:
         return False
-    return not is_binary_string(fh.read(1024))
+    return not is_binary_string(fh.read(READ_SIZE))
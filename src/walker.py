@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 09:12 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Non-recursive directory tree walker based on os.scandir. The type information and the stat data of the directory
+entries are reused, so that each file costs at most one stat call and no call stack grows with the tree depth.
+
+Each directory is entered once: the (device, inode) pairs of the directories entered are recorded, so that a
+directory reached again, through a symbolic link loop, a bind mount or a link to another part of the tree, is left
+out. That costs one stat call per directory.
+"""
+
+__all__ = ['Walker']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import logging
+import os
+import time
+
+from src.stats import stats
+
+
+class Walker:
+    """
+    Walks a directory tree top-down with an explicit stack instead of recursion. The walkers of a tree, e.g. the
+    ones listing single directories to refresh them, can share the record of the directories entered (visited);
+    an entry of it only counts while its directory still exists there, under the root of the tree
+    """
+
+    def __init__(self, followSymlinks=True, rules=None, oneFilesystem=False, visited=None, root=None):
+        self.followSymlinks = followSymlinks  # Whether the symbolic links are followed; otherwise they are left out
+        self.rules = rules if rules else None  # ExcludeRules bound to the root; the excluded entries are not listed
+        self.oneFilesystem = oneFilesystem  # Whether the directories on other devices than the first one are left out
+        self.visited = visited if visited is not None else {}  # (device, inode) -> path of the directory entered
+        self.root = root  # Root of the tree, to which the visited directories count
+        self.device = None  # Device of the first directory listed
+        self.listed = 0  # Number of directories listed
+        self.entries = 0  # Number of directory entries seen
+        self.skipped = 0  # Number of directories left out, because they have been entered already or are elsewhere
+
+    def walk(self, root):
+        """
+        Walk the tree below root in depth-first pre-order.
+
+        Yields tuples (path, dirs, files), where dirs is a list of subdirectory names and files is a list of
+        (name, os.stat_result) tuples. Like in os.walk, the caller may remove names from dirs to prevent
+        descending into them.
+        """
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            dirs, files = self.listDir(path)
+            yield path, dirs, files
+            stack.extend(os.path.join(path, name) for name in reversed(dirs))
+
+    def listDir(self, path):
+        """
+        List a single directory. Returns a tuple (dirs, files) sorted by name, where dirs is a list of
+        subdirectory names and files is a list of (name, os.stat_result) tuples. The entries excluded by the rules
+        are left out.
+        """
+        dirs = []
+        files = []
+        start = time.perf_counter()
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            logging.debug(f"{type(e).__name__}: {path}")
+            return dirs, files
+        if self.device is None:
+            self.start(path)
+        self.listed += 1
+        self.entries += len(entries)
+        follow = self.followSymlinks
+        subdirs = {}
+        for entry in entries:
+            try:
+                if entry.is_file(follow_symlinks=follow):
+                    files.append((entry.name, entry.stat(follow_symlinks=follow)))
+                elif entry.is_dir(follow_symlinks=follow):
+                    subdirs[entry.name] = entry
+            except OSError as e:
+                logging.debug(f"{type(e).__name__}: {entry.path}")
+        stats.count("statCalls", len(files))
+        dirs = list(subdirs)
+        if self.rules is not None:
+            dirs, files = self.rules.filter(path, dirs, files)
+        # Only the directories kept are entered, so that an excluded one does not hide the other paths to it
+        stats.count("statCalls", len(dirs))
+        dirs = [name for name in dirs if self.enter(subdirs[name])]
+        stats.add("list", time.perf_counter() - start)
+        stats.count("entries", len(entries))
+        return dirs, files
+
+    def start(self, path):
+        """Record the first directory listed, so that it is not entered again, and take its device"""
+        stats.count("statCalls")
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        self.device = st.st_dev
+        if st.st_ino:
+            self.visited.setdefault((st.st_dev, st.st_ino), path)
+
+    def enter(self, entry):
+        """
+        Return True if the subdirectory of the DirEntry is to be listed: it has not been entered through another
+        path and, with oneFilesystem, it is on the device of the first directory
+        """
+        try:
+            st = entry.stat(follow_symlinks=self.followSymlinks)
+        except OSError as e:
+            logging.debug(f"{type(e).__name__}: {entry.path}")
+            return False
+        if self.oneFilesystem and self.device is not None and st.st_dev != self.device:
+            self.skipped += 1
+            return False
+        if not st.st_ino:
+            return True  # The file system does not tell the directories apart
+        key = st.st_dev, st.st_ino
+        owner = self.visited.get(key)
+        if owner is not None and owner != entry.path and self.owns(owner, key):
+            self.skipped += 1
+            stats.count("dirsSkipped")
+            return False
+        self.visited[key] = entry.path
+        return True
+
+    def owns(self, path, key):
+        """Return True if the directory still is at path under the root, i.e. has not been removed or re-rooted"""
+        if self.root is not None and path != self.root and \
+                not path.startswith(self.root if self.root.endswith(os.sep) else self.root + os.sep):
+            return False
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        return (st.st_dev, st.st_ino) == key
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 15:20 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Detection of file system changes in an analyzed tree. The changes are collected as "dirty" directories, which are
+then refreshed one by one with DirManager.refreshDir. The Debouncer coalesces event storms (e.g. git checkout or a
+build dumping its output), the PollingWatcher finds changed directories where no notifications are available.
+"""
+
+__all__ = ['Debouncer', 'PollingWatcher']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import time
+
+
+class Debouncer:
+    """
+    Collects the dirty directories and releases them once no new change has arrived for the quiet period,
+    but not later than maxDelay after the first pending change
+    """
+
+    def __init__(self, quiet=0.5, maxDelay=5.0):
+        self.quiet = quiet
+        self.maxDelay = maxDelay
+        self.pending = set()
+        self.first = None
+        self.last = None
+
+    def add(self, path, now=None):
+        now = time.monotonic() if now is None else now
+        if not self.pending:
+            self.first = now
+        self.pending.add(path)
+        self.last = now
+
+    def deadline(self):
+        """Return the time at which the pending changes are due or None if there are none"""
+        if not self.pending:
+            return None
+        return min(self.last + self.quiet, self.first + self.maxDelay)
+
+    def due(self, now=None):
+        now = time.monotonic() if now is None else now
+        deadline = self.deadline()
+        return deadline is not None and now >= deadline
+
+    def take(self):
+        """Return the pending paths sorted top-down and reset the debouncer"""
+        paths = sorted(self.pending, key=lambda p: (p.count(os.sep), p))
+        self.pending = set()
+        self.first = self.last = None
+        return paths
+
+
+class PollingWatcher:
+    """
+    Finds changed directories by comparing the modification time of directories and the stat data of files with
+    the state recorded in the tree. To keep a single poll cheap on large trees, at most budget entries are checked
+    per poll; the tree is covered round robin.
+    """
+
+    def __init__(self, mgr, budget=20000):
+        self.mgr = mgr
+        self.budget = budget
+        self.mtimes = {}  # Dir path -> mtime_ns recorded at the last check
+        self.reported = set()  # Paths of the dirs reported changed, which are not checked again until refreshed
+        self._queue = []
+
+    def start(self):
+        """Record the current state of all directories"""
+        self.mtimes = {}
+        self.reported = set()
+        for dir in self._dirs():
+            self.mtimes[dir.path] = self._mtime(dir.path)
+        self._queue = []
+
+    def _dirs(self):
+        stack = [self.mgr.dir]
+        while stack:
+            dir = stack.pop()
+            yield dir
+            stack.extend(dir.dirs)
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def poll(self):
+        """Return the list of paths of the directories found changed since they were checked last time"""
+        changed = []
+        checked = 0
+        refilled = False
+        while checked < self.budget:
+            if not self._queue:
+                self._queue = [d.path for d in self._dirs()]
+                if checked or refilled:
+                    break  # The whole tree has been checked in this poll
+                refilled = True
+            path = self._queue.pop()
+            if path in self.reported:
+                continue
+            dir = self.mgr.items.get(path)
+            if dir is None:
+                continue
+            mtime = self._mtime(path)
+            checked += 1
+            if mtime != self.mtimes.get(path):
+                self.mtimes[path] = mtime
+                changed.append(path)
+                continue
+            for file in dir.files:
+                checked += 1
+                try:
+                    st = os.stat(file.path)
+                except OSError:
+                    changed.append(path)
+                    break
+                if file.statKey != (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns):
+                    changed.append(path)
+                    break
+        self.reported.update(changed)
+        return changed
+
+    def refreshed(self, path):
+        """Record the state of a directory after it has been refreshed"""
+        self.mtimes[path] = self._mtime(path)
+        self.reported.discard(path)
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 12:05 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+
+Background worker scanning and classifying a directory tree outside of the GUI thread
+"""
+
+__all__ = ['ClassificationWorker', 'AnalysisWorker', 'LazyScanWorker', 'ValidationWorker']
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import math
+import threading
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from .dir_manager import DirManager
+from .scan_queue import ScanQueue
+from .walker import Walker
+
+
+class ClassificationWorker(QObject):
+    """
+    Worker meant to be moved to a QThread. It classifies the given files with the engine and streams the results in
+    batches with the batchReady signal. The results are lists of (File, binary) tuples, which are applied to the
+    tree by the receiver, i.e. in the GUI thread.
+    """
+    batchReady = pyqtSignal(object)
+    finished = pyqtSignal()
+
+    def __init__(self, engine=None, files=None, interval=0.1):
+        super().__init__()
+        self.engine = engine
+        self.files = files
+        self.interval = interval  # Minimum time between two emitted batches [s]
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Request the worker to stop as soon as possible. Can be called from any thread"""
+        self._cancelled.set()
+
+    def isCancelled(self):
+        return self._cancelled.is_set()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            self.classify(self.engine, self.files)
+        finally:
+            self.finished.emit()
+
+    def classify(self, engine, files):
+        results = []
+        last = time.monotonic()
+        for batch in engine.batches(files, self.isCancelled):
+            results.extend(batch)
+            if time.monotonic() - last >= self.interval:
+                self.batchReady.emit(results)
+                results = []
+                last = time.monotonic()
+        if results and not self.isCancelled():
+            self.batchReady.emit(results)
+
+
+class AnalysisWorker(ClassificationWorker):
+    """
+    Worker building the DirManager, which is handed over with the scanned signal, and then classifying all its files.
+    In the estimate mode, the files are classified in the sample order, so that the estimates shown while the
+    classification is running are refined towards the exact values.
+    If an existing manager is given, it is moved to the dir instead, reusing the subtrees it knows; only the files,
+    that are not classified yet, are classified then
+    """
+    scanned = pyqtSignal(object)
+
+    def __init__(self, dir, workers=None, cache=None, interval=0.1, estimate=None, rules=None, mgr=None):
+        super().__init__(interval=interval)
+        self.dir = dir
+        self.workers = workers
+        self.cache = cache
+        self.estimate = estimate
+        self.rules = rules
+        self.mgr = mgr
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            mgr = self.mgr
+            if mgr is None:
+                mgr = DirManager(dir=self.dir, workers=self.workers, classify=False, cancelled=self.isCancelled,
+                                 cache=self.cache, estimate=self.estimate, rules=self.rules)
+            else:
+                mgr.estimate = self.estimate
+                mgr.setDir(self.dir, classify=False, cancelled=self.isCancelled)
+            if self.isCancelled():
+                return
+            if self.estimate is not None:
+                mgr.sampleOrder()
+            self.scanned.emit(mgr)
+            if self.estimate is None:
+                self.classify(mgr.engine, (f for f in mgr.dir.allFiles() if f.binary is None))
+                return
+            # The sample first, then the rest in chunks
+            sample = max(1, math.ceil(self.estimate * len(mgr.unsampled)))
+            self.classify(mgr.engine, next(mgr.refinements(sample), []))
+            for files in mgr.refinements():
+                if self.isCancelled():
+                    return
+                self.classify(mgr.engine, files)
+        finally:
+            self.finished.emit()
+
+
+class LazyScanWorker(ClassificationWorker):
+    """
+    Worker serving the tasks of a ScanQueue. The listing of a directory is handed over with the listed signal
+    (path, dirs, files, priority); the receiver adds it to the tree, queues the follow-up tasks and calls
+    taskDone. Classification results are streamed with batchReady. The worker finishes when all tasks are done.
+    """
+    listed = pyqtSignal(str, object, object, int)
+
+    def __init__(self, queue, engine, interval=0.1, rules=None, walker=None):
+        super().__init__(engine, interval=interval)
+        self.queue = queue
+        self.rules = rules
+        self.walker = walker  # Walker of the DirManager, e.g. with its traversal options; by default one with rules
+
+    def cancel(self):
+        super().cancel()
+        self.queue.close()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            self.serve(self.walker if self.walker is not None else Walker(rules=self.rules))
+        finally:
+            self.finished.emit()
+
+    def serve(self, walker, wait=True):
+        """Serve the tasks until the queue is finished or, unless wait, until no task is available right now"""
+        while not self.isCancelled():
+            task = self.queue.pop(timeout=0.2 if wait else 0)
+            if task is None:
+                if not wait or self.queue.finished():
+                    break
+                continue
+            kind, path, priority, payload = task
+            if kind == ScanQueue.LIST:
+                dirs, files = walker.listDir(path)
+                self.listed.emit(path, dirs, files, priority)
+            else:
+                self.classify(self.engine, payload)
+                self.queue.taskDone()
+
+
+class ValidationWorker(LazyScanWorker):
+    """
+    Worker comparing a tree loaded from a snapshot with the file system. The directories found changed are listed
+    again and handed over with the listed signal; the receiver brings them up to date with DirManager.updateDir,
+    queues the classification of the returned files and calls taskDone, like for the LazyScanWorker
+    """
+
+    def __init__(self, mgr, queue, interval=0.1):
+        super().__init__(queue, mgr.engine, interval=interval, rules=mgr.rules)
+        self.mgr = mgr
+
+    @pyqtSlot()
+    def run(self):
+        walker = self.mgr.walker()
+        try:
+            for path in self.mgr.validate(self.isCancelled):
+                self.queue.push(ScanQueue.LIST, path, ScanQueue.BACKGROUND)
+                self.serve(walker, wait=False)
+            self.serve(walker)
+        finally:
+            self.finished.emit()
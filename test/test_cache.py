@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 14:50 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.cache import ClassificationCache
+from src.dir_manager import DirManager
+from test.test_dir_manager import prepareDirs
+
+
+class TestClassificationCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.cacheDir = tempfile.mkdtemp()
+        self.path = os.path.join(self.cacheDir, "cache", "cache.sqlite")
+        self.cache = ClassificationCache(self.path)
+
+    def tearDown(self) -> None:
+        self.cache.close()
+        shutil.rmtree(self.dir)
+        shutil.rmtree(self.cacheDir)
+
+    def test_lookup_store(self):
+        self.cache.store([((1, 2, 3, 4), True), ((1, 3, 3, 4), False)])
+        self.assertEqual(2, len(self.cache))
+        found = self.cache.lookup([(1, 2, 3, 4), (1, 3, 3, 4), (2, 2, 3, 4), (1, 2, 5, 4), (1, 3, 3, 5)])
+        self.assertEqual({(1, 2, 3, 4): True, (1, 3, 3, 4): False}, found)
+        self.assertEqual(2, self.cache.hits)
+        self.assertEqual(3, self.cache.misses)
+
+    def test_persistent(self):
+        self.cache.store([((1, 2, 3, 4), True)])
+        self.cache.close()
+        self.cache = ClassificationCache(self.path)
+        self.assertEqual({(1, 2, 3, 4): True}, self.cache.lookup([(1, 2, 3, 4)]))
+
+    def test_eviction(self):
+        self.cache.maxEntries = 10
+        self.cache.store([((1, i, 3, 4), True) for i in range(5)])
+        self.cache.lookup([(1, 0, 3, 4)])
+        self.cache.store([((1, i, 3, 4), True) for i in range(5, 12)])
+        self.assertEqual(9, len(self.cache))
+        self.assertEqual(3, self.cache.evicted)
+        self.assertEqual(1, len(self.cache.lookup([(1, 0, 3, 4)])))
+
+    def test_dirManager(self):
+        mgr = DirManager(dir=self.dir, cache=self.cache)
+        self.assertEqual(7, self.cache.misses)
+        with mock.patch("src.classifier.classifyBatch") as classifyBatch:
+            mgr = DirManager(dir=self.dir, cache=self.cache)
+            classifyBatch.assert_not_called()
+        self.assertEqual(7, self.cache.hits)
+        self.assertEqual(3, mgr.dir.binCount())
+        self.assertEqual(4, mgr.dir.txtCount())
+
+        # A modified file is classified again
+        path = os.path.join(self.dir, "d1", "d2", "file1.txt")
+        with open(path, "wb") as f:
+            f.write(bytes([0, 1, 2]))
+        mgr = DirManager(dir=self.dir, cache=self.cache)
+        self.assertEqual(13, self.cache.hits)
+        self.assertTrue(mgr.items[path].binary)
+
+
+if __name__ == '__main__':
+    unittest.main()
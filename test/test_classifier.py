@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 11:30 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import shutil
+import unittest
+
+from src.classifier import ClassificationEngine
+from src.dir_manager import DirManager, Dir
+from test.test_dir_manager import prepareDirs
+
+
+class TestClassificationEngine(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.mgr = DirManager(dir=self.dir)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def checkClassified(self, engine):
+        self.mgr.engine = engine
+        dir = Dir(self.dir, self.mgr)
+        for file in dir.allFiles():
+            self.assertEqual(file.path.endswith(".dat"), file.binary, file.path)
+        self.assertEqual(3, dir.dirs[0].dirs[0].dirs[0].ntxtFiles + dir.dirs[0].dirs[0].dirs[0].nbinFiles)
+        self.assertEqual(1, dir.dirs[0].dirs[0].dirs[0].nbinFiles)
+        self.assertEqual(1, dir.dirs[0].dirs[1].nbinFiles)
+        self.assertEqual(1, dir.dirs[0].dirs[1].ntxtFiles)
+        self.assertEqual(3, dir.binCount())
+        self.assertEqual(4, dir.txtCount())
+        self.assertEqual(7, engine.classified)
+        self.assertGreater(engine.rate(), 0)
+
+    def test_threads(self):
+        self.checkClassified(ClassificationEngine(workers=4, batchSize=1))
+
+    def test_processes(self):
+        self.checkClassified(ClassificationEngine(workers=2, processes=True, batchSize=2))
+
+    def test_serial(self):
+        self.checkClassified(ClassificationEngine(workers=1))
+
+    def test_cancel(self):
+        engine = ClassificationEngine(workers=2, batchSize=1)
+        files = list(self.mgr.dir.allFiles())
+        for f in files:
+            f.binary = None
+        batches = list(engine.batches(files, cancelled=lambda: True))
+        self.assertEqual(1, len(batches))
+
+    def test_reclassify(self):
+        file = self.mgr.dir.dirs[0].dirs[1].files[0]
+        self.assertFalse(file.binary)
+        file.setBinary(True)
+        self.assertEqual(2, file.parent.nbinFiles)
+        self.assertEqual(0, file.parent.ntxtFiles)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 20:20 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import unittest
+
+from src.cli import scan
+from src.report import NdjsonWriter
+from test.test_dir_manager import prepareDirs, FILES
+
+
+class TestScan(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def records(self, **kwargs):
+        out = io.StringIO()
+        summary = scan(self.dir, NdjsonWriter(out), **kwargs)
+        return [json.loads(line) for line in out.getvalue().splitlines()], summary
+
+    def test_scan(self):
+        records, summary = self.records(workers=2)
+        files = [r for r in records if r["type"] == "file"]
+        dirs = [r["path"] for r in records if r["type"] == "dir"]
+        self.assertEqual(len(FILES), len(files))
+        for r in files:
+            self.assertEqual(r["path"].endswith(".dat"), r["binary"], r["path"])
+        self.assertEqual(9, len(dirs))
+        self.assertEqual(len(dirs), len(set(dirs)))
+        # Every directory is written after all of its subdirectories
+        for i, path in enumerate(dirs):
+            self.assertFalse([p for p in dirs[i + 1:] if p.startswith(path + os.sep)], path)
+        self.assertEqual(self.dir, dirs[-1])
+        self.assertEqual("summary", records[-1]["type"])
+        self.assertEqual(7, summary["files"])
+        self.assertEqual(3, summary["binFiles"])
+        self.assertEqual(24, summary["txtSize"])
+        self.assertTrue(summary["complete"])
+
+    def test_depth(self):
+        records, summary = self.records(depth=2)
+        dirs = [r["path"] for r in records if r["type"] == "dir"]
+        self.assertEqual(6, len(dirs))
+        self.assertEqual(2, summary["files"])
+
+    def test_links(self):
+        os.symlink(self.dir, os.path.join(self.dir, "d1", "loop"))
+        os.link(os.path.join(self.dir, "d1", "d2", "file2.dat"), os.path.join(self.dir, "d2", "link.dat"))
+        records, summary = self.records()
+        self.assertEqual(8, summary["files"])
+        self.assertEqual(20, summary["binSize"])
+        self.assertEqual(1, summary["skippedDirs"])
+        records, summary = self.records(uniqueBytes=True, followSymlinks=False)
+        self.assertEqual(8, summary["files"])
+        self.assertEqual(15, summary["binSize"])
+        self.assertEqual(0, summary["skippedDirs"])
+
+    def test_main(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, os.path.join(root, "main.py"), "--scan", self.dir, "--format", "csv",
+                                 "--no-cache"], capture_output=True, text=True, cwd=root)
+        self.assertEqual(0, result.returncode, result.stderr)
+        lines = result.stdout.splitlines()
+        self.assertEqual("type,path,binary,size,files,binFiles,txtFiles,binSize,txtSize", lines[0])
+        self.assertEqual(1 + 7 + 9 + 1, len(lines))
+        self.assertEqual(f"summary,{self.dir},,,7,3,4,15,24", lines[-1])
+
+    def test_qtFree(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = "import sys, src.cli, src.heaviest, src.sharded; print([m for m in sys.modules if m.startswith('PyQt5')])"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=root)
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertEqual("[]", result.stdout.strip())
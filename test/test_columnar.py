@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 21:35 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import pickle
+import unittest
+
+from src.columnar import TreeColumns, UNKNOWN
+
+
+class TestTreeColumns(unittest.TestCase):
+    def test_pack(self):
+        cols = TreeColumns()
+        root = cols.addDir("/root")
+        sub = cols.addDir("sub", root)
+        st = os.stat(__file__)
+        cols.addFile(root, "a.txt", st)
+        cols.addFile(sub, "b.dat", st)
+        cols.fileBinary[1] = 1
+        cols.dirListed[root] = 1
+        copy = TreeColumns.unpack(pickle.loads(pickle.dumps(cols.pack())))
+        self.assertEqual(4, len(copy))
+        self.assertEqual(["/root", "sub"], copy.dirNames)
+        self.assertEqual([-1, 0], list(copy.dirParent))
+        self.assertEqual([1, 0], list(copy.dirListed))
+        self.assertEqual(["a.txt", "b.dat"], copy.fileNames)
+        self.assertEqual([0, 1], list(copy.fileDir))
+        self.assertEqual([UNKNOWN, 1], list(copy.fileBinary))
+        self.assertEqual((st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns), copy.statKey(1))
+
+    def test_empty(self):
+        copy = TreeColumns.unpack(TreeColumns().pack())
+        self.assertEqual([], copy.dirNames)
+        self.assertEqual([], copy.fileNames)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 06:25 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.cli import writeDiff
+from src.diff import diff, Diff, DirDelta, FileChange, ADDED, REMOVED, CHANGED, FLIPPED
+from src.dir_manager import DirManager
+from src.report import CsvWriter, DIFF_COLUMNS
+from src.snapshot import Snapshot
+from test.test_dir_manager import prepareDirs
+
+
+class TestDiff(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "old.sfbsnap")
+        self.old = DirManager(dir=self.dir)
+        self.old.save(self.path)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+        shutil.rmtree(self.tmp)
+
+    def change(self):
+        """Change the tree on the disk and return its new DirManager"""
+        os.makedirs(os.path.join(self.dir, "d3", "d1"))
+        with open(os.path.join(self.dir, "d3", "d1", "new.dat"), "wb") as f:
+            f.write(b"\x00\x01\x02")
+        with open(os.path.join(self.dir, "d1", "d2", "file1.txt"), "a") as f:
+            f.write("more")
+        os.remove(os.path.join(self.dir, "d1", "d1", "d1", "file3.dat"))
+        return DirManager(dir=self.dir)
+
+    def test_same(self):
+        self.assertEqual([], list(diff(self.old.dir, DirManager(dir=self.dir).dir)))
+        with Snapshot(self.path) as snapshot:
+            self.assertFalse(Diff(snapshot, self.old.dir))
+
+    def test_diff(self):
+        new = self.change()
+        records = list(diff(self.old.dir, new.dir))
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(records, list(diff(snapshot, new.dir)))
+        j = os.path.join
+        self.assertEqual([
+            DirDelta(".", 0, 0, 0, -2, 4),
+            DirDelta("d1", -1, -1, 0, -5, 4),
+            DirDelta(j("d1", "d1"), -1, -1, 0, -5, 0),
+            DirDelta(j("d1", "d1", "d1"), -1, -1, 0, -5, 0),
+            FileChange(REMOVED, j("d1", "d1", "d1", "file3.dat"), 5, None, True, None),
+            DirDelta(j("d1", "d2"), 0, 0, 0, 0, 4),
+            FileChange(CHANGED, j("d1", "d2", "file1.txt"), 6, 10, False, False),
+            DirDelta("d3", 1, 1, 0, 3, 0),
+            DirDelta(j("d3", "d1"), 1, 1, 0, 3, 0),
+            FileChange(ADDED, j("d3", "d1", "new.dat"), None, 3, None, True),
+        ], records)
+
+        result = Diff(self.old.dir, new.dir)
+        self.assertEqual({ADDED: 1, REMOVED: 1, CHANGED: 1, FLIPPED: 0}, result.counts)
+        self.assertEqual(-2, result.summary()["binSize"])
+        self.assertEqual(CHANGED, result.files[j("d1", "d2", "file1.txt")].kind)
+        self.assertEqual(-1, result.dirs["d1"].binFiles)
+
+    def test_flipped(self):
+        new = DirManager(dir=self.dir)
+        file = new.items[os.path.join(self.dir, "d1", "d2", "file1.txt")]
+        file.setBinary(True)
+        self.assertEqual([DirDelta(".", 0, 1, -1, 6, -6), DirDelta("d1", 0, 1, -1, 6, -6),
+                          DirDelta(os.path.join("d1", "d2"), 0, 1, -1, 6, -6),
+                          FileChange(FLIPPED, os.path.join("d1", "d2", "file1.txt"), 6, 6, False, True)],
+                         list(diff(self.old.dir, new.dir)))
+        # Unclassified files are only compared by their stat data
+        file.invalidate()
+        self.assertEqual([], [r for r in diff(self.old.dir, new.dir) if isinstance(r, FileChange)])
+
+    def test_report(self):
+        new = self.change()
+        out = io.StringIO()
+        summary = writeDiff(self.old.dir, new.dir, CsvWriter(out, DIFF_COLUMNS), self.dir)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(",".join(DIFF_COLUMNS), lines[0])
+        self.assertIn(f"added,{os.path.join('d3', 'd1', 'new.dat')},1,3,,,,,,,", lines)
+        self.assertIn("delta,.,,,,,0,0,0,-2,4", lines)
+        self.assertEqual((1, 1, 1, 0, 0), (summary["added"], summary["removed"], summary["changed"],
+                                           summary["flipped"], summary["files"]))
+        self.assertTrue(lines[-1].startswith("summary,"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,13 +9,19 @@ __date__ = '2021-11-20'
 __authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
 
 import shutil
+import time
 import unittest
 import os
+from unittest import mock
 
 from test.app import app
+from PyQt5.QtCore import QModelIndex
 from PyQt5.QtWidgets import QFileSystemModel
 
-from src.dir_manager import DirManager, DirTreeItem, Dir, File
+from src.dir_manager import DirManager, DirTreeItem, Dir, File, HardLink, UniqueLink
+from src.rules import ExcludeRules
+from src.stats import stats
+from src.walker import Walker
 
 FILES = [
     "d1/d1/d1/file1.txt",
@@ -48,35 +54,32 @@ class TestDirManager(unittest.TestCase):
 
         mgr = DirManager(dir=self.dir)
         mgr.setModel(model)
+        self.assertEqual(0, len(mgr.map))  # Nothing is resolved up front
 
+        # The model loads the rows asynchronously; they are mapped whenever they are looked up
         for path, item in mgr.items.items():
             index = model.index(path)
-            self.assertEqual(item, mgr.map[index])
-
-        # Store the indexes to easily access them
-        indexes = {}
-        indexes["d1"] = model.index(0, 0, rootIndex)
-        indexes["d1/d1"] = model.index(0, 0, indexes["d1"])
-        indexes["d1/d1/d1"] = model.index(0, 0, indexes["d1/d1"])
-        indexes["d1/d1/d1/file1.txt"] = model.index(0, 0, indexes["d1/d1/d1"])
-        indexes["d1/d1/d1/file2.txt"] = model.index(1, 0, indexes["d1/d1/d1"])
-        indexes["d1/d1/d1/file3.dat"] = model.index(2, 0, indexes["d1/d1/d1"])
-        indexes["d1/d2"] = model.index(1, 0, indexes["d1"])
-        indexes["d1/d2/d1"] = model.index(0, 0, indexes["d1/d2"])
-        indexes["d1/d2/d1/file1.dat"] = model.index(0, 0, indexes["d1/d2/d1"])
-        indexes["d1/d2/file1.txt"] = model.index(1, 0, indexes["d1/d2"])
-        indexes["d1/d2/file2.dat"] = model.index(2, 0, indexes["d1/d2"])
-        indexes["d2"] = model.index(1, 0, rootIndex)
-        indexes["d2/d1"] = model.index(0, 0, indexes["d2"])
-        indexes["d2/d1/d1"] = model.index(0, 0, indexes["d2/d1"])
-        indexes["d2/d1/d1/file1.txt"] = model.index(0, 0, indexes["d2/d1/d1"])
-
-        for path, index in indexes.items():
-            fullpath = os.path.normpath(os.path.join(self.dir, os.sep.join(path.split("/"))))
-            self.assertEqual(fullpath,
-                             os.path.normpath(model.filePath(index)), path)
-
-            self.assertEqual(mgr.map[index], mgr.items[fullpath])
+            deadline = time.monotonic() + 5
+            while not index.isValid() and time.monotonic() < deadline:
+                app.processEvents()
+                index = model.index(path)
+            self.assertIs(item, mgr.map[index], path)
+            self.assertIs(item, mgr.map[index.sibling(index.row(), 1)])
+        self.assertEqual(len(mgr.items), len(mgr.map))
+        self.assertNotIn(QModelIndex(), mgr.map)
+
+        path = os.path.join(self.dir, "d1", "d2", "file2.dat")
+        index = model.index(path)
+        self.assertIs(mgr.items[path], mgr.map[index])
+        os.remove(path)
+        mgr.refreshDir(os.path.dirname(path))
+        self.assertNotIn(index, mgr.map)
+        self.assertEqual(0, len(mgr.map))  # Dropped, since items have been removed
+
+        mgr.map.entries.maxsize = 2
+        for path in mgr.items:
+            mgr.map.get(model.index(path))
+        self.assertEqual(2, len(mgr.map))
 
 
 class TestDirTreeItem(unittest.TestCase):
@@ -86,6 +89,31 @@ class TestDirTreeItem(unittest.TestCase):
     def tearDown(self) -> None:
         shutil.rmtree(self.dir)
 
+    def test_path(self):
+        mgr = DirManager(dir=self.dir)
+        d1d2 = mgr.dir.dirs[0].dirs[1]
+        self.assertEqual("d2", d1d2.name)
+        self.assertEqual(os.path.join(self.dir, "d1", "d2"), d1d2.path)
+        self.assertEqual(os.path.join(self.dir, "d1", "d2", "file1.txt"), d1d2.files[0].path)
+        self.assertIs(mgr, d1d2.files[0].manager)
+
+        mgr.dir.dirs[0].removeDir(d1d2)
+        self.assertEqual(os.path.join(self.dir, "d1", "d2"), d1d2.name)
+        self.assertEqual(os.path.join(self.dir, "d1", "d2", "file1.txt"), d1d2.files[0].path)
+        self.assertIs(mgr, d1d2.files[0].manager)
+
+    def test_items(self):
+        mgr = DirManager(dir=self.dir)
+        self.assertEqual(len(FILES) + 9, len(mgr.items))
+        for path, item in mgr.items.items():
+            self.assertEqual(path, item.path)
+            self.assertIs(item, mgr.items[path])
+        self.assertIs(mgr.dir, mgr.items[self.dir])
+        self.assertNotIn(os.path.join(self.dir, "d1", "nothing"), mgr.items)
+        self.assertNotIn(os.path.join(self.dir, "d1", "d1", "d1", "file1.txt", "x"), mgr.items)
+        self.assertNotIn(self.dir + "x", mgr.items)
+        self.assertIsNone(mgr.items.get(os.path.dirname(self.dir)))
+
 
 class TestDir(unittest.TestCase):
     def setUp(self) -> None:
@@ -110,6 +138,52 @@ class TestDir(unittest.TestCase):
         dir = Dir(self.dir, mgr)
         self.assertEqual(7, dir.totalFiles())
 
+    def test_aggregates(self):
+        mgr = DirManager(dir=self.dir)
+        dir = mgr.dir
+        self.assertEqual(3, dir.binCount())
+        self.assertEqual(4, dir.txtCount())
+        self.assertEqual(15, dir.binSize())
+        self.assertEqual(24, dir.txtSize())
+        self.assertEqual(2, dir.dirs[0].dirs[1].binCount())
+        self.assertEqual(1, dir.dirs[0].dirs[1].nbinFiles)
+
+        d1d2 = dir.dirs[0].dirs[1]
+        d1d2.removeFile(d1d2.files[1])  # file2.dat
+        self.assertEqual(6, dir.totalFiles())
+        self.assertEqual(2, dir.binCount())
+        self.assertEqual(10, dir.binSize())
+        self.assertEqual(0, d1d2.nbinFiles)
+        self.assertNotIn(os.path.join(d1d2.path, "file2.dat"), mgr.items)
+
+        d1d2.files[0].setBinary(True)
+        self.assertEqual(3, dir.binCount())
+        self.assertEqual(3, dir.txtCount())
+        self.assertEqual(16, dir.binSize())
+        self.assertEqual(18, dir.txtSize())
+
+        d1 = dir.dirs[0]
+        d1.removeDir(d1d2)
+        self.assertEqual(4, dir.totalFiles())
+        self.assertEqual(1, dir.binCount())
+        self.assertNotIn(d1d2.files[0].path, mgr.items)
+
+        dir.addDir(d1d2)
+        self.assertEqual(6, dir.totalFiles())
+        self.assertEqual(3, dir.binCount())
+        self.assertEqual(16, dir.binSize())
+
+    def test_release(self):
+        mgr = DirManager(dir=self.dir)
+        d1d2 = mgr.items[os.path.join(self.dir, "d1", "d2")]
+        file = d1d2.child("file2.dat")
+        d1d2.release()
+        self.assertEqual(([], [], None), (d1d2.files, d1d2.dirs, d1d2._index))
+        self.assertIsNone(d1d2.child("file2.dat"))
+        self.assertEqual(3, d1d2.totalFiles())
+        self.assertEqual(7, mgr.dir.totalFiles())
+        self.assertIs(d1d2, file.parent)
+
 
 class TestFile(unittest.TestCase):
     def setUp(self) -> None:
@@ -129,6 +203,156 @@ class TestFile(unittest.TestCase):
                 self.assertTrue(file.isBinary())
 
 
+def aggregates(root):
+    """The aggregates of all directories of the tree by their paths relative to the root"""
+    result = {}
+    stack = [root]
+    while stack:
+        dir = stack.pop()
+        result[os.path.relpath(dir.path, root.path)] = (dir.nTotalFiles, dir.nTotalBin, dir.nTotalTxt,
+                                                        dir.totalBinSize, dir.totalTxtSize, dir.nTotalUnlisted)
+        stack.extend(dir.dirs)
+    return result
+
+
+class TestReroot(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.mgr = DirManager(dir=self.dir)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def listed(self):
+        return mock.patch.object(Walker, "listDir", autospec=True, side_effect=Walker.listDir)
+
+    def assertFresh(self, dir):
+        self.assertEqual(aggregates(DirManager(dir=dir).dir), aggregates(self.mgr.dir))
+
+    def test_narrow(self):
+        d1 = self.mgr.items[os.path.join(self.dir, "d1")]
+        with self.listed() as listDir, mock.patch.object(self.mgr.engine, "classify") as classify:
+            self.assertTrue(self.mgr.reroot(os.path.join(self.dir, "d1")))
+            listDir.assert_not_called()
+            classify.assert_not_called()
+        self.assertIs(d1, self.mgr.dir)
+        self.assertIsNone(d1.parent)
+        self.assertEqual(os.path.join(self.dir, "d1"), self.mgr.getDir())
+        self.assertIn(os.path.join(self.dir, "d1", "d2", "file2.dat"), self.mgr.items)
+        self.assertNotIn(os.path.join(self.dir, "d2"), self.mgr.items)
+        self.assertFresh(os.path.join(self.dir, "d1"))
+
+    def test_widen(self):
+        mgr = self.mgr = DirManager(dir=os.path.join(self.dir, "d1"))
+        d2 = mgr.items[os.path.join(self.dir, "d1", "d2")]
+        self.assertFalse(mgr.reroot(self.dir))  # Not known yet
+        with self.listed() as listDir:
+            mgr.setDir(self.dir)
+        listed = {os.path.relpath(call.args[1], self.dir) for call in listDir.call_args_list}
+        self.assertEqual({".", "d2", os.path.join("d2", "d1"), os.path.join("d2", "d1", "d1")}, listed)
+        self.assertIs(d2, mgr.items[os.path.join(self.dir, "d1", "d2")])
+        self.assertEqual(0, len(mgr.trees))
+        self.assertFresh(self.dir)
+
+    def test_backAndForth(self):
+        root = self.mgr.dir
+        for path in (os.path.join(self.dir, "d1", "d1"), self.dir, os.path.join(self.dir, "d2"), self.dir):
+            with self.listed() as listDir:
+                self.assertTrue(self.mgr.reroot(path))
+                listDir.assert_not_called()
+            self.assertFresh(path)
+        self.assertIs(root, self.mgr.dir)
+        self.assertEqual(0, len(self.mgr.trees))
+
+        self.mgr.reroot(os.path.join(self.dir, "d1"))
+        with self.listed() as listDir:
+            self.mgr.setDir(os.path.join(self.dir, "d2"))  # Known, but scanned, when asked to
+        self.assertEqual(3, listDir.call_count)
+        self.assertTrue(self.mgr.reroot(self.dir))  # Both halves are grafted back
+        self.assertFresh(self.dir)
+
+    def test_bounded(self):
+        self.mgr.trees.maxsize = 4
+        self.mgr.reroot(os.path.join(self.dir, "d2"))  # The remaining 6 files are dropped
+        self.assertEqual(0, len(self.mgr.trees))
+        self.assertFalse(self.mgr.reroot(self.dir))
+        self.mgr.reroot(os.path.join(self.dir, "d2", "d1"))
+        self.assertEqual(1, self.mgr.trees.size)
+        self.assertTrue(self.mgr.reroot(os.path.join(self.dir, "d2")))
+
+    def test_lazy(self):
+        d1 = os.path.join(self.dir, "d1")
+        mgr = self.mgr = DirManager(dir=d1)
+        mgr.setDir(self.dir, lazy=True)
+        self.assertEqual([d1], list(mgr.grafts))
+        dirs, files = Walker().listDir(self.dir)
+        newFiles, newDirs = mgr.listDir(self.dir, dirs, files)
+        self.assertEqual(["d2"], [dir.name for dir in newDirs])
+        self.assertEqual({}, mgr.grafts)
+        self.assertTrue(mgr.items[os.path.join(d1, "d2")].listed)
+        self.assertEqual(6, mgr.dir.nTotalFiles)
+        self.assertEqual(1, mgr.dir.nTotalUnlisted)  # Only d2
+
+    def test_rules(self):
+        mgr = self.mgr = DirManager(dir=self.dir, rules=ExcludeRules("*.dat"))
+        self.assertFalse(mgr.reusable())
+        self.assertFalse(mgr.reroot(os.path.join(self.dir, "d1")))
+        mgr.setDir(os.path.join(self.dir, "d1"))
+        self.assertEqual(0, len(mgr.trees))
+
+
+class TestLinks(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.link = os.path.join(self.dir, "d2", "d1", "link.dat")
+        os.link(os.path.join(self.dir, "d1", "d2", "file2.dat"), self.link)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def test_hardLink(self):
+        stats.reset()
+        mgr = DirManager(dir=self.dir)
+        link = mgr.items[self.link]
+        self.assertIsInstance(link, HardLink)
+        self.assertIs(mgr.items[os.path.join(self.dir, "d1", "d2", "file2.dat")], link.primary)
+        self.assertTrue(link.binary)
+        self.assertEqual(7, stats.snapshot()["classified"])  # The link is not read
+        self.assertEqual(1, stats.snapshot()["linksShared"])
+        self.assertEqual(8, mgr.dir.totalFiles())
+        self.assertEqual(4, mgr.dir.binCount())
+        self.assertEqual(20, mgr.dir.binSize())  # Apparent size
+
+    def test_uniqueBytes(self):
+        mgr = DirManager(dir=self.dir, uniqueBytes=True)
+        self.assertIsInstance(mgr.items[self.link], UniqueLink)
+        self.assertFalse(mgr.reusable())
+        self.assertEqual(4, mgr.dir.binCount())
+        self.assertEqual(15, mgr.dir.binSize())
+        self.assertEqual(0, mgr.items[os.path.dirname(self.link)].binSize())
+
+    def test_refresh(self):
+        mgr = DirManager(dir=self.dir)
+        dir = os.path.dirname(self.link)
+        mgr.refreshDir(dir)
+        self.assertIsInstance(mgr.items[self.link], HardLink)
+        primary = mgr.items[os.path.join(self.dir, "d1", "d2", "file2.dat")]
+        primary.parent.removeFile(primary)
+        mgr.refreshDir(dir)  # The primary is gone from the tree; the link takes over
+        self.assertNotIsInstance(mgr.items[self.link], HardLink)
+
+    def test_symlinkLoop(self):
+        expected = aggregates(DirManager(dir=self.dir).dir)
+        os.symlink(self.dir, os.path.join(self.dir, "d1", "loop"))
+        os.symlink(os.path.join(self.dir, "d2"), os.path.join(self.dir, "d1", "alias"))
+        mgr = DirManager(dir=self.dir)
+        self.assertEqual(expected, aggregates(mgr.dir))
+        self.assertNotIn(os.path.join(self.dir, "d1", "alias"), mgr.items)
+        mgr.refreshDir(os.path.join(self.dir, "d1"))
+        self.assertNotIn(os.path.join(self.dir, "d1", "alias"), mgr.items)
+        self.assertEqual(expected, aggregates(mgr.dir))
+
+
 def prepareDirs():
     dir = os.path.join(os.path.dirname(__file__), "testdir")
 
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 02:40 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from bench.tree_generator import generateTree
+from src.dir_manager import DirManager
+from src.scheduler import ReadScheduler
+
+
+class TestEstimate(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root = tempfile.mkdtemp()
+        self.dir = os.path.join(self.root, "tree")
+        self.nfiles = generateTree(self.dir, depth=2, fanout=4, filesPerDir=30, binaryRatio=0.3, seed=3,
+                                   sizes="uniform")
+        exact = DirManager(dir=self.dir)
+        self.binCount = exact.dir.binCount()
+        self.binSize = exact.dir.binSize()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+
+    def test_sampleOrder(self):
+        files = list(DirManager(dir=self.dir, classify=False).dir.allFiles())
+        order = ReadScheduler("sample", seed=1).schedule(files)
+        self.assertEqual(set(files), set(order))
+        sizes = {f.parent: len(f.parent.files) for f in files}
+        counts = dict.fromkeys(sizes, 0)
+        for k, f in enumerate(order):
+            counts[f.parent] += 1
+            shares = [counts[d] / n for d, n in sizes.items()]
+            # Every directory has been sampled at the same fraction, up to one file
+            self.assertLessEqual(max(shares) - min(shares), 2 / 30)
+
+    def test_estimate(self):
+        mgr = DirManager(dir=self.dir, estimate=0.2)
+        estimate = mgr.dir.estimate()
+        self.assertEqual(self.nfiles, estimate.total)
+        self.assertEqual(round(0.2 * self.nfiles), estimate.classified)
+        self.assertEqual(self.nfiles - estimate.classified, len(mgr.unsampled))
+        self.assertGreater(estimate.binCountError, 0)
+        # The intervals are 95% ones; twice their width makes the test practically deterministic
+        self.assertLess(abs(estimate.binCount - self.binCount), 2 * estimate.binCountError)
+        self.assertLess(abs(estimate.binSize - self.binSize), 2 * estimate.binSizeError)
+
+        mgr.refine()
+        estimate = mgr.dir.estimate()
+        self.assertEqual((self.binCount, 0, self.binSize, 0, self.nfiles, self.nfiles), estimate)
+        self.assertEqual([], mgr.unsampled)
+
+    def test_squaredSizes(self):
+        mgr = DirManager(dir=self.dir)
+        self.assertEqual(sum(f.size() ** 2 for f in mgr.dir.allFiles() if f.binary), mgr.dir.totalBinSize2)
+        dir = mgr.dir.dirs[0]
+        file = next(f for f in dir.files if f.binary)
+        total = mgr.dir.totalBinSize2
+        dir.removeFile(file)
+        self.assertEqual(total - file.size() ** 2, mgr.dir.totalBinSize2)
+        mgr.dir.removeDir(dir)
+        self.assertEqual(sum(f.size() ** 2 for f in mgr.dir.allFiles() if f.binary), mgr.dir.totalBinSize2)
+
+    def test_nothingClassified(self):
+        mgr = DirManager(dir=self.dir, estimate=0)
+        self.assertIsNone(mgr.dir.estimate())
+        self.assertEqual(self.nfiles, len(mgr.unsampled))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 11:45 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from PyQt5.QtWidgets import QMainWindow
+
+from src import forms
+from src.forms import loadUiType, cachePath
+
+
+class TestForms(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "mainwindow.ui")
+        shutil.copy(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src", "mainwindow.ui"), self.path)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp)
+
+    def test_cache(self):
+        form, base = loadUiType(self.path)
+        self.assertEqual("Ui_MainWindow", form.__name__)
+        self.assertIs(QMainWindow, base)
+        self.assertTrue(os.path.isfile(cachePath(self.path)))
+
+        with mock.patch.object(forms, "compileForm", wraps=forms.compileForm) as compileForm:
+            cached, base = loadUiType(self.path)
+            compileForm.assert_not_called()
+            self.assertEqual("Ui_MainWindow", cached.__name__)
+            self.assertTrue(hasattr(cached, "setupUi"))
+
+            st = os.stat(self.path)
+            os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000000))
+            loadUiType(self.path)
+            compileForm.assert_called_once()
+
+    def test_readOnly(self):
+        with mock.patch.object(forms.os, "replace", side_effect=OSError):
+            form, base = loadUiType(self.path)
+        self.assertEqual("Ui_MainWindow", form.__name__)
+        self.assertEqual([], os.listdir(os.path.dirname(cachePath(self.path))))  # No partial cache left
+
+
+if __name__ == '__main__':
+    unittest.main()
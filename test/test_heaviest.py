@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 09:05 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import shutil
+import unittest
+
+from src.dir_manager import DirManager, Dir
+from src.heaviest import HeaviestIndex
+from test.test_dir_manager import prepareDirs
+
+
+def heaviest(dir, n):
+    """The n heaviest directories found by traversing the tree, as (size, path) pairs"""
+    dirs = []
+    stack = [dir]
+    while stack:
+        dir = stack.pop()
+        if dir.totalBinSize:
+            dirs.append((dir.totalBinSize, dir.path))
+        stack.extend(dir.dirs)
+    return sorted(dirs, reverse=True)[:n]
+
+
+class TestHeaviestIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.mgr = DirManager(dir=self.dir)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def assertTop(self, n):
+        top = self.mgr.heaviest(n)
+        self.assertEqual([size for size, _ in heaviest(self.mgr.dir, n)], [dir.totalBinSize for dir in top])
+        return top
+
+    def test_top(self):
+        top = self.assertTop(10)
+        self.assertEqual(6, len(top))  # Only the directories with binary files
+        self.assertEqual(self.mgr.dir, top[0])
+        self.assertEqual(self.mgr.items[os.path.join(self.dir, "d1", "d2")], top[2])
+        self.assertEqual(3, len(self.assertTop(3)))
+        self.assertIsNotNone(self.mgr.binaryIndex)
+
+    def test_updates(self):
+        self.assertTop(10)
+        index = self.mgr.binaryIndex
+        self.mgr.items[os.path.join(self.dir, "d1", "d2", "file2.dat")].invalidate()
+        self.assertTop(10)
+        file = self.mgr.items[os.path.join(self.dir, "d2", "d1", "d1", "file1.txt")]
+        file.invalidate()
+        file.setBinary(True)
+        top = self.assertTop(3)
+        # d2, d2/d1 and d2/d1/d1 hold the same binary file; the order of ties is arbitrary
+        self.assertEqual(len("blabla"), top[2].totalBinSize)
+        self.assertTrue(top[2].path.startswith(os.path.join(self.dir, "d2")))
+
+        d2 = self.mgr.items[os.path.join(self.dir, "d2")]
+        self.mgr.dir.removeDir(d2)
+        self.assertNotIn(d2, self.assertTop(10))
+        self.mgr.dir.addDir(d2)  # Filled while detached
+        self.assertIn(d2, self.assertTop(10))
+        self.assertIs(index, self.mgr.binaryIndex)
+
+    def test_rebuild(self):
+        self.mgr.heaviest()
+        index = self.mgr.binaryIndex
+        file = self.mgr.items[os.path.join(self.dir, "d1", "d2", "file2.dat")]
+        for _ in range(1000):
+            file.invalidate()
+            file.setBinary(True)
+            index.top(1)
+        self.assertLess(len(index.heap), 2 * index.live + 1024 + 5)
+        self.assertTop(10)
+
+    def test_newTree(self):
+        self.mgr.heaviest()
+        self.mgr.setDir(self.dir)
+        self.assertIsNone(self.mgr.binaryIndex)
+        self.assertTop(10)
+        self.assertIs(self.mgr.dir, self.mgr.binaryIndex.root)
+        self.assertEqual([], HeaviestIndex(Dir(self.dir, self.mgr, scan=False)).top())
+
+
+if __name__ == '__main__':
+    unittest.main()
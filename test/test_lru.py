@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 19:10 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import unittest
+
+from src.lru import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction(self):
+        cache = LRUCache(3)
+        for i in range(3):
+            cache[i] = str(i)
+        self.assertEqual("0", cache.get(0))  # 1 is now the least recently used
+        cache[3] = "3"
+        self.assertEqual(3, len(cache))
+        self.assertNotIn(1, cache)
+        self.assertIsNone(cache.get(1))
+        self.assertEqual("0", cache.get(0))
+        self.assertEqual("3", cache.pop(3))
+        self.assertEqual(2, len(cache))
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+    def test_weight(self):
+        cache = LRUCache(10, weight=len)
+        cache["a"] = "x" * 4
+        cache["b"] = "x" * 5
+        self.assertEqual(9, cache.size)
+        cache["a"] = "x" * 2  # Weighed again
+        self.assertEqual(7, cache.size)
+        cache["c"] = "x" * 4  # b is the least recently used now
+        self.assertEqual(["a", "c"], [key for key, _ in cache.items()])
+        self.assertEqual(6, cache.size)
+        cache["d"] = "x" * 11  # Heavier than the whole cache
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.size)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 19:20 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from test.app import app
+from PyQt5.QtCore import Qt, QModelIndex, QPersistentModelIndex
+from PyQt5.QtGui import QColor
+
+from src.binary_proxy import BinaryFilterModel, BinarySortModel, modelIndex
+from src.diff import Diff
+from src.dir_manager import DirManager
+from src.mainwindow import Model
+from test.test_dir_manager import prepareDirs
+
+
+def processEventsUntil(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+class TestModel(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.path = os.path.join(self.dir, "d1", "d2")
+        self.model = Model()
+        self.model.setRootPath(self.path)
+        parent = self.model.index(self.path)
+        self.assertTrue(processEventsUntil(lambda: self.model.rowCount(parent) == 3))
+        self.binary = self.model.index(os.path.join(self.path, "file2.dat"))
+        self.text = self.model.index(os.path.join(self.path, "file1.txt"))
+
+    def tearDown(self) -> None:
+        self.model.stop()
+        shutil.rmtree(self.dir)
+
+    def test_asyncVerdict(self):
+        changed = []
+        self.model.dataChanged.connect(lambda first, last, roles: changed.append((first.row(), roles)))
+        with mock.patch("src.utils.open", side_effect=AssertionError("read on the GUI thread"), create=True):
+            self.assertEqual(Model.PLACEHOLDER, self.model.data(self.binary, Qt.ForegroundRole))
+            self.assertEqual(Model.PLACEHOLDER, self.model.data(self.text, Qt.ForegroundRole))
+        self.assertTrue(processEventsUntil(lambda: len(changed) == 2))
+        self.assertEqual({self.binary.row(), self.text.row()}, {row for row, _ in changed})
+        self.assertEqual([Qt.ForegroundRole], changed[0][1])
+        self.assertEqual(QColor(Qt.blue).lighter(), self.model.data(self.binary, Qt.ForegroundRole))
+        self.assertNotEqual(Model.PLACEHOLDER, self.model.data(self.text, Qt.ForegroundRole))
+        self.assertEqual(2, len(self.model.verdicts))
+
+    def test_managerVerdict(self):
+        mgr = DirManager(dir=self.dir)
+        self.model.setDirManager(mgr)
+        self.assertEqual(QColor(Qt.blue).lighter(), self.model.data(self.binary, Qt.ForegroundRole))
+        self.assertNotEqual(Model.PLACEHOLDER, self.model.data(self.text, Qt.ForegroundRole))
+        self.assertEqual({}, self.model.pending)
+        self.assertEqual(0, len(self.model.verdicts))
+
+
+class TestBinarySortModel(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.model = Model()
+        self.model.setRootPath(self.dir)
+        self.model.setDirManager(DirManager(dir=self.dir))
+        self.root = self.model.index(self.dir)
+        self.assertTrue(processEventsUntil(lambda: self.model.rowCount(self.root) == 2))
+        self.filter = BinaryFilterModel()
+        self.filter.setSourceModel(self.model)
+        self.proxy = BinarySortModel()
+        self.proxy.setSourceModel(self.filter)
+
+    def tearDown(self) -> None:
+        self.model.stop()
+        shutil.rmtree(self.dir)
+
+    def viewIndex(self, *path):
+        return self.proxy.mapFromSource(self.filter.mapFromSource(self.model.index(os.path.join(self.dir, *path))))
+
+    def names(self, *path):
+        root = self.viewIndex(*path)  # Sorting moves the rows
+        return [self.proxy.index(row, 0, root).data() for row in range(self.proxy.rowCount(root))]
+
+    def test_columns(self):
+        root = self.viewIndex()
+        self.assertEqual(7, self.proxy.columnCount(root))
+        self.assertEqual("Binary %", self.proxy.headerData(BinarySortModel.BINSHARECOL, Qt.Horizontal))
+        self.assertEqual("Size", self.proxy.headerData(Model.DATACOL, Qt.Horizontal))
+        d1 = self.viewIndex("d1")
+        self.assertEqual("3", d1.sibling(d1.row(), BinarySortModel.BINCOUNTCOL).data())
+        self.assertEqual("50.0", d1.sibling(d1.row(), BinarySortModel.BINSHARECOL).data())
+        self.assertEqual(self.model.index(os.path.join(self.dir, "d1")),
+                         modelIndex(d1.sibling(d1.row(), BinarySortModel.BINSIZECOL)))
+        self.assertEqual((1, 5, 100.0), self.model.binaryValues(
+            self.model.index(os.path.join(self.dir, "d1", "d2", "file2.dat"))))
+        self.model.setDirManager(None)
+        self.assertIsNone(d1.sibling(d1.row(), BinarySortModel.BINSIZECOL).data())
+
+    def test_sort(self):
+        d1 = QPersistentModelIndex(self.viewIndex("d1"))
+        self.proxy.sort(BinarySortModel.BINSIZECOL, Qt.DescendingOrder)
+        self.assertEqual(["d1", "d2"], self.names())
+        self.proxy.sort(Model.DATACOL, Qt.AscendingOrder)  # The percent bars are sorted by the share
+        self.assertEqual(["d2", "d1"], self.names())
+        self.assertEqual(self.viewIndex("d1"), QModelIndex(d1))
+        self.proxy.fetchMore(self.viewIndex("d1", "d2"))
+        # Appended when listed, then sorted into place: the only one without binary files comes first
+        self.assertTrue(processEventsUntil(lambda: self.names("d1", "d2")[:1] == ["file1.txt"]))
+        self.assertEqual(3, len(self.names("d1", "d2")))
+        # Sorted again when the numbers change
+        file = self.model.mgr.items[os.path.join(self.dir, "d2", "d1", "d1", "file1.txt")]
+        file.invalidate()
+        file.setBinary(True)
+        self.model.updateDirs([file.parent, file.parent.parent, file.parent.parent.parent])
+        self.assertTrue(processEventsUntil(lambda: self.names() == ["d1", "d2"]))
+        self.assertEqual(self.viewIndex("d1"), QModelIndex(d1))
+        self.proxy.sort(0, Qt.DescendingOrder)
+        self.assertEqual(["d2", "d1"], self.names())
+        self.proxy.sort(0, Qt.AscendingOrder)
+        self.assertEqual(["d1", "d2"], self.names())
+
+    def test_diff(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        copy = shutil.copytree(self.dir, os.path.join(tmp, "old"))
+        os.remove(os.path.join(copy, "d1", "d2", "file2.dat"))
+        old = DirManager(dir=copy).dir
+        self.proxy.sort(BinarySortModel.BINSIZECOL, Qt.DescendingOrder)
+        self.assertIsNone(self.viewIndex("d2").data(Qt.BackgroundRole))  # Sort the levels before watching
+        time.sleep(BinarySortModel.RESORT_INTERVAL / 1000)
+        app.processEvents()
+        layouts = []
+        changed = []
+        self.proxy.layoutChanged.connect(lambda *args: layouts.append(args))
+        self.proxy.dataChanged.connect(lambda topLeft, bottomRight, roles: changed.append(topLeft.data()))
+        with mock.patch.object(self.proxy, "sortedRows", wraps=self.proxy.sortedRows) as sortedRows:
+            self.model.setDiff(Diff(old, self.model.mgr.dir), self.dir)
+            self.assertEqual(Model.MORE_BINARY, self.viewIndex("d1").data(Qt.BackgroundRole))
+            self.assertIsNone(self.viewIndex("d2").data(Qt.BackgroundRole))
+            self.assertIn("d1", changed)  # Repainted, not laid out and sorted again
+            time.sleep(BinarySortModel.RESORT_INTERVAL / 1000)
+            app.processEvents()
+            self.model.setDiff(None)
+            self.assertIsNone(self.viewIndex("d1").data(Qt.BackgroundRole))
+            sortedRows.assert_not_called()
+        self.assertEqual([], layouts)
+
+    def test_insertRemove(self):
+        self.proxy.sort(BinarySortModel.BINSIZECOL, Qt.AscendingOrder)
+        self.names("d1")
+        self.assertEqual(["d2", "d1"], self.names())
+        d1 = QPersistentModelIndex(self.viewIndex("d1"))
+        os.mkdir(os.path.join(self.dir, "d0"))
+        self.assertTrue(processEventsUntil(lambda: "d0" in self.names()))
+        self.assertEqual(self.viewIndex("d1"), QModelIndex(d1))
+        self.assertTrue(processEventsUntil(lambda: self.names() == ["d0", "d2", "d1"]))
+        shutil.rmtree(os.path.join(self.dir, "d2"))
+        self.assertTrue(processEventsUntil(lambda: self.names() == ["d0", "d1"]))
+        self.assertEqual(self.viewIndex("d1"), QModelIndex(d1))
+        self.assertEqual("d1", QModelIndex(d1).data())
+
+    def test_filter(self):
+        self.filter.setThresholds(share=50)
+        self.assertEqual(["d1"], self.names())
+        self.assertTrue(self.viewIndex().isValid())
+        self.filter.setThresholds(bytes=1000)
+        self.assertEqual([], self.names())
+        self.filter.setThresholds()
+        self.assertEqual(["d1", "d2"], sorted(self.names()))
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 23:40 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import unittest
+
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QImage, QPainter
+
+from test.app import app
+from src.estimate import Estimate
+from src.percent_bar import PercentBar, PercentBarRenderer
+
+
+class TestPercentBarRenderer(unittest.TestCase):
+    def setUp(self):
+        self.renderer = PercentBarRenderer(maxsize=3)
+
+    def image(self, draw):
+        image = QImage(320, 60, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.darkGreen)
+        painter = QPainter(image)
+        draw(painter)
+        painter.end()
+        return image
+
+    def direct(self, rect, numbers):
+        bar = PercentBar()
+        bar.numbers = numbers
+        return self.image(lambda painter: bar.paint(painter, rect))
+
+    def cached(self, rect, numbers):
+        return self.image(lambda painter: self.renderer.paint(painter, rect, numbers))
+
+    def test_identical(self):
+        for rect in (QRect(0, 0, 300, 24), QRect(13, 21, 250, 30)):
+            for numbers in ([3, 3000, 7, 10], [0, 0, 0, 0], [1, 10, 0, 5], 4 * [None], [2, 20, 3, None]):
+                expected = self.direct(rect, numbers)
+                self.assertEqual(expected, self.cached(rect, numbers), (rect, numbers))
+                self.assertEqual(expected, self.cached(rect, numbers), (rect, numbers))  # from the cache
+
+    def test_estimate(self):
+        rect = QRect(7, 3, 300, 24)
+        estimate = Estimate(120.4, 15.2, 123456.0, 2345.6, 100, 400)
+        bar = PercentBar()
+        bar.estimate = estimate
+        expected = self.image(lambda painter: bar.paint(painter, rect))
+        self.assertEqual(expected, self.image(lambda painter: self.renderer.paint(painter, rect, None, estimate)))
+        self.assertNotEqual(expected, self.cached(rect, [120, 123456, 180, 400]))
+
+    def test_cache(self):
+        rect = QRect(0, 0, 100, 20)
+        self.cached(rect, [1, 1, 1, 2])
+        self.cached(rect, [1, 1, 1, 2])
+        self.assertEqual(1, len(self.renderer.pixmaps))
+        self.cached(QRect(5, 40, 100, 20), [1, 1, 1, 2])  # only the size matters
+        self.assertEqual(1, len(self.renderer.pixmaps))
+        self.cached(rect, [1, 1, 1, 3])
+        self.renderer.trueColor = self.renderer.assessedColor.darker()
+        self.cached(rect, [1, 1, 1, 3])
+        self.assertEqual(3, len(self.renderer.pixmaps))
+        for total in range(4, 10):
+            self.cached(rect, [1, 1, 1, total])
+        self.assertEqual(3, len(self.renderer.pixmaps))
+
+
+if __name__ == '__main__':
+    unittest.main()
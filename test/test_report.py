@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 20:25 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import io
+import json
+import unittest
+
+from src.report import JsonWriter, CsvWriter, fileRecord
+
+
+class TestWriters(unittest.TestCase):
+    def test_json(self):
+        out = io.StringIO()
+        writer = JsonWriter(out)
+        writer.begin("/r")
+        writer.write(fileRecord("/r/a", True, 3))
+        writer.write(fileRecord("/r/b", False, 4))
+        writer.end({"path": "/r", "files": 2})
+        doc = json.loads(out.getvalue())
+        self.assertEqual("/r", doc["root"])
+        self.assertEqual([True, False], [e["binary"] for e in doc["entries"]])
+        self.assertEqual(2, doc["summary"]["files"])
+
+    def test_emptyJson(self):
+        out = io.StringIO()
+        writer = JsonWriter(out)
+        writer.begin("/r")
+        writer.end({})
+        self.assertEqual([], json.loads(out.getvalue())["entries"])
+
+    def test_csv(self):
+        out = io.StringIO()
+        writer = CsvWriter(out)
+        writer.begin("/r")
+        writer.write(fileRecord("/r/a", True, 3))
+        writer.end({"path": "/r", "files": 1})
+        self.assertEqual(["type,path,binary,size,files,binFiles,txtFiles,binSize,txtSize",
+                          "file,/r/a,1,3,,,,,",
+                          "summary,/r,,,1,,,,"], out.getvalue().splitlines())
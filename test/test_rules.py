@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 03:40 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import io
+import json
+import os
+import pickle
+import shutil
+import unittest
+
+from src.cli import scan
+from src.dir_manager import DirManager
+from src.report import NdjsonWriter
+from src.rules import ExcludeRules, RuleSet
+from src.stats import stats
+from src.walker import Walker
+from test.test_dir_manager import prepareDirs
+
+
+class TestRuleSet(unittest.TestCase):
+    def test_patterns(self):
+        rules = RuleSet(["*.dat", "/d2", "build/", "a/**/z", "# comment", "", "file?.txt", "[xy].c"])
+        self.assertTrue(rules.match("d1/file3.dat", False))
+        self.assertTrue(rules.match("file3.dat", False))
+        self.assertIsNone(rules.match("file3.dat.txt", False))
+        self.assertTrue(rules.match("d2", True))
+        self.assertIsNone(rules.match("d1/d2", True))  # Anchored to the root
+        self.assertTrue(rules.match("d1/build", True))
+        self.assertIsNone(rules.match("d1/build", False))  # Directories only
+        self.assertTrue(rules.match("a/z", True))
+        self.assertTrue(rules.match("a/b/c/z", False))
+        self.assertTrue(rules.match("d/file1.txt", False))
+        self.assertIsNone(rules.match("d/file10.txt", False))
+        self.assertTrue(rules.match("x.c", False))
+        self.assertIsNone(rules.match("z.c", False))
+        self.assertFalse(RuleSet(["# only a comment"]))
+
+    def test_negation(self):
+        rules = RuleSet(["*.dat", "!keep.dat"])
+        self.assertTrue(rules.match("a.dat", False))
+        self.assertFalse(rules.match("keep.dat", False))
+        # The last matching pattern wins
+        self.assertTrue(RuleSet(["!keep.dat", "*.dat"]).match("keep.dat", False))
+
+    def test_base(self):
+        rules = RuleSet(["/x", "*.o"], "sub/dir")
+        self.assertTrue(rules.match("sub/dir/x", False))
+        self.assertIsNone(rules.match("sub/dir/y/x", False))
+        self.assertTrue(rules.match("sub/dir/y/a.o", False))
+
+
+class TestExcludeRules(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        stats.reset()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def walk(self, rules):
+        rules.setRoot(self.dir)
+        dirs = []
+        files = []
+        for path, subdirs, entries in Walker(rules=rules).walk(self.dir):
+            rel = os.path.relpath(path, self.dir).replace(os.sep, "/")
+            dirs.append(rel)
+            files.extend(name if rel == "." else f"{rel}/{name}" for name, st in entries)
+        return sorted(dirs), sorted(files)
+
+    def test_excludedAlias(self):
+        os.symlink(os.path.join(self.dir, "d2"), os.path.join(self.dir, "d1", "alias"))
+        rules = ExcludeRules("/d2")
+        rules.setRoot(self.dir)
+        walker = Walker(rules=rules)
+        walked = [os.path.relpath(path, self.dir) for path, dirs, files in walker.walk(self.dir)]
+        # The excluded d2 is not entered, so it does not hide its other path
+        self.assertIn(os.path.join("d1", "alias", "d1", "d1"), walked)
+        self.assertNotIn("d2", walked)
+        self.assertEqual(0, walker.skipped)
+        self.assertEqual(1, rules.prunedDirs)
+
+    def test_walk(self):
+        rules = ExcludeRules("*.dat d1/d1/")
+        dirs, files = self.walk(rules)
+        self.assertEqual([".", "d1", "d1/d2", "d1/d2/d1", "d2", "d2/d1", "d2/d1/d1"], dirs)
+        self.assertEqual(["d1/d2/file1.txt", "d2/d1/d1/file1.txt"], files)
+        self.assertEqual(1, rules.prunedDirs)
+        self.assertEqual(2, rules.prunedFiles)  # The files in the pruned directory are not listed at all
+        self.assertEqual(10, rules.prunedBytes)
+        self.assertEqual({"prunedDirs": 1, "prunedFiles": 2, "prunedBytes": 10},
+                         {k: v for k, v in stats.snapshot().items() if k.startswith("pruned")})
+
+    def test_depthAndSize(self):
+        dirs, files = self.walk(ExcludeRules(maxDepth=1))
+        self.assertEqual([".", "d1", "d2"], dirs)
+        dirs, files = self.walk(ExcludeRules(maxSize=5))
+        self.assertEqual(3, len(files))
+        self.assertTrue(all(f.endswith(".dat") for f in files))
+
+    def test_gitignore(self):
+        with open(os.path.join(self.dir, ".gitignore"), "w") as f:
+            f.write("*.txt\n")
+        with open(os.path.join(self.dir, "d1", "d2", ".gitignore"), "w") as f:
+            f.write("!file1.txt\nd1/\n")
+        dirs, files = self.walk(ExcludeRules(gitignore=True))
+        self.assertNotIn("d1/d2/d1", dirs)
+        self.assertEqual([".gitignore", "d1/d1/d1/file3.dat", "d1/d2/.gitignore", "d1/d2/file1.txt",
+                          "d1/d2/file2.dat"], files)
+        dirs, files = self.walk(ExcludeRules())
+        self.assertEqual(9, len(files))
+
+    def test_excluded(self):
+        rules = ExcludeRules("d1/d1/ *.log", maxDepth=2)
+        rules.setRoot(self.dir)
+        self.assertTrue(rules.excluded(os.path.join(self.dir, "d1", "d1"), True))
+        self.assertTrue(rules.excluded(os.path.join(self.dir, "d1", "d1", "d1", "file1.txt"), False))
+        self.assertTrue(rules.excluded(os.path.join(self.dir, "d2", "d1", "d1"), True))
+        self.assertFalse(rules.excluded(os.path.join(self.dir, "d2", "d1", "file.txt"), False))
+        self.assertTrue(rules.excluded(os.path.join(self.dir, "d2", "a.log"), False))
+        self.assertFalse(rules.excluded(self.dir, True))
+        self.assertTrue(ExcludeRules(maxDepth=0))
+        self.assertFalse(ExcludeRules(""))
+
+    def test_managerAndCli(self):
+        rules = ExcludeRules(["*.dat"])
+        mgr = DirManager(dir=self.dir, rules=pickle.loads(pickle.dumps(rules)))
+        self.assertEqual(4, mgr.dir.totalFiles())
+        self.assertEqual(0, mgr.dir.binCount())
+        self.assertEqual(3, mgr.rules.prunedFiles)
+
+        out = io.StringIO()
+        summary = scan(self.dir, NdjsonWriter(out), workers=2, rules=ExcludeRules("/d1/"))
+        self.assertEqual(1, summary["files"])
+        self.assertEqual(1, summary["prunedDirs"])
+        self.assertEqual(["summary"], [json.loads(line)["type"] for line in out.getvalue().splitlines()][-1:])
+
+
+if __name__ == '__main__':
+    unittest.main()
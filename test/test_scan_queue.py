@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 17:50 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import unittest
+
+from src.scan_queue import ScanQueue
+
+LIST = ScanQueue.LIST
+CLASSIFY = ScanQueue.CLASSIFY
+
+
+class TestScanQueue(unittest.TestCase):
+    def test_fifo(self):
+        q = ScanQueue()
+        q.push(LIST, "a")
+        q.push(LIST, "b")
+        q.push(CLASSIFY, "a", payload=[1])
+        self.assertEqual((LIST, "a", ScanQueue.BACKGROUND, None), q.pop())
+        self.assertEqual((LIST, "b", ScanQueue.BACKGROUND, None), q.pop())
+        self.assertEqual((CLASSIFY, "a", ScanQueue.BACKGROUND, [1]), q.pop())
+
+    def test_promote(self):
+        q = ScanQueue()
+        q.push(LIST, "a")
+        q.push(CLASSIFY, "b", payload=[1])
+        self.assertTrue(q.promote(CLASSIFY, "b"))
+        self.assertFalse(q.promote(LIST, "c"))
+        self.assertEqual(2, len(q))
+        self.assertEqual((CLASSIFY, "b", ScanQueue.VISIBLE, [1]), q.pop())
+        self.assertEqual((LIST, "a", ScanQueue.BACKGROUND, None), q.pop())
+        self.assertEqual(0, len(q))
+
+    def test_unfinished(self):
+        q = ScanQueue()
+        q.push(LIST, "a")
+        q.push(LIST, "a", ScanQueue.VISIBLE)
+        self.assertEqual(1, q.unfinished)
+        q.pop()
+        self.assertFalse(q.finished())
+        self.assertIsNone(q.pop(timeout=0.01))
+        q.taskDone()
+        self.assertTrue(q.finished())
+        self.assertIsNone(q.pop())
+
+    def test_close(self):
+        q = ScanQueue()
+        q.push(LIST, "a")
+        q.pop()
+        q.close()
+        self.assertTrue(q.finished())
+        self.assertIsNone(q.pop())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 01:10 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import shutil
+import unittest
+from unittest import mock
+
+from src.classifier import ClassificationEngine
+from src.dir_manager import DirManager
+from src.scheduler import ReadScheduler, physicalOffset
+from src.tiered import TieredClassifier
+from test.test_dir_manager import prepareDirs
+
+
+class TestReadScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.mgr = DirManager(dir=self.dir, classify=False)
+        self.files = list(self.mgr.dir.allFiles())
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def test_orders(self):
+        files = list(reversed(self.files))
+        self.assertEqual(files, ReadScheduler(None).schedule(files))
+        byInode = ReadScheduler().schedule(files)
+        self.assertEqual(sorted(f.ino for f in files), [f.ino for f in byInode])
+        self.assertEqual(set(files), set(ReadScheduler("extent").schedule(files)))
+        for order in ReadScheduler.ORDERS:
+            self.assertEqual(set(files), set(ReadScheduler(order).schedule(f for f in files)), order)
+        with self.assertRaises(ValueError):
+            ReadScheduler("random")
+
+    def test_physicalOffset(self):
+        offset = physicalOffset(self.files[0].path)
+        self.assertTrue(offset is None or isinstance(offset, int))
+        self.assertIsNone(physicalOffset(self.dir + "missing"))
+
+    def test_engine(self):
+        engine = ClassificationEngine(workers=1, batchSize=100)
+        with mock.patch("src.classifier.classifyBatch", return_value=([False] * 7, {})) as classifyBatch:
+            engine.classify(self.files[::-1])
+        paths = classifyBatch.call_args[0][0]
+        self.assertEqual([f.path for f in ReadScheduler().schedule(self.files)], paths)
+
+    def test_readahead(self):
+        paths = [f.path for f in self.files] + [self.dir + "missing"]
+        expected = [TieredClassifier(readahead=False, noatime=False).isBinary(path) for path in paths]
+        classifier = TieredClassifier().forBatch()
+        self.assertEqual(expected, classifier.classifyAll(paths))
+        self.assertEqual(expected, TieredClassifier(extensions=True, verify=True).classifyAll(paths))
+        self.assertEqual(expected[:-1], [f.path.endswith(".dat") for f in self.files])
+
+
+if __name__ == '__main__':
+    unittest.main()
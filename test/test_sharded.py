@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 21:30 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.cache import ClassificationCache
+from src.dir_manager import DirManager, Dir, UniqueLink
+from src.sharded import ShardedScanner
+from test.test_dir_manager import prepareDirs
+
+
+class TestShardedScanner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.mgr = DirManager(dir=self.dir, lazy=True)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def checkTree(self):
+        expected = DirManager(dir=self.dir)
+        self.assertEqual(sorted(expected.items), sorted(self.mgr.items))
+        for path, item in expected.items.items():
+            other = self.mgr.items[path]
+            if isinstance(item, Dir):
+                self.assertTrue(other.listed, path)
+                self.assertEqual([item.totalFiles(), item.binCount(), item.binSize(), item.txtCount(), item.txtSize()],
+                                 [other.totalFiles(), other.binCount(), other.binSize(), other.txtCount(),
+                                  other.txtSize()], path)
+            else:
+                self.assertEqual(item.binary, other.binary, path)
+                self.assertEqual(item.statKey, other.statKey, path)
+        self.assertTrue(self.mgr.dir.complete())
+
+    def test_scan(self):
+        scanner = ShardedScanner(workers=2)
+        scanner.scan(self.mgr.dir)
+        self.checkTree()
+        self.assertEqual(1, scanner.shards)
+
+    def test_split(self):
+        # Tiny budgets force the tree to be split into many shards
+        scanner = ShardedScanner(workers=3, budget=3, firstBudget=1)
+        scanner.scan(self.mgr.dir)
+        self.checkTree()
+        self.assertGreater(scanner.shards, 3)
+
+    def test_cache(self):
+        cacheDir = tempfile.mkdtemp()
+        try:
+            cache = ClassificationCache(os.path.join(cacheDir, "cache.sqlite"))
+            ShardedScanner(workers=2, cache=cache).scan(self.mgr.dir)
+            self.assertEqual(7, len(cache))
+            self.mgr = DirManager(dir=self.dir, lazy=True)
+            # Only the results of the files not found in the cache are stored again
+            cache.store = lambda results: self.fail(list(results))
+            ShardedScanner(workers=2, cache=cache).scan(self.mgr.dir)
+            self.checkTree()
+            cache.close()
+        finally:
+            shutil.rmtree(cacheDir)
+
+    def test_links(self):
+        os.symlink(self.dir, os.path.join(self.dir, "d1", "loop"))
+        os.symlink(os.path.join(self.dir, "d1", "d2"), os.path.join(self.dir, "d2", "alias"))
+        os.link(os.path.join(self.dir, "d1", "d1", "d1", "file3.dat"), os.path.join(self.dir, "d2", "link.dat"))
+        self.mgr = DirManager(dir=self.dir, lazy=True, uniqueBytes=True)
+        scanner = ShardedScanner(workers=3, budget=3, firstBudget=1)  # d1 and d2 are scanned in separate shards
+        scanner.scan(self.mgr.dir)
+        self.assertGreater(scanner.shards, 2)
+        self.assertEqual(8, self.mgr.dir.totalFiles())
+        self.assertEqual(4, self.mgr.dir.binCount())
+        self.assertEqual(15, self.mgr.dir.binSize())
+        self.assertEqual(24, self.mgr.dir.txtSize())
+        self.assertTrue(self.mgr.dir.complete())
+        self.assertNotIn(os.path.join(self.dir, "d1", "loop"), self.mgr.items)
+        # d1/d2 is merged once, through whichever path comes first
+        self.assertEqual(1, [os.path.join(self.dir, "d1", "d2") in self.mgr.items,
+                             os.path.join(self.dir, "d2", "alias") in self.mgr.items].count(True))
+        links = [self.mgr.items[os.path.join(self.dir, *path)] for path in (("d1", "d1", "d1", "file3.dat"),
+                                                                             ("d2", "link.dat"))]
+        self.assertEqual(1, [isinstance(link, UniqueLink) for link in links].count(True))
+
+    def test_dirManager(self):
+        self.mgr = DirManager(dir=self.dir, workers=2, sharded=True)
+        self.checkTree()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 04:55 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.cli import scan
+from src.dir_manager import DirManager, Dir
+from src.report import NdjsonWriter
+from src.rules import ExcludeRules
+from src.scan_queue import ScanQueue
+from src.snapshot import Snapshot, SnapshotDir, MAGIC
+from src.worker import ValidationWorker
+from test.test_dir_manager import prepareDirs
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "tree.sfbsnap")
+        self.loaded = []
+
+    def tearDown(self) -> None:
+        for mgr in self.loaded:
+            mgr.snapshot.close()
+        shutil.rmtree(self.dir)
+        shutil.rmtree(self.tmp)
+
+    def load(self, **kwargs):
+        mgr = DirManager.load(self.path, **kwargs)
+        self.loaded.append(mgr)
+        return mgr
+
+    def assertSameTree(self, expected, mgr):
+        self.assertEqual(sorted(expected.items), sorted(mgr.items))
+        for path, item in expected.items.items():
+            other = mgr.items[path]
+            if isinstance(item, Dir):
+                self.assertEqual([item.listed, item.nbinFiles, item.ntxtFiles, item.totalFiles(), item.binCount(),
+                                  item.txtCount(), item.binSize(), item.txtSize(), item.totalBinSize2,
+                                  item.nTotalUnlisted],
+                                 [other.listed, other.nbinFiles, other.ntxtFiles, other.totalFiles(), other.binCount(),
+                                  other.txtCount(), other.binSize(), other.txtSize(), other.totalBinSize2,
+                                  other.nTotalUnlisted], path)
+            else:
+                self.assertEqual((item.binary, item.statKey), (other.binary, other.statKey), path)
+
+    def test_roundTrip(self):
+        with open(os.path.join(self.dir, "d2", "żółw.txt"), "w") as f:
+            f.write("non-ASCII name")
+        mgr = DirManager(dir=self.dir)
+        for compress in (False, True):
+            size = mgr.save(self.path, compress)
+            self.assertEqual(size, os.path.getsize(self.path))
+            self.assertSameTree(mgr, self.load())
+
+    def test_lazy(self):
+        DirManager(dir=self.dir).save(self.path)
+        mgr = self.load()
+        root = mgr.dir
+        self.assertIsInstance(root, SnapshotDir)
+        self.assertEqual(7, root.totalFiles())
+        self.assertEqual(3, root.binCount())
+        self.assertIsNotNone(root._snapshot)  # Nothing created below the root yet
+        d1 = mgr.items[os.path.join(self.dir, "d1")]
+        self.assertIsNone(root._snapshot)
+        self.assertIsNotNone(d1._snapshot)
+        self.assertEqual(6, d1.totalFiles())
+        # The lazily created tree behaves like a scanned one
+        file = mgr.items[os.path.join(self.dir, "d1", "d2", "file2.dat")]
+        file.invalidate()
+        self.assertEqual(2, root.binCount())
+        self.assertIsNone(d1._snapshot)
+
+    def test_partial(self):
+        mgr = DirManager(dir=self.dir, lazy=True)
+        mgr.save(self.path)
+        loaded = self.load()
+        self.assertFalse(loaded.dir.listed)
+        self.assertFalse(loaded.dir.complete())
+
+        mgr = DirManager(dir=self.dir, classify=False, rules=ExcludeRules("/d2", maxSize=100))
+        mgr.save(self.path)
+        loaded = self.load()
+        self.assertSameTree(mgr, loaded)
+        self.assertEqual(["/d2"], loaded.rules.patterns)
+        self.assertEqual(100, loaded.rules.maxSize)
+        self.assertIsNone(next(loaded.dir.allFiles()).binary)
+
+    def test_invalid(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a snapshot")
+        self.assertRaises(ValueError, Snapshot, self.path)
+        with open(self.path, "wb") as f:
+            f.write(MAGIC + b"\xff\xff" + bytes(30))
+        self.assertRaises(ValueError, Snapshot, self.path)
+
+    def test_traversal(self):
+        os.symlink(os.path.join(self.dir, "d2"), os.path.join(self.dir, "d1", "alias"))
+        mgr = DirManager(dir=self.dir, followSymlinks=False, uniqueBytes=True)
+        mgr.save(self.path)
+        loaded = self.load()
+        self.assertEqual(mgr.traversal(), loaded.traversal())
+        self.assertEqual([], list(loaded.validate()))  # The link is not followed when checking either
+        self.assertEqual([], list(loaded.snapshot.validate()))
+        self.assertTrue(self.load(followSymlinks=True).followSymlinks)  # The stored options are only the defaults
+
+    def test_validate(self):
+        DirManager(dir=self.dir).save(self.path)
+        mgr = self.load()
+        self.assertEqual([], list(mgr.validate()))
+        with open(os.path.join(self.dir, "d1", "new.txt"), "w") as f:
+            f.write("new")
+        with open(os.path.join(self.dir, "d2", "d1", "d1", "file1.txt"), "a") as f:
+            f.write("more")
+        shutil.rmtree(os.path.join(self.dir, "d1", "d2", "d1"))
+        stale = list(mgr.validate())
+        self.assertEqual([os.path.join(self.dir, *p) for p in (("d1",), ("d1", "d2"), ("d2", "d1", "d1"))], stale)
+
+        queue = ScanQueue()
+        worker = ValidationWorker(mgr, queue, interval=0)
+
+        def onListed(path, dirs, files, priority):
+            changed, toClassify = mgr.updateDir(path, dirs, files)
+            if toClassify:
+                queue.push(ScanQueue.CLASSIFY, path, priority, toClassify)
+            queue.taskDone()
+
+        def onBatchReady(batch):
+            for file, binary in batch:
+                file.setBinary(binary)
+
+        worker.listed.connect(onListed)
+        worker.batchReady.connect(onBatchReady)
+        worker.run()
+        self.assertSameTree(DirManager(dir=self.dir), mgr)
+
+    def test_cli(self):
+        summary = scan(self.dir, NdjsonWriter(io.StringIO()), workers=2, snapshot=self.path)
+        mgr = self.load()
+        self.assertEqual(summary["files"], mgr.dir.totalFiles())
+        self.assertEqual(summary["binFiles"], mgr.dir.binCount())
+        self.assertSameTree(DirManager(dir=self.dir), mgr)
+
+
+if __name__ == '__main__':
+    unittest.main()
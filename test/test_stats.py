@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 23:20 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+
+from test.app import app
+from src.dir_manager import DirManager
+from src.stats import Stats, stats, profiled
+from src.stats_dialog import StatsDialog
+from test.test_dir_manager import prepareDirs
+
+
+class TestStats(unittest.TestCase):
+    def test_countersAndTimers(self):
+        s = Stats()
+        s.count("entries", 10)
+        s.count("entries", 5)
+        s.add("list", 0.5, 3)
+        with s.timer("list"):
+            pass
+        s.add("paint", 0.02)
+        s.count("frames", 4)
+        snapshot = s.snapshot()
+        self.assertEqual(15, snapshot["entries"])
+        self.assertEqual(4, snapshot["list"]["count"])
+        self.assertGreaterEqual(snapshot["list"]["seconds"], 0.5)
+        self.assertLessEqual(snapshot["listRate"], 30)
+        self.assertAlmostEqual(0.005, snapshot["paintPerFrame"])
+        self.assertIn("listRate", s.report())
+        s.reset()
+        self.assertEqual({}, s.snapshot())
+
+    def test_scan(self):
+        dir = prepareDirs()
+        try:
+            stats.reset()
+            DirManager(dir=dir)
+            snapshot = stats.snapshot()
+            self.assertEqual(9, snapshot["list"]["count"])
+            self.assertEqual(15, snapshot["entries"])
+            self.assertEqual(7 + 9, snapshot["statCalls"])  # The files and the directories, to enter each once
+            self.assertEqual(15, snapshot["items"])
+            self.assertEqual(7, snapshot["classified"])
+            self.assertEqual(39, snapshot["bytesRead"])
+            self.assertIn("scan", snapshot)
+        finally:
+            shutil.rmtree(dir)
+
+    def test_profiled(self):
+        path = os.path.join(tempfile.mkdtemp(), "profile")
+        try:
+            with profiled(path):
+                sum(range(1000))
+            self.assertTrue(pstats.Stats(path).total_calls > 0)
+        finally:
+            shutil.rmtree(os.path.dirname(path))
+
+    def test_dialog(self):
+        stats.count("dataCalls")
+        dialog = StatsDialog()
+        dialog.show()
+        self.assertIn("dataCalls", dialog.text.toPlainText())
+        dialog.onResetClicked()
+        self.assertNotIn("dataCalls", dialog.text.toPlainText())
+        dialog.close()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 19.10.2026 00:20 10
+
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.classifier import ClassificationEngine
+from src.dir_manager import DirManager
+from src.stats import stats
+from src.tiered import TieredClassifier, MAGIC_SIZE
+from src.utils import isText
+from test.test_dir_manager import prepareDirs
+
+
+class TestTieredClassifier(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def file(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_tiers(self):
+        classifier = TieredClassifier().forBatch()
+        self.assertFalse(classifier.isBinary(self.file("empty", b""), 0))
+        self.assertEqual({"tierSize": 1, "readsAvoided": 1}, classifier.counts)
+
+        classifier = TieredClassifier().forBatch()
+        self.assertTrue(classifier.isBinary(self.file("bin", b"\x00" + 2000 * b"a")))
+        self.assertFalse(classifier.isBinary(self.file("short", b"abc\n")))
+        self.assertFalse(classifier.isBinary(self.file("long", 2000 * b"a")))
+        self.assertTrue(classifier.isBinary(self.file("late", 100 * b"a" + b"\x00")))
+        self.assertFalse(classifier.isBinary(self.file("later", 2000 * b"a" + b"\x00")))
+        self.assertEqual(2, classifier.counts["tierMagic"])
+        self.assertEqual(3, classifier.counts["tierFull"])
+        self.assertEqual(MAGIC_SIZE + 4 + 1024 + 101 + 1024, classifier.counts["bytesRead"])
+        self.assertTrue(classifier.isBinary(os.path.join(self.dir, "missing")))
+
+    def test_agreesWithIsText(self):
+        classifier = TieredClassifier()
+        contents = [b"", b"a", b"\x1b[0m colours\n", bytes(range(256)), 63 * b"x" + b"\x7f", 64 * b"x" + b"\x7f",
+                    1023 * b"x" + b"\x01", 1024 * b"x" + b"\x01", "żółw".encode()]
+        for i, content in enumerate(contents):
+            path = self.file(f"f{i}", content)
+            self.assertEqual(not isText(path), classifier.isBinary(path, len(content)), content)
+
+    def test_extensions(self):
+        png = self.file("a.PNG", 100 * b"a")
+        txt = self.file("a.txt", b"\x00\x01")
+        classifier = TieredClassifier(extensions=True).forBatch()
+        self.assertTrue(classifier.isBinary(png))
+        self.assertFalse(classifier.isBinary(txt))
+        self.assertEqual({"tierExtension": 2, "readsAvoided": 2}, classifier.counts)
+        self.assertFalse(TieredClassifier().isBinary(png))
+
+        classifier = TieredClassifier(extensions=True, verify=True).forBatch()
+        self.assertFalse(classifier.isBinary(png))
+        self.assertTrue(classifier.isBinary(txt))
+        self.assertEqual(2, classifier.counts["verified"])
+        self.assertEqual(2, classifier.counts["disagreeExtension"])
+
+        classifier = TieredClassifier(extensions=True, textExtensions={".dat"}, binaryExtensions=()).forBatch()
+        self.assertFalse(classifier.isBinary(self.file("b.dat", b"\x00")))
+        self.assertFalse(classifier.isBinary(png))
+
+    def test_magic(self):
+        pdf = self.file("doc", b"%PDF-1.4\n" + 200 * b"a")
+        self.assertTrue(TieredClassifier().isBinary(pdf))
+        self.assertFalse(TieredClassifier(magic=False).isBinary(pdf))
+        classifier = TieredClassifier(verify=True).forBatch()
+        self.assertFalse(classifier.isBinary(pdf))
+        self.assertEqual(1, classifier.counts["disagreeMagic"])
+
+        installer = self.file("install.sh", b"#!/bin/sh\ntail -c +200 \"$0\" | tar xz\nexit\n" + 64 * b"#" + bytes(200))
+        self.assertTrue(TieredClassifier().isBinary(installer))  # The payload follows the script
+        self.assertFalse(isText(installer))
+        self.assertFalse(TieredClassifier().isBinary(self.file("script", b"#!/bin/sh\n" + 200 * b"a")))
+
+    def test_engine(self):
+        root = prepareDirs()
+        try:
+            stats.reset()
+            mgr = DirManager(dir=root, classifier=TieredClassifier(extensions=True), workers=2)
+            self.assertEqual(3, mgr.dir.binCount())
+            self.assertEqual(4, stats.snapshot()["readsAvoided"])  # the .txt files
+            stats.reset()
+            engine = ClassificationEngine(workers=2, processes=True, batchSize=2)
+            files = list(mgr.dir.allFiles())
+            for f in files:
+                f.invalidate()
+            engine.classify(files)
+            self.assertEqual(3, mgr.dir.binCount())
+            self.assertEqual(7, stats.snapshot()["tierMagic"])
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    unittest.main()
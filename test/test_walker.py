@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 10:20 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import shutil
+import unittest
+
+from src.walker import Walker
+from test.test_dir_manager import prepareDirs
+
+
+class TestWalker(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def test_walk(self):
+        walked = [(os.path.relpath(path, self.dir), dirs, [name for name, st in files])
+                  for path, dirs, files in Walker().walk(self.dir)]
+        self.assertEqual([(".", ["d1", "d2"], []),
+                          ("d1", ["d1", "d2"], []),
+                          (os.path.join("d1", "d1"), ["d1"], []),
+                          (os.path.join("d1", "d1", "d1"), [], ["file1.txt", "file2.txt", "file3.dat"]),
+                          (os.path.join("d1", "d2"), ["d1"], ["file1.txt", "file2.dat"]),
+                          (os.path.join("d1", "d2", "d1"), [], ["file1.dat"]),
+                          ("d2", ["d1"], []),
+                          (os.path.join("d2", "d1"), ["d1"], []),
+                          (os.path.join("d2", "d1", "d1"), [], ["file1.txt"])],
+                         walked)
+
+    def test_walk_sizes(self):
+        for path, dirs, files in Walker().walk(self.dir):
+            for name, st in files:
+                self.assertEqual(os.path.getsize(os.path.join(path, name)), st.st_size)
+
+    def test_walk_prune(self):
+        walked = []
+        for path, dirs, files in Walker().walk(self.dir):
+            walked.append(os.path.relpath(path, self.dir))
+            if "d1" in dirs:
+                dirs.remove("d1")
+        self.assertEqual([".", "d2"], walked)
+
+    def test_walk_deep(self):
+        path = self.dir
+        for _ in range(1200):
+            path = os.path.join(path, "d")
+            os.mkdir(path)
+        depth = sum(1 for _ in Walker().walk(os.path.join(self.dir, "d")))
+        self.assertEqual(1200, depth)
+        while path != self.dir:
+            os.rmdir(path)
+            path = os.path.dirname(path)
+
+    def test_symlinkLoop(self):
+        os.symlink(self.dir, os.path.join(self.dir, "d1", "loop"))
+        walker = Walker()
+        walked = [os.path.relpath(path, self.dir) for path, dirs, files in walker.walk(self.dir)]
+        self.assertEqual(9, len(walked))
+        self.assertNotIn(os.path.join("d1", "loop"), walked)
+        self.assertEqual(1, walker.skipped)
+
+    def test_symlinkAlias(self):
+        os.symlink(os.path.join(self.dir, "d2"), os.path.join(self.dir, "d1", "alias"))
+        walker = Walker()
+        walked = [os.path.relpath(path, self.dir) for path, dirs, files in walker.walk(self.dir)]
+        self.assertEqual(9, len(walked))  # d2 is entered from the root, before its link is seen
+        self.assertNotIn(os.path.join("d1", "alias"), walked)
+        self.assertEqual(1, walker.skipped)
+
+        walker = Walker(followSymlinks=False)
+        walked = [os.path.relpath(path, self.dir) for path, dirs, files in walker.walk(self.dir)]
+        self.assertEqual(9, len(walked))
+        self.assertNotIn(os.path.join("d1", "alias"), walked)
+        self.assertEqual(0, walker.skipped)
+
+    def test_oneFilesystem(self):
+        walker = Walker(oneFilesystem=True)
+        walker.listDir(self.dir)
+        walker.device = -1  # As if the subdirectories were mounted from elsewhere
+        self.assertEqual([], walker.listDir(os.path.join(self.dir, "d1"))[0])
+        self.assertEqual(2, walker.skipped)
+
+    def test_relist(self):
+        walker = Walker()
+        listed = walker.listDir(self.dir)
+        self.assertEqual(listed, walker.listDir(self.dir))  # Listing again is not entering again
+        self.assertEqual(0, walker.skipped)
+
+    def test_shared(self):
+        visited = {}
+        Walker(visited=visited, root=self.dir).listDir(self.dir)
+        os.symlink(os.path.join(self.dir, "d2"), os.path.join(self.dir, "d1", "alias"))
+        walker = Walker(visited=visited, root=self.dir)
+        self.assertEqual(["d1", "d2"], walker.listDir(os.path.join(self.dir, "d1"))[0])
+        self.assertEqual(1, walker.skipped)
+
+        # The directories recorded outside of the root do not count
+        walker = Walker(visited=visited, root=os.path.join(self.dir, "d1"))
+        self.assertEqual(["alias", "d1", "d2"], walker.listDir(os.path.join(self.dir, "d1"))[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 16:30 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import shutil
+import time
+import unittest
+
+from test.app import app
+from PyQt5.QtCore import QEventLoop, QTimer
+
+from src.dir_manager import DirManager
+from src.fs_watcher import FileSystemWatcher
+from src.watcher import Debouncer, PollingWatcher
+from test.test_dir_manager import prepareDirs
+
+
+def write(path, content):
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+class TestRefreshDir(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.mgr = DirManager(dir=self.dir)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def test_refreshDir(self):
+        d1d2 = os.path.join(self.dir, "d1", "d2")
+        write(os.path.join(d1d2, "new.dat"), bytes([0, 1]))
+        os.remove(os.path.join(d1d2, "file2.dat"))
+        time.sleep(0.01)
+        write(os.path.join(d1d2, "file1.txt"), bytes([0, 1, 2]))
+        os.rename(os.path.join(d1d2, "d1"), os.path.join(d1d2, "renamed"))
+
+        dirs, files = self.mgr.refreshDir(d1d2)
+        self.assertEqual([self.mgr.items[d1d2]], dirs)
+        self.assertEqual(["file1.txt", "new.dat", "file1.dat"], [os.path.basename(f.path) for f in files])
+        self.assertNotIn(os.path.join(d1d2, "file2.dat"), self.mgr.items)
+        self.assertNotIn(os.path.join(d1d2, "d1", "file1.dat"), self.mgr.items)
+        self.assertIn(os.path.join(d1d2, "renamed", "file1.dat"), self.mgr.items)
+
+        self.assertEqual(7, self.mgr.dir.totalFiles())
+        self.assertEqual(4, self.mgr.dir.binCount() + self.mgr.dir.txtCount())
+        self.mgr.engine.classify(files)
+        self.assertEqual(4, self.mgr.dir.binCount())
+        self.assertEqual(3, self.mgr.dir.txtCount())
+
+    def test_refreshRemovedDir(self):
+        path = os.path.join(self.dir, "d2", "d1")
+        shutil.rmtree(path)
+        self.mgr.refreshDir(path)
+        self.assertNotIn(path, self.mgr.items)
+        self.assertEqual(6, self.mgr.dir.totalFiles())
+
+
+class TestDebouncer(unittest.TestCase):
+    def test_debounce(self):
+        d = Debouncer(quiet=1, maxDelay=3)
+        self.assertFalse(d.due(0))
+        d.add("a", 0)
+        d.add("b", 0.5)
+        self.assertFalse(d.due(1.4))
+        self.assertTrue(d.due(1.5))
+        for t in range(1, 4):
+            d.add("a", 0.5 + t * 0.9)
+        self.assertTrue(d.due(3))
+        self.assertEqual(["a", "b"], d.take())
+        self.assertIsNone(d.deadline())
+
+
+class TestPollingWatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.mgr = DirManager(dir=self.dir)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def test_poll(self):
+        poller = PollingWatcher(self.mgr)
+        poller.start()
+        self.assertEqual([], poller.poll())
+        write(os.path.join(self.dir, "d2", "new.txt"), b"abc")
+        write(os.path.join(self.dir, "d1", "d1", "d1", "file1.txt"), b"abcdef")
+        self.assertEqual(sorted([os.path.join(self.dir, "d2"), os.path.join(self.dir, "d1", "d1", "d1")]),
+                         sorted(poller.poll()))
+        self.assertEqual([], poller.poll())  # Reported once, until refreshed
+        poller.refreshed(os.path.join(self.dir, "d2"))
+        self.mgr.refreshDir(os.path.join(self.dir, "d1", "d1", "d1"))
+        poller.refreshed(os.path.join(self.dir, "d1", "d1", "d1"))
+        self.assertEqual([], poller.poll())
+
+    def test_budget(self):
+        poller = PollingWatcher(self.mgr, budget=1)
+        poller.start()
+        write(os.path.join(self.dir, "d2", "new.txt"), b"abc")
+        changed = []
+        for _ in range(len(self.mgr.items)):
+            changed.extend(poller.poll())
+        self.assertEqual([os.path.join(self.dir, "d2")], changed)
+
+
+class TestFileSystemWatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.mgr = DirManager(dir=self.dir)
+        self.changed = []
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def waitForChange(self, watcher, count):
+        loop = QEventLoop()
+        watcher.changed.connect(lambda dirs: self.changed.append(dirs))
+        watcher.changed.connect(lambda dirs: loop.quit() if len(self.changed) >= count else None)
+        QTimer.singleShot(5000, loop.quit)
+        loop.exec_()
+        deadline = time.monotonic() + 5
+        while watcher.threads and time.monotonic() < deadline:
+            app.processEvents()
+
+    def check(self, watcher):
+        write(os.path.join(self.dir, "d1", "d2", "new.dat"), bytes([0, 1]))
+        self.waitForChange(watcher, 2)
+        watcher.stop()
+        self.assertIn(os.path.join(self.dir, "d1", "d2", "new.dat"), self.mgr.items)
+        self.assertEqual(8, self.mgr.dir.totalFiles())
+        self.assertEqual(4, self.mgr.dir.binCount())
+
+    def test_notifications(self):
+        self.check(FileSystemWatcher(self.mgr, quiet=0.05))
+
+    def test_polling(self):
+        self.check(FileSystemWatcher(self.mgr, quiet=0.05, pollInterval=0.05, poll=True))
+
+    def test_writeInPlace(self):
+        watcher = FileSystemWatcher(self.mgr, quiet=0.05, pollInterval=0.05)
+        self.assertIsNone(watcher.poller)
+        with open(os.path.join(self.dir, "d1", "d2", "file1.txt"), "ab") as f:
+            f.write(bytes([0, 1]))  # No entry of the directory changes
+        self.waitForChange(watcher, 2)
+        watcher.stop()
+        self.assertEqual(7, self.mgr.dir.totalFiles())
+        self.assertEqual(4, self.mgr.dir.binCount())
+        self.assertEqual(3, self.mgr.dir.txtCount())
+
+    def test_watchLimit(self):
+        watcher = FileSystemWatcher(self.mgr, quiet=0.05, pollInterval=0.05, maxWatches=3)
+        self.assertIsNotNone(watcher.poller)
+        self.check(watcher)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Created on 18.10.2026 12:40 10
+ 
+@author: Piotr Gradkowski <grotsztaksel@o2.pl>
+"""
+
+__date__ = '2026-10-18'
+__authors__ = ["Piotr Gradkowski <grotsztaksel@o2.pl>"]
+
+import os
+import shutil
+import unittest
+
+from test.app import app
+from PyQt5.QtCore import QThread, QEventLoop, QTimer
+
+from src.dir_manager import DirManager
+from src.scan_queue import ScanQueue
+from src.walker import Walker
+from src.worker import AnalysisWorker, LazyScanWorker
+from test.test_dir_manager import prepareDirs
+
+
+class TestAnalysisWorker(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.mgr = None
+        self.results = []
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def onScanned(self, mgr):
+        self.mgr = mgr
+
+    def onBatchReady(self, batch):
+        for file, binary in batch:
+            file.setBinary(binary)
+        self.results.extend(batch)
+
+    def makeWorker(self):
+        worker = AnalysisWorker(self.dir, interval=0)
+        worker.scanned.connect(self.onScanned)
+        worker.batchReady.connect(self.onBatchReady)
+        return worker
+
+    def test_run(self):
+        self.makeWorker().run()
+        self.assertIsNotNone(self.mgr)
+        self.assertEqual(7, len(self.results))
+        self.assertEqual(3, self.mgr.dir.binCount())
+        self.assertEqual(4, self.mgr.dir.txtCount())
+
+    def test_run_in_thread(self):
+        thread = QThread()
+        worker = self.makeWorker()
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        loop = QEventLoop()
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(loop.quit)
+        QTimer.singleShot(10000, loop.quit)
+        thread.start()
+        loop.exec_()
+        thread.wait()
+        app.processEvents()
+        self.assertEqual(7, len(self.results))
+        self.assertEqual(3, self.mgr.dir.binCount())
+
+    def test_estimate(self):
+        worker = AnalysisWorker(self.dir, interval=0, estimate=0.3)
+        worker.scanned.connect(self.onScanned)
+        batches = []
+        worker.batchReady.connect(lambda batch: batches.append(len(batch)))
+        worker.batchReady.connect(self.onBatchReady)
+        worker.run()
+        self.assertEqual(3, batches[0])  # The sample of 30% of the 7 files comes first
+        self.assertEqual(7, len(self.results))
+        self.assertEqual(3, self.mgr.dir.binCount())
+        self.assertEqual(3, self.mgr.dir.estimate().binCount)
+
+    def test_cancel(self):
+        worker = self.makeWorker()
+        worker.cancel()
+        worker.run()
+        self.assertIsNone(self.mgr)
+        self.assertEqual([], self.results)
+
+
+class TestLazyScanWorker(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = prepareDirs()
+        self.mgr = DirManager(dir=self.dir, lazy=True)
+        self.queue = ScanQueue()
+        self.listed = []
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def onListed(self, path, dirs, files, priority):
+        self.listed.append(path)
+        newFiles, newDirs = self.mgr.listDir(path, dirs, files)
+        if newFiles:
+            self.queue.push(ScanQueue.CLASSIFY, path, priority, newFiles)
+        for dir in newDirs:
+            self.queue.push(ScanQueue.LIST, dir.path)
+        self.queue.taskDone()
+
+    def onBatchReady(self, batch):
+        for file, binary in batch:
+            file.setBinary(binary)
+
+    def test_run(self):
+        self.assertFalse(self.mgr.dir.listed)
+        self.assertFalse(self.mgr.dir.complete())
+        self.queue.push(ScanQueue.LIST, self.dir, ScanQueue.VISIBLE)
+        worker = LazyScanWorker(self.queue, self.mgr.engine, interval=0)
+        worker.listed.connect(self.onListed)
+        worker.batchReady.connect(self.onBatchReady)
+        worker.run()
+        self.assertTrue(self.mgr.dir.complete())
+        self.assertEqual(9, len(self.listed))
+        self.assertEqual(self.dir, self.listed[0])
+        # Breadth-first sweep
+        self.assertEqual(["d1", "d2"], [os.path.relpath(p, self.dir) for p in self.listed[1:3]])
+        self.assertEqual(7, self.mgr.dir.totalFiles())
+        self.assertEqual(3, self.mgr.dir.binCount())
+        self.assertEqual(4, self.mgr.dir.txtCount())
+
+    def test_partial(self):
+        self.mgr.listDir(self.dir, *Walker().listDir(self.dir))
+        d1 = self.mgr.dir.dirs[0]
+        self.mgr.listDir(d1.path, *Walker().listDir(d1.path))
+        self.assertFalse(self.mgr.dir.complete())
+        self.assertEqual(3, self.mgr.dir.nTotalUnlisted)
+        self.assertEqual(0, self.mgr.dir.totalFiles())
+
+
+if __name__ == '__main__':
+    unittest.main()